@@ -6,6 +6,8 @@ from datetime import datetime
 from pathlib import Path
 import base64
 from typing import Optional
+from itertools import groupby
+from contextlib import ExitStack
 
 # Load environment variables
 try:
@@ -24,7 +26,19 @@ st.set_page_config(
 
 # Import your existing functionality
 try:
-    from blog_to_podcast.crew import BlogToPodcast
+    from blog_to_podcast.crew_factory import get_crew_factory
+    from blog_to_podcast.stage_queue import StageQueue
+    from blog_to_podcast.workspace import RunWorkspace, DEFAULT_RUNS_DIR, AUDIO_EXTENSIONS
+    from blog_to_podcast.tracing import get_tracer
+    from blog_to_podcast import profiling
+    from blog_to_podcast.tts_backends import BACKENDS
+    from blog_to_podcast.transcode import FORMAT_SETTINGS, TranscodeError, audio_mime_type, get_transcode_cache
+    from blog_to_podcast.retention import get_retention_manager, record_access
+    from blog_to_podcast.fanout import LANGUAGE_NAMES, convert_languages, language_name
+    from blog_to_podcast.search_index import get_search_index, index_episode
+    from blog_to_podcast.logging_config import configure_logging
+    from blog_to_podcast import budget
+    from blog_to_podcast.waveform import load_waveform
 except ImportError as e:
     st.error(f"❌ Cannot import blog_to_podcast module: {str(e)}")
     st.markdown("""
@@ -141,8 +155,36 @@ def create_sidebar():
     # Advanced settings
     st.sidebar.markdown("### ⚙️ Advanced Settings")
     
+    st.sidebar.selectbox(
+        "Speech engine:",
+        options=["default"] + list(BACKENDS.keys()),
+        key="tts_backend",
+        help="Local engines (piper, espeak) run offline on CPU at no cost; default uses TTS_BACKEND"
+    )
+    
+    st.sidebar.multiselect(
+        "Episode languages:",
+        options=list(LANGUAGE_NAMES.keys()),
+        format_func=lambda code: f"{LANGUAGE_NAMES[code]} ({code})",
+        key="fanout_languages",
+        help="Pick one or more to scrape and script once, then translate and voice each language"
+    )
+    
     show_progress = st.sidebar.checkbox("Show detailed progress", value=True)
     auto_play = st.sidebar.checkbox("Auto-play generated audio", value=True)
+    st.sidebar.selectbox(
+        "Library download format:",
+        options=["original"] + list(FORMAT_SETTINGS.keys()),
+        key="download_format",
+        help="Other formats are transcoded locally with ffmpeg on first download and cached"
+    )
+    st.sidebar.checkbox(
+        "Profile conversion",
+        value=False,
+        key="profile_conversion",
+        help="Write CPU, sampled-stack and memory profiles to output/profiles/<run_id>/ "
+             "(not for runs on the shared stage queue, which execute on the stage workers)"
+    )
     
     # Statistics
     st.sidebar.markdown("### 📊 Session Stats")
@@ -204,8 +246,59 @@ def show_features():
         </div>
         """, unsafe_allow_html=True)
 
+def run_queued_conversion(blog_url: str, voice: str, tts_backend: Optional[str], on_stage=None):
+    """Convert through the shared stage queue as an interactive run.
+    
+    Interactive runs are served ahead of queued scheduled and backfill work
+    at every stage, so the wait does not grow with the background backlog.
+    The stages run on the stage workers, which trace each stage under the
+    run ID; the span here covers the session's wait for the run. The
+    session's profiler does not apply, since no stage runs in this process.
+    """
+    queue = StageQueue()
+    with get_tracer().span("conversion.queued", **{
+        "blog.url": blog_url, "tts.voice": voice, "stage.priority": "interactive"
+    }) as span:
+        run_id = queue.enqueue(blog_url, voice, tts_backend, priority="interactive")
+        span.set_attribute("run.id", run_id)
+        run = queue.wait(run_id, timeout=float(os.getenv("APP_STAGE_QUEUE_TIMEOUT", "1800")), on_stage=on_stage)
+    if run["status"] != "succeeded":
+        raise RuntimeError(run["error"] or f"run {run_id} failed")
+    
+    workspace = RunWorkspace(run_id=run_id, root=run["root"])
+    files = workspace.artifacts()
+    files['result'] = files['info'].read_text(encoding='utf-8') if files['info'] else None
+    return files
+
+
+def run_fanout_conversion(blog_url: str, voice: str, tts_backend: Optional[str], languages, on_step=None):
+    """Convert into several languages from a single scrape and script.
+    
+    Returns artifacts shaped like a single run: every language's audio in
+    one list, so the results view shows them as parts of one session.
+    """
+    fanout = convert_languages(blog_url, languages, voice, tts_backend, progress=on_step)
+    outputs = fanout['languages']
+    failed = [f"{output['name']}: {output['error']}" for output in outputs.values() if output['error']]
+    if len(failed) == len(outputs):
+        raise RuntimeError("; ".join(failed))
+    
+    infos = [f"[{output['name']}]\n{output['info'].read_text(encoding='utf-8')}"
+             for output in outputs.values() if output['info']]
+    return {
+        'run_id': fanout['run_id'],
+        'audio': [audio for output in outputs.values() for audio in output['audio']],
+        'script': Path(fanout['script']),
+        'info': None,
+        'result': "\n\n".join(infos + [f"[Failed] {failure}" for failure in failed]),
+    }
+
+
 def run_conversion(blog_url: str, voice: str, show_progress: bool = True):
-    """Run the blog-to-podcast conversion with progress tracking"""
+    """Run the blog-to-podcast conversion with progress tracking.
+    
+    Returns the run's exact artifacts (see RunWorkspace.artifacts) and an error message.
+    """
     
     if show_progress:
         # Create progress tracking
@@ -233,9 +326,68 @@ def run_conversion(blog_url: str, voice: str, show_progress: bool = True):
             progress_bar.progress(50)
             status_text.text("🤖 Generating podcast script...")
         
-        # Run the CrewAI workflow
-        crew = BlogToPodcast()
-        result = crew.crew().kickoff(inputs=inputs)
+        tts_backend = st.session_state.get("tts_backend")
+        tts_backend = None if tts_backend in (None, "default") else tts_backend
+        
+        # Several languages: scrape and script once, then fan out
+        languages = st.session_state.get("fanout_languages") or []
+        if languages:
+            def on_step(step, state):
+                if show_progress and state == "started":
+                    label = language_name(step) if step in languages else step
+                    status_text.text(f"⏳ {label.title()}...")
+            
+            files = run_fanout_conversion(blog_url, voice, tts_backend, languages, on_step)
+            files['profile'] = None
+            if show_progress:
+                progress_bar.progress(100)
+                status_text.text("✅ Conversion completed!")
+            return files, None
+        
+        # With shared stage workers, queue the run ahead of background work
+        if os.getenv("APP_STAGE_QUEUE", "false").lower() in ("1", "true", "yes"):
+            stage_labels = {
+                "scrape": (30, "🕷️ Scraping blog content..."),
+                "script": (50, "🤖 Generating podcast script..."),
+                "audio": (80, "🎙️ Generating audio..."),
+            }
+            
+            def on_stage(stage):
+                if show_progress and stage in stage_labels:
+                    progress_bar.progress(stage_labels[stage][0])
+                    status_text.text(stage_labels[stage][1])
+            
+            files = run_queued_conversion(blog_url, voice, tts_backend, on_stage)
+            # The stages ran on the stage workers, outside this session's profiler
+            files['profile'] = None
+            if st.session_state.get("profile_conversion"):
+                st.info("ℹ️ Queued runs execute on the stage workers and are not profiled in this session.")
+            if show_progress:
+                progress_bar.progress(100)
+                status_text.text("✅ Conversion completed!")
+            return files, None
+        
+        # Run the CrewAI workflow in its own workspace so concurrent
+        # sessions never pick up each other's files
+        workspace = RunWorkspace.create()
+        with ExitStack() as stack:
+            profiler = None
+            if st.session_state.get("profile_conversion"):
+                profiler = stack.enter_context(profiling.profile_run(workspace.run_id))
+            with get_tracer().span("conversion", **{
+                "run.id": workspace.run_id, "blog.url": blog_url, "tts.voice": voice
+            }), budget.admitted(workspace.run_id, voice, tts_backend, crew=True) as decision:
+                if decision.action == "downgrade" and show_progress:
+                    status_text.text(f"💸 Over budget: using {decision.plan.model} / {decision.plan.tts_backend}...")
+                with profiling.stage("crew.setup"):
+                    crew = get_crew_factory().create(workspace, tts_backend=decision.plan.tts_backend)
+                with profiling.stage("crew.kickoff"):
+                    result = crew.kickoff(inputs=inputs)
+                budget.record_crew_usage(result)
+        index_episode(workspace, blog_url, voice)
+        files = workspace.artifacts()
+        files['result'] = result
+        files['profile'] = profiler.summary_path if profiler else None
         
         if show_progress:
             progress_bar.progress(80)
@@ -245,7 +397,7 @@ def run_conversion(blog_url: str, voice: str, show_progress: bool = True):
             progress_bar.progress(100)
             status_text.text("✅ Conversion completed!")
         
-        return result, None
+        return files, None
         
     except ImportError as e:
         error_msg = f"❌ Import Error: {str(e)}. Please ensure all dependencies are installed."
@@ -263,15 +415,23 @@ def run_conversion(blog_url: str, voice: str, show_progress: bool = True):
             status_text.text(error_msg)
         return None, error_msg
 
+def audio_language(path: Path) -> Optional[str]:
+    """Language code of an audio file produced by a fan-out run, else None."""
+    return path.parent.parent.name if path.parent.parent.parent.name == "languages" else None
+
+
 def get_all_audio_files():
     """Get all audio files with metadata, organized by session"""
     audio_dir = Path("output/audio")
+    runs_dir = Path(DEFAULT_RUNS_DIR)
     
-    if not audio_dir.exists():
-        return []
-    
-    all_files = list(audio_dir.glob("*.mp3"))
-    if not all_files:
+    all_files = [f for ext in AUDIO_EXTENSIONS for f in audio_dir.glob(f"*{ext}")] if audio_dir.exists() else []
+    run_files = [
+        f for ext in AUDIO_EXTENSIONS
+        for pattern in (f"*/audio/*{ext}", f"*/languages/*/audio/*{ext}")
+        for f in runs_dir.glob(pattern)
+    ] if runs_dir.exists() else []
+    if not all_files and not run_files:
         return []
     
     # Group files by sessions
@@ -313,6 +473,26 @@ def get_all_audio_files():
         }
         sessions[session_key].append(file_info)
     
+    # Files from per-run workspaces (including every language of a fan-out)
+    # belong to the session of their run ID
+    run_files.sort(key=lambda f: f.relative_to(runs_dir).parts[0])
+    for run_id, files in groupby(run_files, key=lambda f: f.relative_to(runs_dir).parts[0]):
+        files = sorted(files, key=lambda f: (
+            int(f.stem.rsplit("_part", 1)[-1]) if "_part" in f.stem and f.stem.rsplit("_part", 1)[-1].isdigit() else 0,
+            f.name
+        ))
+        sessions[run_id] = [
+            {
+                'file': file,
+                'name': file.name,
+                'size': os.path.getsize(file),
+                'created': datetime.fromtimestamp(os.path.getctime(file)),
+                'part_number': part_number,
+                'language': audio_language(file)
+            }
+            for part_number, file in enumerate(files, 1)
+        ]
+    
     # Sort files within each session by part number
     for session_key in sessions:
         sessions[session_key].sort(key=lambda x: x['part_number'])
@@ -336,87 +516,37 @@ def get_all_audio_files():
     
     return session_list
 
-def find_generated_files():
-    """Find the most recently generated audio and script files"""
-    audio_dir = Path("output/audio")
-    scripts_dir = Path("output/scripts") 
-    metadata_dir = Path("output/metadata")
-    
-    # Find all related audio files from the most recent session
-    audio_files = []
-    if audio_dir.exists():
-        all_audio_files = list(audio_dir.glob("*.mp3"))
-        if all_audio_files:
-            # Get the most recent audio file to determine the session
-            most_recent = max(all_audio_files, key=os.path.getctime)
-            most_recent_name = most_recent.stem
-            
-            # Determine the pattern and base name for this session
-            base_name = None
-            pattern_found = False
-            
-            # Pattern 1: name_partN (e.g., "backend_development_podcast_part1")
-            if "_part" in most_recent_name and most_recent_name.split("_part")[-1].isdigit():
-                base_name = most_recent_name.rsplit("_part", 1)[0]
-                pattern = f"{base_name}_part"
-                pattern_found = True
-            
-            # Pattern 2: partN_name (e.g., "part1_podcast_episode") 
-            elif most_recent_name.startswith("part") and "_" in most_recent_name:
-                # Extract everything after "partN_"
-                parts = most_recent_name.split("_", 1)
-                if len(parts) == 2 and parts[0].startswith("part") and parts[0][4:].isdigit():
-                    base_name = parts[1]  # e.g., "podcast_episode"
-                    pattern = f"part*_{base_name}"
-                    pattern_found = True
-            
-            if pattern_found and base_name:
-                # Find all parts of this session
-                related_files = []
-                for file in all_audio_files:
-                    file_stem = file.stem
-                    
-                    # Check both patterns
-                    if (file_stem.startswith(f"{base_name}_part") and 
-                        file_stem.split("_part")[-1].isdigit()):
-                        related_files.append(file)
-                    elif (file_stem.startswith("part") and f"_{base_name}" in file_stem and
-                          "_" in file_stem):
-                        # For partN_name pattern
-                        parts = file_stem.split("_", 1)
-                        if (len(parts) == 2 and parts[0].startswith("part") and 
-                            parts[0][4:].isdigit() and parts[1] == base_name):
-                            related_files.append(file)
-                
-                if related_files:
-                    # Sort by part number - handle both patterns
-                    def get_part_number(file_path):
-                        stem = file_path.stem
-                        if stem.startswith(f"{base_name}_part"):
-                            return int(stem.split("_part")[-1])
-                        elif stem.startswith("part"):
-                            return int(stem.split("_")[0][4:])
-                        return 0
-                    
-                    audio_files = sorted(related_files, key=get_part_number)
-                else:
-                    # Fallback to just the most recent file
-                    audio_files = [most_recent]
-            else:
-                # Single file, not multi-part
-                audio_files = [most_recent]
-    
-    # Find script file in new organized location
-    script_file = scripts_dir / "podcast_script.txt"
+def format_seconds(seconds: float) -> str:
+    """Format a position in an episode as m:ss"""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def waveform_svg(summary: dict, width: int = 600, height: int = 48) -> str:
+    """Inline SVG of a stored waveform summary: peaks, RMS loudness and jump points"""
+    peaks, rms = summary['peaks'], summary['rms']
+    scale = max(max(peaks), 1)
+    step = width / len(peaks)
+    middle = height / 2
     
-    # Find info file in new organized location  
-    info_file = metadata_dir / "podcast_audio_info.txt"
+    def bars(values):
+        return "".join(
+            f"M{(i + 0.5) * step:.1f} {middle - h:.1f}V{middle + h:.1f}"
+            for i, h in enumerate(max(value / scale * middle, 0.5) for value in values)
+        )
     
-    return {
-        'audio': audio_files,  # Now returns a list of files instead of single file
-        'script': script_file if script_file.exists() else None,
-        'info': info_file if info_file.exists() else None
-    }
+    markers = "".join(
+        f'<line x1="{x:.1f}" x2="{x:.1f}" y1="0" y2="{height}" stroke="#1f77b4" stroke-width="1.5"/>'
+        for x in (jump / summary['duration'] * width for jump in summary['jumps'] if summary['duration'])
+    )
+    return (
+        f'<svg viewBox="0 0 {width} {height}" width="100%" height="{height}" preserveAspectRatio="none" '
+        f'xmlns="http://www.w3.org/2000/svg">'
+        f'<path d="{bars(peaks)}" stroke="#ffb3b3" stroke-width="{step * 0.7:.2f}"/>'
+        f'<path d="{bars(rms)}" stroke="#ff4b4b" stroke-width="{step * 0.7:.2f}"/>'
+        f'{markers}</svg>'
+    )
+
 
 def display_all_audio():
     """Display all audio files organized by sessions"""
@@ -454,38 +584,69 @@ def display_all_audio():
             
             with col1:
                 # Display each file in the session
-                if len(session['files']) > 1:
+                if len(session['files']) > 1 and all(f.get('language') for f in session['files']):
+                    st.info(f"🌐 Multi-language podcast in {len(session['files'])} languages")
+                elif len(session['files']) > 1:
                     st.info(f"📢 Multi-part podcast with {len(session['files'])} parts")
                 
                 for file_info in session['files']:
-                    part_label = f"Part {file_info['part_number']}" if len(session['files']) > 1 else "Audio"
+                    if file_info.get('language'):
+                        part_label = language_name(file_info['language'])
+                    else:
+                        part_label = f"Part {file_info['part_number']}" if len(session['files']) > 1 else "Audio"
                     
                     st.markdown(f"**🎧 {part_label}: {file_info['name']}**")
                     
-                    # Audio player
-                    try:
-                        with open(file_info['file'], 'rb') as f:
-                            audio_bytes = f.read()
-                        st.audio(audio_bytes, format='audio/mp3')
-                        
-                        # File info and download
-                        file_size_mb = file_info['size'] / (1024 * 1024)
-                        col_info, col_download = st.columns([2, 1])
-                        
-                        with col_info:
-                            st.caption(f"📏 Size: {file_size_mb:.2f} MB | 📅 Created: {file_info['created'].strftime('%m/%d %H:%M')}")
-                        
-                        with col_download:
+                    # Waveform and jump points come from the stored summary, so
+                    # listing the library never reads the audio itself
+                    file_key = f"{session['name']}_{file_info['name']}"
+                    play_key = f"play_{file_key}"
+                    summary = load_waveform(str(file_info['file']))
+                    if summary:
+                        st.markdown(waveform_svg(summary), unsafe_allow_html=True)
+                        jumps = summary['jumps'][:6]
+                        if jumps:
+                            for col, jump in zip(st.columns(len(jumps)), jumps):
+                                if col.button(f"⏩ {format_seconds(jump)}", key=f"jump_{file_key}_{jump}"):
+                                    st.session_state[play_key] = int(jump)
+                    else:
+                        st.caption("〰️ No waveform preview yet (run `python -m blog_to_podcast.waveform backfill`)")
+                    
+                    file_size_mb = file_info['size'] / (1024 * 1024)
+                    duration_text = f" | ⏱️ {format_seconds(summary['duration'])}" if summary else ""
+                    st.caption(f"📏 Size: {file_size_mb:.2f} MB{duration_text} | 📅 Created: {file_info['created'].strftime('%m/%d %H:%M')}")
+                    
+                    # Audio is loaded only for the files the user opens
+                    if play_key not in st.session_state:
+                        if st.button("▶️ Play", key=f"load_{file_key}"):
+                            st.session_state[play_key] = 0
+                    
+                    if play_key in st.session_state:
+                        try:
+                            st.audio(str(file_info['file']), format=audio_mime_type(file_info['name']),
+                                     start_time=st.session_state[play_key])
+                            
+                            # Serve the requested format, transcoding lazily into the cache
+                            download_path = file_info['file']
+                            download_format = st.session_state.get('download_format', 'original')
+                            if download_format != 'original':
+                                try:
+                                    download_path = Path(get_transcode_cache().get(str(file_info['file']), download_format))
+                                except TranscodeError as e:
+                                    st.warning(f"⚠️ Serving original format: {e}")
+                            with open(download_path, 'rb') as f:
+                                download_bytes = f.read()
+                            
                             st.download_button(
                                 label=f"📥 Download",
-                                data=audio_bytes,
-                                file_name=file_info['name'],
-                                mime="audio/mp3",
-                                key=f"download_{session['name']}_{file_info['part_number']}"
+                                data=download_bytes,
+                                file_name=f"{file_info['file'].stem}{download_path.suffix}",
+                                mime=audio_mime_type(download_path.name),
+                                key=f"download_{file_key}"
                             )
-                        
-                    except Exception as e:
-                        st.error(f"❌ Could not load audio file: {e}")
+                            
+                        except Exception as e:
+                            st.error(f"❌ Could not load audio file: {e}")
                     
                     if len(session['files']) > 1:
                         st.markdown("---")
@@ -497,10 +658,20 @@ def display_all_audio():
                 st.write(f"💾 Size: {session['total_size']/(1024*1024):.1f} MB")
                 st.write(f"📅 Created: {created_date}")
                 
+                # Pinned sessions are never removed by retention
+                manager = get_retention_manager()
+                pinned = manager.is_pinned(str(session['files'][0]['file']))
+                if st.button("📌 Unpin" if pinned else "📌 Keep (pin)", key=f"pin_{session['name']}"):
+                    for file_info in session['files']:
+                        manager.set_pinned(str(file_info['file']), not pinned)
+                    st.rerun()
+                
                 # Download all parts of this session
                 if len(session['files']) > 1:
                     st.markdown("**⬇️ Batch Download**")
                     if st.button(f"📦 Download All Parts", key=f"download_all_{session['name']}"):
+                        for file_info in session['files']:
+                            record_access(file_info['file'])
                         # Create a zip file with all parts
                         import zipfile
                         import io
@@ -518,6 +689,69 @@ def display_all_audio():
                             key=f"zip_download_{session['name']}"
                         )
 
+def search_filters():
+    """Search box and filters for the library; returns the search arguments."""
+    index = get_search_index()
+    facets = index.facets()
+    
+    query = st.text_input("🔎 Search episodes", placeholder="Topic, title, author or URL",
+                          help="Searches every script, title, author and source URL")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        voice = st.selectbox("Voice", ["any"] + facets['voices'], key="search_voice")
+    with col2:
+        host = st.selectbox("Source", ["any"] + facets['hosts'], key="search_host")
+    with col3:
+        language = st.selectbox("Language", ["any"] + facets['languages'], key="search_language")
+    with col4:
+        dates = st.date_input("Created", value=(), key="search_dates", help="Pick a start and end date")
+    
+    return {
+        'query': query.strip(),
+        'voice': None if voice == "any" else voice,
+        'host': None if host == "any" else host,
+        'language': None if language == "any" else language,
+        'since': dates[0] if len(dates) > 0 else None,
+        'until': dates[1] if len(dates) > 1 else None,
+    }
+
+
+def display_search_results(results: list):
+    """Show ranked search results, loading audio only for the listed episodes."""
+    if not results:
+        st.info("🔎 No episodes match this search.")
+        return
+    
+    st.caption(f"{len(results)} best matches")
+    for result in results:
+        created = datetime.fromtimestamp(result['created']).strftime('%Y-%m-%d %H:%M')
+        title = result['title'] or result['url'] or result['run_id']
+        if result['language']:
+            title += f" ({language_name(result['language'])})"
+        
+        with st.expander(f"🎙️ {title} - {created}"):
+            st.caption(f"🔗 {result['url'] or '-'} | 🎤 {result['voice'] or '-'} | 🗂️ {result['run_id']}")
+            if result['snippet']:
+                st.markdown(f"> {' '.join(result['snippet'].split())}")
+            
+            audio_dir = Path(result['audio_dir'] or "")
+            audio_files = sorted(f for ext in AUDIO_EXTENSIONS for f in audio_dir.glob(f"*{ext}")) \
+                if result['audio_dir'] and audio_dir.exists() else []
+            if not audio_files:
+                st.warning("⚠️ Audio is no longer available")
+            for audio_file in audio_files:
+                with open(audio_file, 'rb') as f:
+                    audio_bytes = f.read()
+                st.audio(audio_bytes, format=audio_mime_type(audio_file.name))
+                st.download_button(
+                    label=f"📥 Download {audio_file.name}",
+                    data=audio_bytes,
+                    file_name=audio_file.name,
+                    mime=audio_mime_type(audio_file.name),
+                    key=f"search_download_{result['episode']}_{audio_file.name}"
+                )
+
+
 def display_results(files: dict):
     """Display the conversion results with audio player and downloads"""
     
@@ -536,19 +770,27 @@ def display_results(files: dict):
         if files['audio']:
             # Check if it's multiple parts or single file
             audio_files = files['audio'] if isinstance(files['audio'], list) else [files['audio']]
+            for audio_file in audio_files:
+                record_access(audio_file)
             
             if len(audio_files) > 1:
-                st.markdown(f"### 🎵 Generated Podcast ({len(audio_files)} Parts)")
-                st.info("📢 **Multi-Part Podcast**: Your content was split into multiple parts for optimal listening experience. Play them in order!")
+                languages = [audio_language(audio_file) for audio_file in audio_files]
+                if all(languages):
+                    st.markdown(f"### 🎵 Generated Podcast ({len(audio_files)} Languages)")
+                    st.info("🌐 **Multi-Language Podcast**: The post was scraped and scripted once, then translated and voiced in each language.")
+                else:
+                    st.markdown(f"### 🎵 Generated Podcast ({len(audio_files)} Parts)")
+                    st.info("📢 **Multi-Part Podcast**: Your content was split into multiple parts for optimal listening experience. Play them in order!")
                 
                 # Display each part
                 for i, audio_file in enumerate(audio_files, 1):
-                    with st.expander(f"🎧 Part {i}: {audio_file.name}", expanded=(i == 1)):
+                    label = language_name(languages[i - 1]) if languages[i - 1] else f"Part {i}"
+                    with st.expander(f"🎧 {label}: {audio_file.name}", expanded=(i == 1)):
                         # Display audio player
                         with open(audio_file, 'rb') as f:
                             audio_bytes = f.read()
                         
-                        st.audio(audio_bytes, format='audio/mp3')
+                        st.audio(audio_bytes, format=audio_mime_type(audio_file.name))
                         
                         # File info
                         file_size = os.path.getsize(audio_file) / (1024 * 1024)  # MB
@@ -559,7 +801,7 @@ def display_results(files: dict):
                             label=f"📥 Download Part {i}",
                             data=audio_bytes,
                             file_name=audio_file.name,
-                            mime="audio/mp3",
+                            mime=audio_mime_type(audio_file.name),
                             key=f"download_part_{i}"
                         )
                 
@@ -576,7 +818,7 @@ def display_results(files: dict):
                 with open(audio_file, 'rb') as f:
                     audio_bytes = f.read()
                 
-                st.audio(audio_bytes, format='audio/mp3')
+                st.audio(audio_bytes, format=audio_mime_type(audio_file.name))
                 
                 # File info
                 file_size = os.path.getsize(audio_file) / (1024 * 1024)  # MB
@@ -584,10 +826,10 @@ def display_results(files: dict):
                 
                 # Download button
                 st.download_button(
-                    label="📥 Download MP3",
+                    label=f"📥 Download {audio_file.suffix.lstrip('.').upper()}",
                     data=audio_bytes,
                     file_name=audio_file.name,
-                    mime="audio/mp3"
+                    mime=audio_mime_type(audio_file.name)
                 )
     
     with col2:
@@ -620,7 +862,9 @@ def display_results(files: dict):
                 st.error(f"Could not read script file: {e}")
 
 def main():
+    configure_logging()
     load_css()
+    get_retention_manager().start()
     create_header()
     
     # Sidebar
@@ -652,17 +896,19 @@ def main():
                 st.markdown("---")
                 
                 with st.container():
-                    result, error = run_conversion(blog_url, selected_voice, show_progress)
+                    files, error = run_conversion(blog_url, selected_voice, show_progress)
                     
-                    if result:
+                    if files:
                         # Increment counter
                         st.session_state.conversion_count += 1
                         
-                        # Find and store generated files in session state
-                        files = find_generated_files()
+                        # Store this run's generated files in session state
                         st.session_state.last_conversion_files = files
                         st.session_state.last_conversion_successful = True
                         
+                        if files.get('profile'):
+                            st.info(f"📈 Profile written to `{os.path.dirname(files['profile'])}`")
+                        
                         # Auto-play if enabled
                         if auto_play and files['audio']:
                             st.balloons()
@@ -702,7 +948,12 @@ def main():
         st.markdown("## 🎵 All Generated Audio Files")
         st.markdown("Browse and download all your podcast conversions from this central hub.")
         
-        display_all_audio()
+        # Searches only read the index; the full listing is shown without one
+        search = search_filters()
+        if any(search.values()):
+            display_search_results(get_search_index().search(**search, limit=50))
+        else:
+            display_all_audio()
     
     with tab3:
         st.markdown("## 📚 Examples & Use Cases")
@@ -774,23 +1025,54 @@ MODEL=gpt-4o
         directories = {
             "📄 Scripts": "output/scripts",
             "🎵 Audio Files": "output/audio", 
-            "📊 Metadata": "output/metadata"
+            "📊 Metadata": "output/metadata",
+            "🗂️ Run Workspaces": DEFAULT_RUNS_DIR
         }
         
         for label, path in directories.items():
             dir_path = Path(path)
             if dir_path.exists():
                 if path.endswith("audio"):
-                    files = list(dir_path.glob("*.mp3"))
+                    files = [f for ext in AUDIO_EXTENSIONS for f in dir_path.glob(f"*{ext}")]
                     st.info(f"{label}: {len(files)} files in `{path}/`")
                 elif path.endswith("scripts"): 
                     files = list(dir_path.glob("*.txt"))
                     st.info(f"{label}: {len(files)} files in `{path}/`")
+                elif path == DEFAULT_RUNS_DIR:
+                    runs = [d for d in dir_path.iterdir() if d.is_dir()]
+                    st.info(f"{label}: {len(runs)} runs in `{path}/`")
                 else:
                     files = list(dir_path.glob("*.*"))
                     st.info(f"{label}: {len(files)} files in `{path}/`")
             else:
                 st.info(f"{label}: `{path}/` (will be created on first use)")
+        
+        # Retention usage comes from the index, without walking the output tree
+        st.markdown("### 🧹 Storage Retention")
+        usage = get_retention_manager().usage()
+        quota = f"{usage['quota_bytes']/(1024*1024):.0f} MB" if usage['quota_bytes'] else "none"
+        idle = f"{usage['max_idle_days']:g} days" if usage['max_idle_days'] else "never"
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🗂️ Tracked Episodes", usage['entries'])
+        with col2:
+            st.metric("💾 Used", f"{usage['bytes']/(1024*1024):.1f} MB")
+        with col3:
+            st.metric("📌 Pinned", f"{usage['pinned_bytes']/(1024*1024):.1f} MB")
+        st.caption(f"Quota: {quota} | Evict after idle: {idle} — set RETENTION_QUOTA / RETENTION_MAX_IDLE_DAYS in .env")
+        
+        # Today's spend and reservations come from the cost ledger's running totals
+        st.markdown("### 💰 Budget")
+        daily = budget.get_ledger().usage()[0]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("💵 Spent Today", f"${daily['spent']:.4f}")
+        with col2:
+            st.metric("⏳ Reserved", f"${daily['reserved']:.4f}")
+        with col3:
+            st.metric("🎯 Daily Budget", f"${daily['limit']:.2f}" if daily['limit'] else "none")
+        st.caption("Set BUDGET_DAILY / BUDGET_USER_DAILY / BUDGET_BATCH in .env; "
+                   "over-budget runs are downgraded, queued or rejected")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,346 @@
+"""
+HTTP job API for submitting conversions from other systems.
+
+An ASGI (Starlette) service in front of the warm worker pool. Submitting
+returns a job ID immediately; conversions run in the pool's worker
+processes, which record status and per-stage progress in the job store
+(``jobs.py``), so request handlers only touch small SQLite rows.
+
+Endpoints:
+    POST /jobs                        {"url": ...} or {"urls": [...]}, plus
+                                      optional "voice", "tts_backend" and "user"
+    GET  /jobs                        Recent jobs (?status=, ?batch_id=, ?limit=)
+    GET  /jobs/{id}                   Job status, current stage and artifacts
+    GET  /jobs/{id}/events            Progress as Server-Sent Events
+    GET  /jobs/{id}/artifacts/{name}  Download an audio, script or info file
+    GET  /health                      Liveness check
+
+Submitted jobs are admitted against the budgets (see ``budget.py``); the
+whole batch is admitted in one transaction. Admitted jobs run with their
+plan (possibly downgraded), queued jobs are admitted again every
+BUDGET_QUEUE_POLL seconds, and rejected jobs fail with the reason. Each
+decision is also a ``budget`` event of the job.
+
+Run with ``python -m blog_to_podcast.api`` (needs the ``api`` extra:
+``pip install -e ".[api]"``).
+
+Configuration (environment variables):
+    API_HOST        Interface to bind (default: 127.0.0.1)
+    API_PORT        Port (default: 8000)
+    JOBS_DB_PATH    Job store (default: output/index/jobs.db)
+    POOL_WORKERS    Conversion worker processes (see worker_pool.py)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.requests import Request
+    from starlette.responses import FileResponse, JSONResponse, StreamingResponse
+    from starlette.routing import Route
+except ImportError as e:
+    raise ImportError('The job API needs Starlette and uvicorn: pip install -e ".[api]"') from e
+
+from blog_to_podcast import budget
+from blog_to_podcast.jobs import TERMINAL_STATUSES, JobStore
+from blog_to_podcast.logging_config import configure_logging
+from blog_to_podcast.retention import get_retention_manager, record_access
+from blog_to_podcast.tts_backends import BACKENDS, VALID_VOICES
+from blog_to_podcast.worker_pool import WarmCrewPool
+
+MAX_BATCH_SIZE = 500
+# How often the event stream checks the store for new events
+EVENT_POLL_SECONDS = 0.5
+# Comment lines keep idle SSE connections open through proxies
+KEEPALIVE_SECONDS = 15.0
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+def _artifact_files(job: Dict) -> Dict[str, str]:
+    """Downloadable files of a finished job, keyed by file name."""
+    artifacts = job.get("artifacts") or {}
+    paths = list(artifacts.get("audio") or []) + [artifacts.get("script"), artifacts.get("info")]
+    return {os.path.basename(path): path for path in paths if path}
+
+
+def _job_view(request: Request, job: Dict) -> Dict:
+    """Public representation of a job, with links to its events and files."""
+    base = str(request.url_for("job", job_id=job["id"]))
+    view = {
+        "id": job["id"],
+        "batch_id": job["batch_id"],
+        "url": job["blog_url"],
+        "user": job["user"],
+        "voice": job["voice"],
+        "tts_backend": job["tts_backend"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "run_id": job["run_id"],
+        "error": job["error"],
+        "created": job["created"],
+        "updated": job["updated"],
+        "events": f"{base}/events",
+    }
+    if job["status"] == "succeeded":
+        view["artifacts"] = {name: f"{base}/artifacts/{name}" for name in _artifact_files(job)}
+    return view
+
+
+def _validate_url(url) -> Optional[str]:
+    if not isinstance(url, str) or urlsplit(url).scheme not in ("http", "https") or not urlsplit(url).netloc:
+        return f"not an http(s) URL: {url!r}"
+    return None
+
+
+class JobService:
+    """Job store plus the worker pool that runs submitted jobs."""
+
+    def __init__(self, store: JobStore, pool: WarmCrewPool):
+        self.store = store
+        self.pool = pool
+        # Jobs queued for budget, admitted again by the readmit thread
+        self.deferred: List[Dict] = []
+        self._deferred_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def dispatch(self, job: Dict, decision: budget.Decision):
+        future = self.pool.submit(
+            job["blog_url"], job["voice"], job["tts_backend"],
+            job_id=job["id"], job_store_path=self.store.path, admission=decision.to_dict()
+        )
+
+        def on_done(done):
+            # Workers record their own outcome; this catches jobs whose
+            # worker died before it could (e.g. a broken pool)
+            error = done.exception()
+            if error is not None:
+                self.store.fail(job["id"], str(error) or type(error).__name__)
+                budget.get_ledger().settle(decision.ticket)
+
+        future.add_done_callback(on_done)
+
+    def admit(self, jobs: List[Dict]):
+        """Admit jobs sharing voice, engine, user and batch, then dispatch, defer or fail each."""
+        first = jobs[0]
+        decisions = budget.admit([job["id"] for job in jobs], first["voice"], first["tts_backend"],
+                                 first["user"], first["batch_id"], crew=True)
+        self.store.note_budget([job["id"] for job in jobs], [decision.to_dict() for decision in decisions])
+        for job, decision in zip(jobs, decisions):
+            if decision.admitted:
+                self.dispatch(job, decision)
+            elif decision.action == "queue":
+                with self._deferred_lock:
+                    self.deferred.append(job)
+            else:
+                self.store.fail(job["id"], f"Budget exceeded: {decision.reason}")
+
+    def submit(self, urls: List[str], voice: str, tts_backend: Optional[str],
+               user: Optional[str] = None) -> List[Dict]:
+        batch_id = uuid.uuid4().hex if len(urls) > 1 else None
+        jobs = self.store.create_many(urls, voice, tts_backend, batch_id, user)
+        self.admit(jobs)
+        # Rejected jobs have already failed
+        return [self.store.get(job["id"]) for job in jobs]
+
+    def readmit(self):
+        """Admit jobs queued for budget again, oldest first."""
+        with self._deferred_lock:
+            jobs, self.deferred = self.deferred, []
+        for job in jobs:
+            self.admit([job])
+
+    def _readmit_loop(self):
+        while not self._stop.wait(float(os.getenv("BUDGET_QUEUE_POLL", "5"))):
+            self.readmit()
+
+    def start(self):
+        threading.Thread(target=self._readmit_loop, name="budget-readmit", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def resume(self) -> int:
+        """Resubmit jobs left queued or running by a previous process."""
+        jobs = self.store.unfinished()
+        for job in jobs:
+            self.store.requeue(job["id"])
+            # Drop the reservation the previous process made before admitting again
+            budget.get_ledger().settle(job["id"])
+            self.admit([job])
+        return len(jobs)
+
+
+async def create_jobs(request: Request):
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        return _error(400, "request body must be JSON")
+    if not isinstance(body, dict):
+        return _error(400, "request body must be a JSON object")
+
+    batch = "urls" in body
+    urls = body.get("urls") if batch else [body.get("url")]
+    if not isinstance(urls, list) or not urls:
+        return _error(400, 'provide "url" or a non-empty "urls" list')
+    if len(urls) > MAX_BATCH_SIZE:
+        return _error(400, f"at most {MAX_BATCH_SIZE} URLs per batch")
+    for url in urls:
+        problem = _validate_url(url)
+        if problem:
+            return _error(400, problem)
+
+    voice = body.get("voice") or "alloy"
+    tts_backend = body.get("tts_backend") or None
+    user = body.get("user") or None
+    if not isinstance(voice, str) or voice not in VALID_VOICES:
+        return _error(400, f"unknown voice {voice!r} (choose from {', '.join(VALID_VOICES)})")
+    if user is not None and not isinstance(user, str):
+        return _error(400, '"user" must be a string')
+    if tts_backend is not None and (not isinstance(tts_backend, str) or tts_backend not in BACKENDS):
+        return _error(400, f"unknown tts_backend {tts_backend!r} (choose from {', '.join(BACKENDS)})")
+
+    service: JobService = request.app.state.jobs
+    jobs = await run_in_threadpool(service.submit, urls, voice, tts_backend, user)
+    views = [_job_view(request, job) for job in jobs]
+    if batch:
+        return JSONResponse({"batch_id": jobs[0]["batch_id"], "jobs": views}, status_code=202)
+    return JSONResponse(views[0], status_code=202)
+
+
+async def list_jobs(request: Request):
+    try:
+        limit = min(int(request.query_params.get("limit", "100")), 1000)
+    except ValueError:
+        return _error(400, "limit must be an integer")
+    store: JobStore = request.app.state.jobs.store
+    jobs = await run_in_threadpool(
+        store.list, request.query_params.get("status"), request.query_params.get("batch_id"), limit
+    )
+    return JSONResponse({"jobs": [_job_view(request, job) for job in jobs]})
+
+
+async def get_job(request: Request):
+    job = await run_in_threadpool(request.app.state.jobs.store.get, request.path_params["job_id"])
+    if job is None:
+        return _error(404, "job not found")
+    return JSONResponse(_job_view(request, job))
+
+
+async def job_events(request: Request):
+    """
+    Stream a job's progress as Server-Sent Events until it finishes.
+
+    Every stored event is sent (``status`` and ``stage`` events with JSON
+    data); reconnecting clients resume after their ``Last-Event-ID``.
+    """
+    store: JobStore = request.app.state.jobs.store
+    job_id = request.path_params["job_id"]
+    if await run_in_threadpool(store.get, job_id) is None:
+        return _error(404, "job not found")
+    try:
+        after = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        after = 0
+
+    async def stream():
+        nonlocal after
+        idle = 0.0
+        while True:
+            events = await run_in_threadpool(store.events, job_id, after)
+            for event in events:
+                after = event["seq"]
+                yield f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event["event"] == "status" and event["data"]["status"] in TERMINAL_STATUSES:
+                    return
+            if events:
+                idle = 0.0
+            elif (await run_in_threadpool(store.get, job_id))["status"] in TERMINAL_STATUSES:
+                # Reconnected after the final event was already delivered
+                return
+            elif idle >= KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+            idle += EVENT_POLL_SECONDS
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def get_artifact(request: Request):
+    job = await run_in_threadpool(request.app.state.jobs.store.get, request.path_params["job_id"])
+    if job is None:
+        return _error(404, "job not found")
+    if job["status"] != "succeeded":
+        return _error(409, f"job is {job['status']}")
+    path = _artifact_files(job).get(request.path_params["name"])
+    if path is None or not os.path.exists(path):
+        return _error(404, "artifact not found")
+    await run_in_threadpool(record_access, path)
+    return FileResponse(path, filename=os.path.basename(path))
+
+
+async def health(request: Request):
+    return JSONResponse({"status": "ok"})
+
+
+def create_app(store: Optional[JobStore] = None, pool: Optional[WarmCrewPool] = None) -> Starlette:
+    """
+    Build the ASGI app.
+
+    The worker pool starts with the app, jobs left unfinished by a
+    previous run are resubmitted, and jobs queued for budget are admitted
+    again in the background.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        service = JobService(store or JobStore(), pool or WarmCrewPool())
+        app.state.jobs = service
+        await run_in_threadpool(service.resume)
+        service.start()
+        get_retention_manager().start()
+        try:
+            yield
+        finally:
+            service.stop()
+            await run_in_threadpool(service.pool.shutdown, False)
+
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/jobs", create_jobs, methods=["POST"]),
+            Route("/jobs", list_jobs, methods=["GET"]),
+            Route("/jobs/{job_id}", get_job, name="job"),
+            Route("/jobs/{job_id}/events", job_events),
+            Route("/jobs/{job_id}/artifacts/{name}", get_artifact),
+        ],
+        lifespan=lifespan
+    )
+
+
+def main():
+    """Serve the job API with uvicorn."""
+    import uvicorn
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    configure_logging()
+    uvicorn.run(create_app(), host=os.getenv("API_HOST", "127.0.0.1"), port=int(os.getenv("API_PORT", "8000")))
+
+
+if __name__ == "__main__":
+    main()
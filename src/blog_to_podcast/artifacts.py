@@ -0,0 +1,101 @@
+"""
+Artifact store for passing bulk text between tools by reference.
+
+When a tool returns a whole article or script, the agent LLM has to copy it
+into the next tool call as an argument. That means thousands of output
+tokens, minutes of latency and a chance the text comes back truncated or
+"improved". Instead, crew tools store their output here and return a short
+handle such as ``artifact:script:3f9a2c1b7d4e5f60``; the next tool receives
+the handle and loads the text itself, so agents never re-emit bulk text.
+
+Artifacts are content-addressed (the handle ends with a SHA-256 prefix of
+the text), written atomically and immutable, so a handle always refers to
+exactly the text that was stored. The store directory is managed by
+retention like the other legacy output folders.
+
+Configuration (environment variables):
+    ARTIFACTS_DIR   Store directory (default: output/artifacts)
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Optional
+
+from blog_to_podcast.retention import record_access
+from blog_to_podcast.workspace import atomic_write_text
+
+DEFAULT_ARTIFACTS_DIR = os.path.join("output", "artifacts")
+
+HANDLE_PATTERN = re.compile(r"\bartifact:([a-z_]+):([0-9a-f]{16})\b")
+# Longer inputs are treated as literal text, even if they mention a handle
+MAX_HANDLE_INPUT_CHARS = 500
+
+
+class ArtifactError(Exception):
+    """A handle that does not name a stored artifact."""
+
+
+def find_handle(text: str) -> Optional[str]:
+    """The first artifact handle in a short text, e.g. a tool argument or task output."""
+    if not text or len(text) > MAX_HANDLE_INPUT_CHARS:
+        return None
+    match = HANDLE_PATTERN.search(text)
+    return match.group(0) if match else None
+
+
+class ArtifactStore:
+    """
+    Content-addressed text artifacts on disk.
+
+    Args:
+        directory: Store directory (default: ARTIFACTS_DIR or output/artifacts)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("ARTIFACTS_DIR", DEFAULT_ARTIFACTS_DIR)
+
+    def path(self, handle: str) -> str:
+        match = HANDLE_PATTERN.fullmatch(handle.strip())
+        if not match:
+            raise ArtifactError(f"not an artifact handle: {handle[:80]!r}")
+        kind, digest = match.groups()
+        return os.path.join(self.directory, f"{kind}_{digest}.txt")
+
+    def put(self, text: str, kind: str) -> str:
+        """Store text and return its handle (storing the same text twice is free)."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        handle = f"artifact:{kind}:{digest}"
+        path = self.path(handle)
+        if not os.path.exists(path):
+            atomic_write_text(path, text)
+        return handle
+
+    def get(self, handle: str) -> str:
+        path = self.path(handle)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            raise ArtifactError(f"artifact not found: {handle}") from None
+        record_access(path)
+        return text
+
+    def resolve(self, value: str) -> str:
+        """Load the artifact a value refers to, or return the value itself when it is plain text."""
+        handle = find_handle(value)
+        return self.get(handle) if handle else value
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide artifact store configured from the environment."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
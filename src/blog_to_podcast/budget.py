@@ -0,0 +1,706 @@
+"""
+Cost ledger and budget-aware admission control.
+
+AudioGenerator used to report an "estimated cost" only after the money was
+spent, and nothing limited what a batch or a user could consume. This
+module keeps a ledger of actual spend per run and stage, estimates a run's
+cost before it starts, and admits, downgrades, queues or rejects it
+against the configured budgets:
+
+- Actual spend is recorded where it happens: chat usage (prompt and
+  completion tokens, including the crew agents' tokens), TTS characters and
+  Firecrawl calls, priced with the tables below
+- Admission estimates a whole run (worst case: the full completion token
+  limit, a Firecrawl fallback) and reserves that amount against every
+  budget the run counts towards: the daily budget, the user's daily budget
+  and the batch budget. Spend consumes the reservation, and whatever is
+  left is released when the run ends
+- A run that does not fit is tried with cheaper plans (the
+  BUDGET_DOWNGRADE_* model, TTS model and speech engine). If even the
+  cheapest plan only fits once in-flight reservations are released, it is
+  queued; otherwise it is rejected
+- Before each stage runs, its estimate from the actual inputs (article and
+  script length) is checked against the run's reservation; a stage that
+  needs more is only started when the budgets have room for the difference
+
+Checks are cheap enough for every request: admitting a whole API batch is
+one SQLite transaction reading at most three ``totals`` rows, a run with no
+budgets configured is admitted without touching the database, and stage
+checks are in-memory comparisons until a stage outgrows its reservation.
+
+Usage:
+    python -m blog_to_podcast.budget status [--user USER] [--batch BATCH_ID]
+    python -m blog_to_podcast.budget run <run_id>
+
+Configuration (environment variables):
+    BUDGET_DB_PATH                  Ledger database (default: output/index/budget.db)
+    BUDGET_DAILY                    USD per UTC day across all runs (default: none)
+    BUDGET_USER_DAILY               USD per user per UTC day (default: none)
+    BUDGET_BATCH                    USD per batch (default: none)
+    BUDGET_DOWNGRADE_MODEL          Cheaper script model (default: gpt-4o-mini)
+    BUDGET_DOWNGRADE_TTS_MODEL      Cheaper OpenAI TTS model (default: tts-1)
+    BUDGET_DOWNGRADE_TTS_BACKEND    Local speech engine as the last downgrade,
+                                    e.g. piper (default: none)
+    BUDGET_QUEUE_TIMEOUT            Seconds a direct conversion waits while queued (default: 600)
+    BUDGET_QUEUE_POLL               Seconds between admission retries of queued runs (default: 5)
+    BUDGET_CHAT_PRICES              JSON price overrides, {"model": [input, output]} in USD
+                                    per 1M tokens
+    FIRECRAWL_COST_PER_CALL         USD per Firecrawl scrape (default: 0.001)
+"""
+
+import argparse
+import contextvars
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUDGET_PATH = os.path.join("output", "index", "budget.db")
+
+# USD per 1M tokens (input, output); unknown hosted models are priced as DEFAULT_CHAT_MODEL
+CHAT_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+DEFAULT_CHAT_MODEL = "gpt-4o"
+# USD per 1K characters for OpenAI TTS; local engines are free
+TTS_PRICES = {"tts-1": 0.015, "tts-1-hd": 0.030, "gpt-4o-mini-tts": 0.015}
+
+# Estimates used before the article or script is known
+DEFAULT_ARTICLE_CHARS = 12000
+CHARS_PER_TOKEN = 4
+PROMPT_OVERHEAD_TOKENS = 350
+# Crew agents' own LLM usage per conversion (prompt, completion tokens)
+AGENT_TOKENS = (6000, 600)
+
+# Which stage a recording belongs to when the caller does not say
+_DEFAULT_STAGES = {"chat": "script", "tts": "audio", "firecrawl": "scrape"}
+
+
+class BudgetExceeded(Exception):
+    """A run or stage does not fit the remaining budget."""
+
+
+class BudgetDeferred(Exception):
+    """A queued run is still waiting for budget."""
+
+
+@dataclass
+class Plan:
+    """What a run may spend money on: its script model, TTS model and speech engine."""
+    model: str
+    tts_model: str
+    tts_backend: str
+
+
+@dataclass
+class Decision:
+    """
+    The outcome of admitting one run.
+
+    ``action`` is accept, downgrade (admitted with a cheaper plan), queue
+    (retry later) or reject.
+    """
+    ticket: str
+    action: str
+    plan: Plan
+    estimate: float
+    user: Optional[str] = None
+    batch_id: Optional[str] = None
+    day: str = ""
+    reason: str = ""
+
+    @property
+    def admitted(self) -> bool:
+        return self.action in ("accept", "downgrade")
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Decision":
+        return cls(**{**data, "plan": Plan(**data["plan"])})
+
+
+def today() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+def _limit(name: str) -> float:
+    return float(os.getenv(name, "0") or 0)
+
+
+def scopes(user: Optional[str], batch_id: Optional[str], day: str) -> List[Tuple[str, float]]:
+    """The budgets a run counts towards, as (scope key, limit); a limit of 0 means none."""
+    result = [(f"day:{day}", _limit("BUDGET_DAILY"))]
+    if user:
+        result.append((f"user:{user}:{day}", _limit("BUDGET_USER_DAILY")))
+    if batch_id:
+        result.append((f"batch:{batch_id}", _limit("BUDGET_BATCH")))
+    return result
+
+
+def chat_prices() -> Dict[str, Tuple[float, float]]:
+    prices = dict(CHAT_PRICES)
+    overrides = os.getenv("BUDGET_CHAT_PRICES")
+    if overrides:
+        prices.update({model: tuple(price) for model, price in json.loads(overrides).items()})
+    return prices
+
+
+def chat_cost(model: str, prompt_tokens: float, completion_tokens: float, local: bool = False) -> float:
+    """Price of a chat request; self-hosted endpoints are free."""
+    if local:
+        return 0.0
+    prices = chat_prices()
+    name = model.split("/")[-1]
+    # Dated snapshots (gpt-4o-2024-08-06) are priced as their family
+    family = next((key for key in sorted(prices, key=len, reverse=True) if name.startswith(key)), None)
+    input_price, output_price = prices[family] if family else prices.get(DEFAULT_CHAT_MODEL, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def tts_cost(characters: float, backend: str, tts_model: Optional[str] = None) -> float:
+    """Price of synthesizing characters; only the OpenAI backend is billed."""
+    if backend != "openai":
+        return 0.0
+    return characters / 1000 * TTS_PRICES.get(tts_model or "tts-1", TTS_PRICES["tts-1"])
+
+
+def firecrawl_cost(calls: int = 1) -> float:
+    return calls * float(os.getenv("FIRECRAWL_COST_PER_CALL", "0.001"))
+
+
+def _script_settings() -> Tuple[int, bool]:
+    """Completion token limit and whether the script endpoint is self-hosted."""
+    from blog_to_podcast import llm_backend
+    settings = llm_backend.llm_settings()
+    return settings["params"]["max_tokens"], settings["base_url"] is not None
+
+
+def estimate_script(content_chars: Optional[int], model: str) -> float:
+    """Worst-case cost of writing a script: the whole completion token limit."""
+    max_tokens, local = _script_settings()
+    prompt_tokens = (content_chars or DEFAULT_ARTICLE_CHARS) / CHARS_PER_TOKEN + PROMPT_OVERHEAD_TOKENS
+    return chat_cost(model, prompt_tokens, max_tokens, local)
+
+
+def estimate_run(plan: Plan, crew: bool = False, languages: int = 1) -> Dict[str, float]:
+    """
+    Estimated cost of a run by stage, before anything is known about the post.
+
+    Args:
+        plan: The plan the run would use
+        crew: Include the crew agents' own LLM usage
+        languages: Languages produced from the script (fan-out translates all but one)
+    """
+    max_tokens, local = _script_settings()
+    script_chars = max_tokens * CHARS_PER_TOKEN
+    stages = {
+        "scrape": 0.0 if os.getenv("SCRAPE_ENGINE", "auto").lower() == "local" else firecrawl_cost(),
+        "script": estimate_script(None, plan.model),
+        "audio": tts_cost(script_chars, plan.tts_backend, plan.tts_model) * languages,
+    }
+    if languages > 1:
+        stages["translate"] = chat_cost(plan.model, max_tokens, max_tokens, local) * (languages - 1)
+    if crew:
+        stages["agents"] = chat_cost(agent_model(), *AGENT_TOKENS)
+    return stages
+
+
+def agent_model() -> str:
+    from blog_to_podcast import llm_backend
+    return os.getenv("MODEL") or llm_backend.DEFAULT_MODEL
+
+
+def base_plan(voice: str = "alloy", tts_backend: Optional[str] = None) -> Plan:
+    """The plan a run uses when it fits its budgets."""
+    from blog_to_podcast import llm_backend
+    from blog_to_podcast.tts_backends import select_backend, tts_settings
+    return Plan(
+        model=llm_backend.llm_settings()["model"],
+        tts_model=tts_settings()["model"],
+        tts_backend=select_backend(voice, tts_backend).name
+    )
+
+
+def plan_ladder(base: Plan) -> List[Plan]:
+    """The base plan followed by successively cheaper ones."""
+    plans = [base]
+    _, local = _script_settings()
+    cheaper_model = os.getenv("BUDGET_DOWNGRADE_MODEL", "gpt-4o-mini")
+    # A self-hosted endpoint is free and may not serve the cheaper model
+    if cheaper_model and not local and cheaper_model != base.model:
+        plans.append(replace(plans[-1], model=cheaper_model))
+    cheaper_tts = os.getenv("BUDGET_DOWNGRADE_TTS_MODEL", "tts-1")
+    if cheaper_tts and base.tts_backend == "openai" and cheaper_tts != base.tts_model:
+        plans.append(replace(plans[-1], tts_model=cheaper_tts))
+    local_backend = os.getenv("BUDGET_DOWNGRADE_TTS_BACKEND")
+    if local_backend and local_backend != base.tts_backend:
+        plans.append(replace(plans[-1], tts_backend=local_backend))
+    return plans
+
+
+class CostLedger:
+    """
+    SQLite ledger of actual spend, running totals per budget and reservations.
+
+    Args:
+        path: SQLite database path (default: BUDGET_DB_PATH or output/index/budget.db)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BUDGET_DB_PATH", DEFAULT_BUDGET_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._transaction() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS spend (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ticket TEXT NOT NULL,
+                    run_id TEXT,
+                    stage TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    model TEXT,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    characters INTEGER NOT NULL DEFAULT 0,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    cost REAL NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS totals (
+                    scope TEXT PRIMARY KEY,
+                    spent REAL NOT NULL DEFAULT 0,
+                    reserved REAL NOT NULL DEFAULT 0
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS reservations (
+                    ticket TEXT PRIMARY KEY,
+                    user TEXT,
+                    batch_id TEXT,
+                    day TEXT NOT NULL,
+                    reserved REAL NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS spend_run ON spend (run_id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS spend_ticket ON spend (ticket)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit mode: transactions are opened explicitly below
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction taking the database lock up front, so concurrent admissions never overbook."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _totals(connection: sqlite3.Connection, keys: List[str]) -> Dict[str, List[float]]:
+        rows = connection.execute(
+            f"SELECT scope, spent, reserved FROM totals WHERE scope IN ({','.join('?' * len(keys))})", keys
+        ).fetchall()
+        totals = {key: [0.0, 0.0] for key in keys}
+        totals.update({row["scope"]: [row["spent"], row["reserved"]] for row in rows})
+        return totals
+
+    @staticmethod
+    def _add_totals(connection: sqlite3.Connection, changes: Dict[str, Tuple[float, float]]):
+        connection.executemany(
+            "INSERT INTO totals (scope, spent, reserved) VALUES (?, ?, ?) ON CONFLICT (scope) DO UPDATE SET "
+            "spent = spent + excluded.spent, reserved = MAX(0, reserved + excluded.reserved)",
+            [(scope, spent, reserved) for scope, (spent, reserved) in changes.items()]
+        )
+
+    def admit(self, tickets: List[str], plans: List[Tuple[Plan, float]], user: Optional[str] = None,
+              batch_id: Optional[str] = None, day: Optional[str] = None) -> List[Decision]:
+        """
+        Admit runs in order, reserving the estimate of the plan each one gets.
+
+        Args:
+            tickets: One ID per run (job ID or run ID)
+            plans: (plan, estimated cost) from the base plan to the cheapest
+            user: User the runs are charged to
+            batch_id: Batch the runs belong to
+
+        Returns:
+            One Decision per ticket
+        """
+        day = day or today()
+        run_scopes = scopes(user, batch_id, day)
+        limited = [(key, limit) for key, limit in run_scopes if limit > 0]
+        cheapest_plan, cheapest = plans[-1]
+        if not limited:
+            plan, estimate = plans[0]
+            return [Decision(ticket, "accept", plan, estimate, user, batch_id, day) for ticket in tickets]
+
+        decisions = []
+        with self._transaction() as connection:
+            totals = self._totals(connection, [key for key, _ in limited])
+            reserved = {key: 0.0 for key, _ in limited}
+            admitted_total = 0.0
+            for ticket in tickets:
+                for rank, (plan, estimate) in enumerate(plans):
+                    if all(sum(totals[key]) + reserved[key] + estimate <= limit for key, limit in limited):
+                        for key in reserved:
+                            reserved[key] += estimate
+                        admitted_total += estimate
+                        decisions.append(Decision(ticket, "downgrade" if rank else "accept", plan, estimate,
+                                                  user, batch_id, day))
+                        break
+                else:
+                    # Rejected when spend alone leaves no room; queued when
+                    # only reservations of runs in flight are in the way
+                    exhausted = [(key, limit) for key, limit in limited if totals[key][0] + cheapest > limit]
+                    if exhausted:
+                        key, limit = exhausted[0]
+                        decisions.append(Decision(
+                            ticket, "reject", cheapest_plan, cheapest, user, batch_id, day,
+                            f"{key} has ${max(0.0, limit - totals[key][0]):.4f} left of ${limit:.2f}; "
+                            f"the cheapest plan needs ${cheapest:.4f}"
+                        ))
+                    else:
+                        key, limit = next((key, limit) for key, limit in limited
+                                          if sum(totals[key]) + reserved[key] + cheapest > limit)
+                        decisions.append(Decision(
+                            ticket, "queue", cheapest_plan, cheapest, user, batch_id, day,
+                            f"{key} is reserved by runs in flight (limit ${limit:.2f})"
+                        ))
+
+            admitted = [decision for decision in decisions if decision.admitted]
+            if admitted:
+                now = time.time()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO reservations (ticket, user, batch_id, day, reserved, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(d.ticket, user, batch_id, day, d.estimate, now) for d in admitted]
+                )
+                self._add_totals(connection, {key: (0.0, admitted_total) for key, _ in run_scopes})
+        return decisions
+
+    def reserved(self, ticket: str) -> float:
+        row = self._connection().execute("SELECT reserved FROM reservations WHERE ticket = ?", (ticket,)).fetchone()
+        return row["reserved"] if row else 0.0
+
+    def reserve_more(self, decision: Decision, amount: float, stage: str) -> float:
+        """
+        Grow a run's reservation by amount if every budget has room.
+
+        Returns:
+            The run's reservation afterwards
+
+        Raises:
+            BudgetExceeded: If a budget cannot cover the amount
+        """
+        run_scopes = scopes(decision.user, decision.batch_id, decision.day)
+        limited = [(key, limit) for key, limit in run_scopes if limit > 0]
+        with self._transaction() as connection:
+            totals = self._totals(connection, [key for key, _ in limited])
+            for key, limit in limited:
+                if sum(totals[key]) + amount > limit:
+                    raise BudgetExceeded(
+                        f"Budget exceeded: the {stage} stage needs ${amount:.4f} more than reserved, and {key} has "
+                        f"${max(0.0, limit - sum(totals[key])):.4f} left of ${limit:.2f}"
+                    )
+            connection.execute(
+                "INSERT INTO reservations (ticket, user, batch_id, day, reserved, created) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (ticket) DO UPDATE SET reserved = reserved + excluded.reserved",
+                (decision.ticket, decision.user, decision.batch_id, decision.day, amount, time.time())
+            )
+            self._add_totals(connection, {key: (0.0, amount) for key, _ in run_scopes})
+            return connection.execute(
+                "SELECT reserved FROM reservations WHERE ticket = ?", (decision.ticket,)
+            ).fetchone()["reserved"]
+
+    def record(self, decision: Decision, run_id: Optional[str], stage: str, kind: str, cost: float,
+               model: Optional[str] = None, prompt_tokens: int = 0, completion_tokens: int = 0,
+               characters: int = 0, calls: int = 0) -> float:
+        """
+        Record actual spend, consuming the run's reservation first.
+
+        Returns:
+            The part of the reservation this spend consumed
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO spend (ticket, run_id, stage, kind, model, prompt_tokens, completion_tokens, "
+                "characters, calls, cost, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (decision.ticket, run_id, stage, kind, model, prompt_tokens, completion_tokens, characters, calls,
+                 cost, time.time())
+            )
+            row = connection.execute(
+                "SELECT reserved FROM reservations WHERE ticket = ?", (decision.ticket,)
+            ).fetchone()
+            consumed = min(cost, row["reserved"]) if row else 0.0
+            if consumed:
+                connection.execute(
+                    "UPDATE reservations SET reserved = reserved - ? WHERE ticket = ?", (consumed, decision.ticket)
+                )
+            self._add_totals(connection, {key: (cost, -consumed)
+                                          for key, _ in scopes(decision.user, decision.batch_id, decision.day)})
+        return consumed
+
+    def settle(self, ticket: str):
+        """Release what is left of a finished (or failed) run's reservation."""
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT user, batch_id, day, reserved FROM reservations WHERE ticket = ?", (ticket,)
+            ).fetchone()
+            if row is None:
+                return
+            connection.execute("DELETE FROM reservations WHERE ticket = ?", (ticket,))
+            if row["reserved"]:
+                self._add_totals(connection, {key: (0.0, -row["reserved"])
+                                              for key, _ in scopes(row["user"], row["batch_id"], row["day"])})
+
+    def usage(self, user: Optional[str] = None, batch_id: Optional[str] = None,
+              day: Optional[str] = None) -> List[Dict]:
+        """Spent, reserved and limit of the budgets a run of user/batch_id counts towards."""
+        keys = scopes(user, batch_id, day or today())
+        totals = self._totals(self._connection(), [key for key, _ in keys])
+        return [{"scope": key, "spent": totals[key][0], "reserved": totals[key][1], "limit": limit or None}
+                for key, limit in keys]
+
+    def run_spend(self, run_id: str) -> List[Dict]:
+        """Actual spend of a run by stage and kind."""
+        rows = self._connection().execute(
+            "SELECT stage, kind, SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens, "
+            "SUM(characters) AS characters, SUM(calls) AS calls, SUM(cost) AS cost "
+            "FROM spend WHERE run_id = ? GROUP BY stage, kind ORDER BY MIN(id)", (run_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_ledger: Optional[CostLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> CostLedger:
+    """Process-wide cost ledger configured from the environment."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CostLedger()
+        return _ledger
+
+
+def admit(tickets: List[str], voice: str = "alloy", tts_backend: Optional[str] = None,
+          user: Optional[str] = None, batch_id: Optional[str] = None, crew: bool = False,
+          languages: int = 1) -> List[Decision]:
+    """
+    Admit runs that share voice, engine, user and batch (e.g. an API batch) in one transaction.
+
+    Only plans cheaper than the previous one are tried as downgrades.
+    """
+    plans = []
+    for plan in plan_ladder(base_plan(voice, tts_backend)):
+        estimate = sum(estimate_run(plan, crew, languages).values())
+        if not plans or estimate < plans[-1][1]:
+            plans.append((plan, estimate))
+    return get_ledger().admit(tickets, plans, user, batch_id)
+
+
+def admit_one(ticket: str, voice: str = "alloy", tts_backend: Optional[str] = None,
+              user: Optional[str] = None, batch_id: Optional[str] = None, crew: bool = False,
+              languages: int = 1, wait: bool = False) -> Decision:
+    """
+    Admit one run; with wait, a queued run is retried until admitted,
+    rejected or BUDGET_QUEUE_TIMEOUT passes (then it is rejected).
+    """
+    deadline = time.monotonic() + float(os.getenv("BUDGET_QUEUE_TIMEOUT", "600"))
+    while True:
+        decision = admit([ticket], voice, tts_backend, user, batch_id, crew, languages)[0]
+        if decision.action != "queue" or not wait:
+            return decision
+        if time.monotonic() > deadline:
+            return replace(decision, action="reject", reason=f"still queued for budget: {decision.reason}")
+        time.sleep(float(os.getenv("BUDGET_QUEUE_POLL", "5")))
+
+
+class RunBudget:
+    """The admitted run whose spend is being recorded, with its reservation cached."""
+
+    def __init__(self, ledger: CostLedger, decision: Decision, run_id: Optional[str]):
+        self.ledger = ledger
+        self.decision = decision
+        self.run_id = run_id
+        self.limited = any(limit > 0 for _, limit in scopes(decision.user, decision.batch_id, decision.day))
+        self._lock = threading.Lock()
+        self._reserved: Optional[float] = None
+
+    def check(self, stage: str, estimate: float):
+        """Make sure the reservation covers a stage about to run."""
+        if not self.limited:
+            return
+        with self._lock:
+            if self._reserved is None:
+                self._reserved = self.ledger.reserved(self.decision.ticket)
+            if estimate > self._reserved:
+                self._reserved = self.ledger.reserve_more(self.decision, estimate - self._reserved, stage)
+
+    def record(self, stage: str, kind: str, cost: float, **quantities):
+        consumed = self.ledger.record(self.decision, self.run_id, stage, kind, cost, **quantities)
+        with self._lock:
+            if self._reserved is not None:
+                self._reserved -= consumed
+
+
+_current_run: contextvars.ContextVar[Optional[RunBudget]] = contextvars.ContextVar("current_run_budget", default=None)
+_current_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_budget_stage", default=None)
+
+
+@contextmanager
+def metered(decision: Decision, run_id: Optional[str] = None, settle: bool = True) -> Iterator[RunBudget]:
+    """
+    Record the spend of code run inside the block against an admitted run.
+
+    Args:
+        decision: The run's admission decision
+        run_id: The run's workspace ID (spend is reported per run)
+        settle: Release the rest of the reservation afterwards (False when
+            later stages of the run still follow, e.g. in the stage queue)
+    """
+    run_budget = RunBudget(get_ledger(), decision, run_id)
+    token = _current_run.set(run_budget)
+    try:
+        yield run_budget
+    finally:
+        _current_run.reset(token)
+        if settle:
+            run_budget.ledger.settle(decision.ticket)
+
+
+@contextmanager
+def admitted(run_id: str, voice: str = "alloy", tts_backend: Optional[str] = None, user: Optional[str] = None,
+             batch_id: Optional[str] = None, crew: bool = False, languages: int = 1,
+             decision: Optional[Decision] = None) -> Iterator[Decision]:
+    """
+    Admit a run (waiting while it is queued) and meter it until the block ends.
+
+    Pass a decision made earlier (e.g. by the API) to skip admission.
+
+    Raises:
+        BudgetExceeded: If the run is rejected
+    """
+    decision = decision or admit_one(run_id, voice, tts_backend, user, batch_id, crew, languages, wait=True)
+    if not decision.admitted:
+        raise BudgetExceeded(f"Budget exceeded: {decision.reason}")
+    with metered(decision, run_id):
+        yield decision
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Attribute spend inside the block to a stage (e.g. "translate")."""
+    token = _current_stage.set(name)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def current_plan() -> Optional[Plan]:
+    """The plan of the run being metered, if any."""
+    run_budget = _current_run.get()
+    return run_budget.decision.plan if run_budget else None
+
+
+def check_stage(stage_name: str, estimate: float):
+    """
+    Check a stage's estimate against the current run's budget before spending.
+
+    Raises:
+        BudgetExceeded: If the budgets cannot cover the stage
+    """
+    run_budget = _current_run.get()
+    if run_budget:
+        run_budget.check(_current_stage.get() or stage_name, estimate)
+
+
+def _record(kind: str, cost: float, stage_name: Optional[str] = None, **quantities):
+    run_budget = _current_run.get()
+    if run_budget:
+        run_budget.record(stage_name or _current_stage.get() or _DEFAULT_STAGES[kind], kind, cost, **quantities)
+
+
+def record_chat(model: str, prompt_tokens: int, completion_tokens: int, local: bool = False,
+                stage_name: Optional[str] = None):
+    _record("chat", chat_cost(model, prompt_tokens, completion_tokens, local), stage_name, model=model,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def record_tts(backend: str, tts_model: Optional[str], characters: int):
+    _record("tts", tts_cost(characters, backend, tts_model), model=tts_model if backend == "openai" else backend,
+            characters=characters)
+
+
+def record_firecrawl(calls: int = 1):
+    _record("firecrawl", firecrawl_cost(calls), calls=calls)
+
+
+def record_crew_usage(result):
+    """Record the crew agents' own token usage from a kickoff result."""
+    usage = getattr(result, "token_usage", None)
+    if usage and (usage.prompt_tokens or usage.completion_tokens):
+        record_chat(agent_model(), usage.prompt_tokens, usage.completion_tokens, stage_name="agents")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost ledger and budgets")
+    commands = parser.add_subparsers(dest="command", required=True)
+    status = commands.add_parser("status", help="Spend, reservations and limits of today's budgets")
+    status.add_argument("--user")
+    status.add_argument("--batch")
+    run = commands.add_parser("run", help="Actual spend of a run by stage")
+    run.add_argument("run_id")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    ledger = get_ledger()
+
+    if args.command == "status":
+        print(f"{'budget':<48}{'spent':>10}{'reserved':>10}{'limit':>10}")
+        for row in ledger.usage(args.user, args.batch):
+            limit = f"${row['limit']:.2f}" if row["limit"] else "none"
+            print(f"{row['scope']:<48}{'$' + format(row['spent'], '.4f'):>10}"
+                  f"{'$' + format(row['reserved'], '.4f'):>10}{limit:>10}")
+    else:
+        rows = ledger.run_spend(args.run_id)
+        print(f"{'stage':<10}{'kind':<11}{'tokens in/out':>16}{'chars':>9}{'calls':>7}{'cost':>10}")
+        for row in rows:
+            tokens = f"{row['prompt_tokens']}/{row['completion_tokens']}" if row["kind"] == "chat" else "-"
+            print(f"{row['stage']:<10}{row['kind']:<11}{tokens:>16}{row['characters'] or '-':>9}"
+                  f"{row['calls'] or '-':>7}{'$' + format(row['cost'], '.4f'):>10}")
+        print(f"Total: ${sum(row['cost'] for row in rows):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Whole-blog crawl mode.
+
+Starting from a blog root or sitemap, post URLs are discovered and handed to
+the warm worker pool as soon as they are found, so conversion overlaps with
+discovery. Discovery prefers sitemaps (the given one, or those listed in
+robots.txt / at ``/sitemap.xml``) and falls back to a breadth-first crawl of
+same-host links up to a depth limit. URLs are normalized and deduplicated,
+and filtered by include/exclude regular expressions.
+
+Crawl state lives in SQLite (``output/index/crawl.db``): every discovered
+URL with its status, sitemap ``lastmod`` and run ID. Re-running a crawl
+resumes unfinished URLs and skips converted ones unless their ``lastmod``
+changed, so large archives can be resumed and refreshed incrementally.
+"""
+
+import datetime
+import gzip
+import os
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ElementTree
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from blog_to_podcast.http_pool import HostPool, get_http_pool
+
+DEFAULT_STATE_PATH = os.path.join("output", "index", "crawl.db")
+
+# Listing, taxonomy and asset URLs that are never posts
+DEFAULT_EXCLUDES = [
+    r"/(tag|tags|category|categories|author|authors|page|archive|archives|search|feed|rss|comments)(/|$)",
+    r"/wp-(admin|content|json|login)",
+    r"\.(xml|rss|atom|json|jpg|jpeg|png|gif|svg|webp|css|js|pdf|zip|mp3|mp4)$",
+    r"[?&](replytocom|share)=",
+]
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref|mc_cid|mc_eid)$", re.I)
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for deduplication: no fragment or tracking params, lowercase host."""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not _TRACKING_PARAMS.match(k)])
+    path = parts.path or "/"
+    if path != "/" and path.endswith("/"):
+        path = path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+
+@dataclass
+class CrawlFilter:
+    """Include/exclude patterns deciding which discovered URLs are posts."""
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._include = [re.compile(p) for p in self.include]
+        self._exclude = [re.compile(p, re.I) for p in DEFAULT_EXCLUDES + self.exclude]
+
+    def is_post(self, url: str, root: str) -> bool:
+        if normalize_url(url) == normalize_url(root) or urlsplit(url).path in ("", "/"):
+            return False
+        if any(p.search(url) for p in self._exclude):
+            return False
+        return not self._include or any(p.search(url) for p in self._include)
+
+
+class CrawlState:
+    """SQLite record of discovered URLs per crawl root, for resume and refresh."""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    root TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    depth INTEGER NOT NULL,
+                    lastmod TEXT,
+                    converted_lastmod TEXT,
+                    status TEXT NOT NULL,
+                    run_id TEXT,
+                    error TEXT,
+                    discovered TEXT NOT NULL,
+                    updated TEXT NOT NULL,
+                    PRIMARY KEY (root, url)
+                );
+                CREATE INDEX IF NOT EXISTS urls_status ON urls (root, status);
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def record(self, root: str, url: str, depth: int, lastmod: Optional[str]) -> bool:
+        """
+        Record a discovered URL.
+
+        Returns:
+            True when the URL needs converting: it is new, unfinished from an
+            earlier crawl, or its lastmod changed since it was converted.
+            False for converted URLs and for URLs already queued, which are
+            left untouched
+        """
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            row = connection.execute(
+                "SELECT status, converted_lastmod FROM urls WHERE root = ? AND url = ?", (root, url)
+            ).fetchone()
+            if row is None:
+                connection.execute(
+                    "INSERT INTO urls (root, url, depth, lastmod, status, discovered, updated) "
+                    "VALUES (?, ?, ?, ?, 'pending', ?, ?)", (root, url, depth, lastmod, now, now)
+                )
+                return True
+            status, converted_lastmod = row
+            if status == "queued":
+                # In flight; its outcome decides the status
+                return False
+            if status == "converted" and (not lastmod or lastmod == converted_lastmod):
+                return False
+            connection.execute(
+                "UPDATE urls SET lastmod = ?, status = 'pending', updated = ? WHERE root = ? AND url = ?",
+                (lastmod, now, root, url)
+            )
+            return True
+
+    def mark(self, root: str, url: str, status: str, run_id: Optional[str] = None, error: Optional[str] = None):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "UPDATE urls SET status = ?, run_id = COALESCE(?, run_id), error = ?, updated = ?, "
+                "converted_lastmod = CASE WHEN ? = 'converted' THEN lastmod ELSE converted_lastmod END "
+                "WHERE root = ? AND url = ?",
+                (status, run_id, error, datetime.datetime.now().isoformat(), status, root, url)
+            )
+
+    def unfinished(self, root: str) -> List[Tuple[str, int]]:
+        """URLs discovered earlier but not yet converted (pending, queued or failed)."""
+        return self._connection().execute(
+            "SELECT url, depth FROM urls WHERE root = ? AND status != 'converted' ORDER BY discovered", (root,)
+        ).fetchall()
+
+    def counts(self, root: str) -> Dict[str, int]:
+        return dict(self._connection().execute(
+            "SELECT status, COUNT(*) FROM urls WHERE root = ? GROUP BY status", (root,)
+        ).fetchall())
+
+
+class Crawler:
+    """
+    Discover post URLs under a blog root.
+
+    Args:
+        root: Blog root URL or sitemap URL
+        url_filter: Include/exclude patterns
+        max_depth: Link depth for the breadth-first fallback (root is 0)
+        max_pages: Stop after this many pages have been fetched for discovery
+        http: Host pool used for fetching (politeness limits apply)
+    """
+
+    def __init__(self, root: str, url_filter: Optional[CrawlFilter] = None, max_depth: int = 3,
+                 max_pages: int = 5000, http: Optional[HostPool] = None):
+        self.root = normalize_url(root)
+        self.filter = url_filter or CrawlFilter()
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.http = http or get_http_pool()
+        self._host = urlsplit(self.root).netloc
+        self._pages_fetched = 0
+
+    def _get(self, url: str) -> Optional[str]:
+        if self._pages_fetched >= self.max_pages:
+            return None
+        self._pages_fetched += 1
+        try:
+            response = self.http.get(url)
+        except Exception:
+            return None
+        if response.status_code != 200:
+            return None
+        if url.endswith(".gz") or response.headers.get("Content-Type", "").endswith("gzip"):
+            try:
+                return gzip.decompress(response.content).decode("utf-8", "replace")
+            except OSError:
+                pass
+        return response.text
+
+    def _sitemap_urls(self) -> List[str]:
+        if re.search(r"sitemap[^/]*\.xml(\.gz)?$", self.root, re.I):
+            return [self.root]
+        parts = urlsplit(self.root)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        robots = self._get(f"{origin}/robots.txt") or ""
+        listed = [line.split(":", 1)[1].strip() for line in robots.splitlines()
+                  if line.lower().startswith("sitemap:")]
+        return listed or [f"{origin}/sitemap.xml"]
+
+    def _walk_sitemap(self, url: str, seen: set) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yield (url, lastmod) from a sitemap or sitemap index, recursively."""
+        if url in seen:
+            return
+        seen.add(url)
+        text = self._get(url)
+        if not text:
+            return
+        try:
+            tree = ElementTree.fromstring(text.encode("utf-8"))
+        except ElementTree.ParseError:
+            return
+        tag = tree.tag.replace(_SITEMAP_NS, "")
+        for entry in tree:
+            loc = entry.findtext(f"{_SITEMAP_NS}loc") or entry.findtext("loc")
+            if not loc:
+                continue
+            lastmod = entry.findtext(f"{_SITEMAP_NS}lastmod") or entry.findtext("lastmod")
+            if tag == "sitemapindex":
+                yield from self._walk_sitemap(loc.strip(), seen)
+            else:
+                yield loc.strip(), lastmod.strip() if lastmod else None
+
+    def _breadth_first(self) -> Iterator[Tuple[str, int]]:
+        """Yield (url, depth) for same-host links, breadth-first from the root."""
+        queue = deque([(self.root, 0)])
+        visited = {self.root}
+        while queue:
+            url, depth = queue.popleft()
+            yield url, depth
+            if depth >= self.max_depth:
+                continue
+            html = self._get(url)
+            if not html:
+                continue
+            parser = _LinkParser()
+            parser.feed(html)
+            for href in parser.links:
+                link = normalize_url(urljoin(url, href))
+                if urlsplit(link).netloc != self._host or not link.startswith(("http://", "https://")):
+                    continue
+                if link not in visited:
+                    visited.add(link)
+                    queue.append((link, depth + 1))
+
+    def discover(self) -> Iterator[Tuple[str, int, Optional[str]]]:
+        """
+        Yield (url, depth, lastmod) for each post URL, as soon as it is found.
+
+        Sitemaps are used when they list any posts; otherwise links are
+        followed from the root.
+        """
+        found = set()
+        seen_sitemaps = set()
+        for sitemap in self._sitemap_urls():
+            for url, lastmod in self._walk_sitemap(sitemap, seen_sitemaps):
+                url = normalize_url(url)
+                if url not in found and self.filter.is_post(url, self.root):
+                    found.add(url)
+                    yield url, 0, lastmod
+        if found:
+            return
+
+        for url, depth in self._breadth_first():
+            if url not in found and self.filter.is_post(url, self.root):
+                found.add(url)
+                yield url, depth, None
+
+
+def crawl_and_convert(root: str, voice: str = "alloy", workers: Optional[int] = None,
+                      include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                      max_depth: int = 3, max_pages: int = 5000, tts_backend: Optional[str] = None,
+                      state_path: str = DEFAULT_STATE_PATH) -> Dict[str, int]:
+    """
+    Discover a blog's posts and convert them on the warm worker pool.
+
+    Conversions start while discovery is still running. Unfinished URLs from
+    an earlier crawl of the same root are resumed first; converted URLs are
+    skipped unless their sitemap lastmod changed.
+
+    Returns:
+        Final URL counts by status for this root
+    """
+    from blog_to_podcast.worker_pool import WarmCrewPool
+
+    crawler = Crawler(root, CrawlFilter(include or [], exclude or []), max_depth, max_pages)
+    state = CrawlState(state_path)
+    root = crawler.root
+    submitted = set()
+    futures: List[Future] = []
+
+    def on_done(url: str):
+        def callback(future: Future):
+            try:
+                artifacts = future.result()
+                if not artifacts['audio']:
+                    # Failed rows are retried when the crawl is resumed
+                    state.mark(root, url, "failed", run_id=artifacts['run_id'], error="no audio produced")
+                    print(f"Failed: {url}: no audio produced")
+                    return
+                state.mark(root, url, "converted", run_id=artifacts['run_id'])
+                print(f"Converted: {url} -> {artifacts['run_id']}")
+            except Exception as e:
+                state.mark(root, url, "failed", error=str(e))
+                print(f"Failed: {url}: {e}")
+        return callback
+
+    with WarmCrewPool(workers=workers) as pool:
+        def submit(url: str):
+            if url in submitted:
+                return
+            submitted.add(url)
+            state.mark(root, url, "queued")
+            future = pool.submit(url, voice, tts_backend)
+            future.add_done_callback(on_done(url))
+            futures.append(future)
+
+        for url, _ in state.unfinished(root):
+            submit(url)
+
+        for url, depth, lastmod in crawler.discover():
+            if state.record(root, url, depth, lastmod):
+                submit(url)
+
+        print(f"Discovery finished: {len(submitted)} posts queued for conversion")
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    return state.counts(root)
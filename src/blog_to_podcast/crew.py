@@ -1,9 +1,11 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-import os
+from typing import List, Optional
 from blog_to_podcast.tools import FirecrawlScraper, ContentProcessor, AudioGenerator
+from blog_to_podcast.workspace import RunWorkspace, atomic_write_text
+from blog_to_podcast.logging_config import crew_verbose
+from blog_to_podcast.artifacts import get_artifact_store
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -15,20 +17,21 @@ class BlogToPodcast():
     agents: List[BaseAgent]
     tasks: List[Task]
     
-    def __init__(self):
+    def __init__(self, workspace: Optional[RunWorkspace] = None, tts_backend: Optional[str] = None):
         super().__init__()
-        self._ensure_output_directories()
+        # Each crew instance writes into its own run workspace so concurrent
+        # conversions never share output files
+        self.workspace = workspace or RunWorkspace.create()
+        # Per-run speech engine; None falls back to TTS_BACKEND_VOICES / TTS_BACKEND
+        self.tts_backend = tts_backend
     
-    def _ensure_output_directories(self):
-        """Create organized output directories if they don't exist"""
-        directories = [
-            "output/scripts",
-            "output/audio", 
-            "output/metadata"
-        ]
-        
-        for directory in directories:
-            os.makedirs(directory, exist_ok=True)
+    @staticmethod
+    def _save_output(path: str):
+        """Task callback that atomically writes the task's raw output to path
+        (the artifact's text when the output is a handle)"""
+        def callback(output):
+            atomic_write_text(path, get_artifact_store().resolve(output.raw))
+        return callback
 
     # Learn more about YAML configuration files here:
     # Agents: https://docs.crewai.com/concepts/agents#yaml-configuration-recommended
@@ -40,24 +43,25 @@ class BlogToPodcast():
     def blog_scraper(self) -> Agent:
         return Agent(
             config=self.agents_config['blog_scraper'], # type: ignore[index]
-            tools=[FirecrawlScraper()],
-            verbose=True
+            # The tool's handle is the task output, so the article never passes through the LLM
+            tools=[FirecrawlScraper(return_handle=True, result_as_answer=True)],
+            verbose=crew_verbose()
         )
 
     @agent
     def content_processor(self) -> Agent:
         return Agent(
             config=self.agents_config['content_processor'], # type: ignore[index]
-            tools=[ContentProcessor()],
-            verbose=True
+            tools=[ContentProcessor(return_handle=True, result_as_answer=True)],
+            verbose=crew_verbose()
         )
 
     @agent
     def audio_producer(self) -> Agent:
         return Agent(
             config=self.agents_config['audio_producer'], # type: ignore[index]
-            tools=[AudioGenerator()],
-            verbose=True
+            tools=[AudioGenerator(workspace=self.workspace, tts_backend=self.tts_backend)],
+            verbose=crew_verbose()
         )
 
     # To learn more about structured task outputs,
@@ -67,19 +71,21 @@ class BlogToPodcast():
     def blog_scraping_task(self) -> Task:
         return Task(
             config=self.tasks_config['blog_scraping_task'], # type: ignore[index]
+            callback=self._save_output(self.workspace.content_path)
         )
 
     @task
     def script_generation_task(self) -> Task:
         return Task(
             config=self.tasks_config['script_generation_task'], # type: ignore[index]
-            output_file='output/scripts/podcast_script.txt'
+            callback=self._save_output(self.workspace.script_path)
         )
 
     @task
     def audio_generation_task(self) -> Task:
         return Task(
             config=self.tasks_config['audio_generation_task'], # type: ignore[index]
+            callback=self._save_output(self.workspace.info_path)
         )
 
     @crew
@@ -92,6 +98,6 @@ class BlogToPodcast():
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
-            verbose=True,
+            verbose=crew_verbose(),
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
@@ -0,0 +1,177 @@
+"""
+Reusable crew template for long-running processes.
+
+``BlogToPodcast(...).crew()`` re-reads the agent and task YAML, resolves the
+LLM for every agent and creates new tool objects each time. The Streamlit
+app and pool workers convert many posts per process, so ``CrewFactory``
+builds that template once and stamps out per-run crews from it: agents are
+copied (fresh executor state, shared LLM), tasks are copied with callbacks
+pointing at the run's workspace, and only the workspace-aware tool is
+copied per run; stateless tools are shared.
+
+Run ``python -m blog_to_podcast.crew_factory`` to compare per-run setup time
+of both paths.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from crewai import Crew, Process
+
+from blog_to_podcast.crew import BlogToPodcast
+from blog_to_podcast.logging_config import crew_callbacks
+from blog_to_podcast.tools import AudioGenerator
+from blog_to_podcast.workspace import RunWorkspace
+
+# Pipeline stage each task implements, in execution order
+TASK_STAGES = {
+    "blog_scraping_task": "scrape",
+    "script_generation_task": "script",
+    "audio_generation_task": "audio",
+}
+STAGES = list(TASK_STAGES.values())
+
+# Tasks whose raw output is saved into the run workspace
+_OUTPUT_PATHS = {
+    "blog_scraping_task": lambda workspace: workspace.content_path,
+    "script_generation_task": lambda workspace: workspace.script_path,
+    "audio_generation_task": lambda workspace: workspace.info_path,
+}
+
+
+class CrewFactory:
+    """
+    Thread-safe factory producing per-run crews from one parsed template.
+
+    The template is built on first use; ``create`` only copies it.
+    """
+
+    def __init__(self):
+        self._template: Optional[Crew] = None
+        self._lock = threading.Lock()
+
+    def _get_template(self) -> Crew:
+        with self._lock:
+            if self._template is None:
+                # The template never runs, so its workspace is never created
+                placeholder = RunWorkspace(run_id="template", root=os.path.join(tempfile.gettempdir(), "template"))
+                self._template = BlogToPodcast(workspace=placeholder).crew()
+            return self._template
+
+    def create(self, workspace: RunWorkspace, tts_backend: Optional[str] = None,
+               task_callback: Optional[Callable] = None) -> Crew:
+        """
+        Build a crew for one run.
+
+        Args:
+            workspace: The run's workspace (receives script, audio and info)
+            tts_backend: Speech engine for this run (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+            task_callback: Called with each task's output as it completes
+                (after it is logged)
+
+        Returns:
+            A crew ready for ``kickoff(inputs=...)``
+        """
+        template = self._get_template()
+
+        agents = []
+        # Template tool -> this run's tool, so tasks can be pointed at the copies
+        run_tools = {}
+        for template_agent in template.agents:
+            agent = template_agent.copy()
+            for tool in template_agent.tools:
+                run_tools[id(tool)] = (
+                    tool.model_copy(update={"workspace": workspace, "tts_backend": tts_backend})
+                    if isinstance(tool, AudioGenerator) else tool
+                )
+            agent.tools = [run_tools[id(tool)] for tool in template_agent.tools]
+            agents.append(agent)
+
+        tasks = []
+        task_mapping = {}
+        for template_task in template.tasks:
+            task = template_task.copy(agents, task_mapping)
+            # crewai prefers task.tools over agent.tools, and the copy keeps the
+            # template's tools (placeholder workspace, default backend)
+            task.tools = [run_tools.get(id(tool), tool) for tool in template_task.tools or []]
+            if template_task.name in _OUTPUT_PATHS:
+                task.callback = BlogToPodcast._save_output(_OUTPUT_PATHS[template_task.name](workspace))
+            task_mapping[template_task.key] = task
+            tasks.append(task)
+
+        # Compact log events replace the verbose console output (CREW_VERBOSE)
+        logging_callbacks = crew_callbacks(workspace.run_id)
+
+        def on_task_finished(output):
+            logging_callbacks["task_callback"](output)
+            if task_callback:
+                task_callback(output)
+
+        return Crew(
+            agents=agents,
+            tasks=tasks,
+            process=Process.sequential,
+            verbose=template.verbose,
+            step_callback=logging_callbacks["step_callback"],
+            task_callback=on_task_finished
+        )
+
+
+_factory: Optional[CrewFactory] = None
+_factory_lock = threading.Lock()
+
+
+def get_crew_factory() -> CrewFactory:
+    """Process-wide crew factory."""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            _factory = CrewFactory()
+        return _factory
+
+
+def measure_setup(runs: int = 50) -> Dict[str, float]:
+    """
+    Measure per-run crew setup time (milliseconds) with and without the factory.
+
+    Neither crew is kicked off; only construction is timed.
+    """
+    scratch_dir = tempfile.mkdtemp(prefix="blog_to_podcast_bench_")
+    try:
+        workspaces = [RunWorkspace.create(base_dir=scratch_dir) for _ in range(runs * 2)]
+        factory = CrewFactory()
+
+        started = time.perf_counter()
+        factory.create(workspaces[0])
+        first_factory = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for workspace in workspaces[:runs]:
+            BlogToPodcast(workspace=workspace).crew()
+        rebuild = (time.perf_counter() - started) / runs
+
+        started = time.perf_counter()
+        for workspace in workspaces[runs:]:
+            factory.create(workspace)
+        reuse = (time.perf_counter() - started) / runs
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {
+        "rebuild_ms": rebuild * 1000,
+        "factory_ms": reuse * 1000,
+        "factory_first_ms": first_factory * 1000,
+    }
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    results = measure_setup(runs)
+    print(f"BlogToPodcast(...).crew() per run: {results['rebuild_ms']:.2f} ms")
+    print(f"CrewFactory.create() per run:      {results['factory_ms']:.2f} ms "
+          f"(template build: {results['factory_first_ms']:.2f} ms)")
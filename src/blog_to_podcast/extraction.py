@@ -0,0 +1,375 @@
+"""
+Local main-content extraction for blog pages.
+
+Most blogs are static HTML, and a plain GET plus readability-style
+extraction returns the same article Firecrawl would, faster and for free.
+FirecrawlScraper tries this first and calls Firecrawl only when the local
+result fails the quality checks (too little text, a JavaScript-rendered
+shell, a page that is mostly links).
+
+Extraction follows the readability heuristics: boilerplate elements and
+containers whose class/id look like navigation, comments or ads are
+dropped; paragraphs score their parent and grandparent by length and comma
+count; the best container, discounted by link density, is converted to
+markdown.
+
+Run ``python -m blog_to_podcast.extraction <saved.html | url>`` to see the
+quality verdict and markdown for a page, e.g. for saved HTML fixtures.
+"""
+
+import re
+import sys
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from blog_to_podcast.http_pool import get_http_pool
+
+# Pages shorter than this are handed to Firecrawl
+MIN_WORDS = 150
+# Pages whose article text is mostly link text are indexes, not posts
+MAX_LINK_DENSITY = 0.5
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+DROP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg",
+             "button", "select", "textarea", "template", "canvas", "video", "audio", "figure"}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "ul", "ol", "li", "blockquote", "pre", "table",
+              "h1", "h2", "h3", "h4", "h5", "h6", "dl", "dt", "dd"}
+# Elements whose end tag may be omitted: a new one closes the open one
+IMPLIED_END_TAGS = {"p", "li", "dt", "dd"}
+
+
+def _implicitly_closes(open_tag: str, tag: str) -> bool:
+    """Whether a <tag> start tag ends an open <open_tag> whose end tag was omitted."""
+    return (open_tag == tag and tag in IMPLIED_END_TAGS) or (open_tag == "p" and tag in BLOCK_TAGS)
+
+NEGATIVE = re.compile(
+    r"comment|sidebar|footer|footnote|masthead|menu|nav|share|social|related|promo|sponsor|"
+    r"advert|\bads?\b|\bad-|cookie|consent|subscribe|newsletter|popup|modal|breadcrumb|pagination|widget",
+    re.I
+)
+POSITIVE = re.compile(r"article|body|content|entry|main|post|story|text|prose|blog", re.I)
+
+# Markers of client-side rendered apps whose HTML has no article in it
+JS_SHELL_MARKERS = re.compile(
+    r'<div id="(?:root|app|__next|__nuxt)">\s*</div>|enable javascript|you need to enable javascript|'
+    r'window\.__INITIAL_STATE__|__NEXT_DATA__',
+    re.I
+)
+
+
+class Node:
+    """Minimal DOM element."""
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List = []
+        self.parent = parent
+
+    @property
+    def class_id(self) -> str:
+        return f"{self.attrs.get('class', '')} {self.attrs.get('id', '')}"
+
+    def text(self) -> str:
+        parts = []
+        for child in self.children:
+            parts.append(child if isinstance(child, str) else child.text())
+        return "".join(parts)
+
+    def iter(self):
+        yield self
+        for child in self.children:
+            if isinstance(child, Node):
+                yield from child.iter()
+
+
+class _TreeBuilder(HTMLParser):
+    """Build a Node tree, dropping boilerplate elements as it goes."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("root", {})
+        self.current = self.root
+        self.head_meta: Dict[str, str] = {}
+        self.title = ""
+        self._in_title = False
+        # Open elements inside the dropped subtree; the first is the dropped element
+        self._dropped: List[str] = []
+
+    def _open_tags(self) -> List[str]:
+        tags = []
+        node = self.current
+        while node is not self.root:
+            tags.append(node.tag)
+            node = node.parent
+        return tags
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        if tag == "meta":
+            key = attrs.get("property") or attrs.get("name")
+            if key and "content" in attrs:
+                self.head_meta.setdefault(key.lower(), attrs["content"])
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+        if self._dropped:
+            if _implicitly_closes(self._dropped[-1], tag):
+                self._dropped.pop()
+            if self._dropped:
+                if tag not in VOID_TAGS:
+                    self._dropped.append(tag)
+                return
+            # The implicitly closed element was the dropped one; this is its sibling
+        if tag in DROP_TAGS or (tag in BLOCK_TAGS and NEGATIVE.search(f"{attrs.get('class', '')} {attrs.get('id', '')}")
+                                and not POSITIVE.search(f"{attrs.get('class', '')} {attrs.get('id', '')}")):
+            if tag not in VOID_TAGS:
+                self._dropped = [tag]
+            return
+        if _implicitly_closes(self.current.tag, tag):
+            # e.g. <li> ends an open <li>, a block ends an open <p>
+            self.current = self.current.parent
+        node = Node(tag, attrs, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+            return
+        if self._dropped:
+            if tag in self._dropped:
+                # Close it and anything left open inside it (omitted end tags)
+                del self._dropped[len(self._dropped) - 1 - self._dropped[::-1].index(tag):]
+                return
+            if tag not in self._open_tags():
+                # Stray end tag inside the dropped subtree
+                return
+            # An enclosing kept element ends, so the dropped one ended with it
+            self._dropped = []
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._dropped:
+            self.current.children.append(data)
+
+
+@dataclass
+class Article:
+    """Main content extracted from a page."""
+    title: str
+    author: str
+    markdown: str
+    word_count: int
+    link_density: float
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _link_density(node: Node) -> float:
+    text_length = len(_normalize(node.text()))
+    if not text_length:
+        return 1.0
+    link_length = sum(len(_normalize(a.text())) for a in node.iter() if a.tag == "a")
+    return link_length / text_length
+
+
+def _class_weight(node: Node) -> int:
+    weight = 0
+    if NEGATIVE.search(node.class_id):
+        weight -= 25
+    if POSITIVE.search(node.class_id):
+        weight += 25
+    return weight
+
+
+def _best_candidate(root: Node) -> Optional[Node]:
+    """Pick the container holding the article, by readability scoring."""
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, Node] = {}
+
+    for paragraph in root.iter():
+        if paragraph.tag not in ("p", "pre", "blockquote", "td"):
+            continue
+        text = _normalize(paragraph.text())
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for ancestor, share in ((paragraph.parent, 1.0), (paragraph.parent.parent if paragraph.parent else None, 0.5)):
+            if ancestor is None or ancestor is root:
+                continue
+            if id(ancestor) not in scores:
+                nodes[id(ancestor)] = ancestor
+                scores[id(ancestor)] = _class_weight(ancestor) + (5 if ancestor.tag in ("article", "main") else 0)
+            scores[id(ancestor)] += score * share
+
+    if not scores:
+        return None
+    best = max(scores, key=lambda key: scores[key] * (1 - _link_density(nodes[key])))
+    return nodes[best]
+
+
+def _to_markdown(node: Node, base_url: str) -> str:
+    """Render a subtree as markdown."""
+    out: List[str] = []
+
+    def inline(n) -> str:
+        if isinstance(n, str):
+            return re.sub(r"\s+", " ", n)
+        content = "".join(inline(child) for child in n.children)
+        if n.tag == "br":
+            return "\n"
+        if n.tag in ("strong", "b") and content.strip():
+            return f"**{content.strip()}**"
+        if n.tag in ("em", "i") and content.strip():
+            return f"*{content.strip()}*"
+        if n.tag == "code":
+            return f"`{content}`"
+        if n.tag == "a" and n.attrs.get("href") and content.strip():
+            return f"[{content.strip()}]({urljoin(base_url, n.attrs['href'])})"
+        return content
+
+    def block(n, list_prefix: str = "") -> None:
+        if isinstance(n, str):
+            if n.strip():
+                out.append(_normalize(n))
+            return
+        tag = n.tag
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = _normalize(inline(n))
+            if text:
+                out.append(f"{'#' * int(tag[1])} {text}")
+        elif tag == "p":
+            text = inline(n).strip()
+            if text:
+                out.append(re.sub(r" *\n *", "\n", re.sub(r"[ \t]+", " ", text)))
+        elif tag == "pre":
+            out.append(f"```\n{n.text().strip(chr(10))}\n```")
+        elif tag == "blockquote":
+            text = _normalize(inline(n))
+            if text:
+                out.append(f"> {text}")
+        elif tag in ("ul", "ol"):
+            items = [child for child in n.children if isinstance(child, Node) and child.tag == "li"]
+            lines = []
+            for number, item in enumerate(items, 1):
+                marker = f"{number}." if tag == "ol" else "-"
+                text = _normalize(inline(item))
+                if text:
+                    lines.append(f"{list_prefix}{marker} {text}")
+            if lines:
+                out.append("\n".join(lines))
+        elif tag in ("img", "hr", "table"):
+            return
+        else:
+            has_blocks = any(isinstance(child, Node) and child.tag in BLOCK_TAGS for child in n.children)
+            if has_blocks:
+                for child in n.children:
+                    block(child, list_prefix)
+            else:
+                text = _normalize(inline(n))
+                if text:
+                    out.append(text)
+
+    block(node)
+    return "\n\n".join(out)
+
+
+def extract_article(html: str, url: str = "") -> Optional[Article]:
+    """
+    Extract the main article of an HTML page as markdown.
+
+    Returns:
+        The article, or None when no content container could be found
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+
+    candidate = _best_candidate(builder.root)
+    if candidate is None:
+        return None
+
+    meta = builder.head_meta
+    title = meta.get("og:title") or _normalize(builder.title)
+    if not title:
+        heading = next((n for n in candidate.iter() if n.tag == "h1"), None)
+        title = _normalize(heading.text()) if heading else ""
+    author = meta.get("author") or meta.get("article:author") or meta.get("twitter:creator") or ""
+
+    markdown = _to_markdown(candidate, url)
+    return Article(
+        title=title or "Unknown Title",
+        author=author or "Unknown Author",
+        markdown=markdown,
+        word_count=len(_normalize(candidate.text()).split()),
+        link_density=_link_density(candidate)
+    )
+
+
+def assess_quality(html: str, article: Optional[Article], min_words: int = MIN_WORDS) -> Tuple[bool, str]:
+    """
+    Decide whether a local extraction is good enough to skip Firecrawl.
+
+    Returns:
+        (ok, reason) where reason explains a rejection
+    """
+    if (article is None or article.word_count < min_words) and JS_SHELL_MARKERS.search(html):
+        return False, "JavaScript-rendered page"
+    if article is None:
+        return False, "no article container found"
+    if article.word_count < min_words:
+        return False, f"only {article.word_count} words"
+    if article.link_density > MAX_LINK_DENSITY:
+        return False, f"mostly links ({article.link_density:.0%})"
+    return True, "ok"
+
+
+def fetch_html(url: str) -> str:
+    """
+    GET a page through the per-host pool and return its HTML.
+
+    Raises httpx.HTTPError for network/status errors and ValueError for
+    non-HTML responses or URLs disallowed by robots.txt.
+    """
+    response = get_http_pool().get(url)
+    response.raise_for_status()
+    content_type = response.headers.get("Content-Type", "")
+    if "html" not in content_type:
+        raise ValueError(f"not an HTML page ({content_type or 'unknown content type'})")
+    return response.text
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m blog_to_podcast.extraction <saved.html | url>")
+        sys.exit(1)
+
+    source = sys.argv[1]
+    if source.startswith(("http://", "https://")):
+        page = fetch_html(source)
+    else:
+        with open(source, encoding="utf-8", errors="replace") as f:
+            page = f.read()
+
+    result = extract_article(page, source)
+    ok, reason = assess_quality(page, result)
+    print(f"Local extraction: {'accepted' if ok else 'rejected'} ({reason})")
+    if result:
+        print(f"Title: {result.title}\nAuthor: {result.author}\nWords: {result.word_count}, "
+              f"link density {result.link_density:.0%}\n")
+        print(result.markdown)
@@ -0,0 +1,233 @@
+"""
+Multi-language fan-out from a single scrape and script.
+
+Producing an episode in several languages with the crew repeats the scrape
+and the script generation for every language. Fan-out runs them once and
+shares the result: the post is scraped, the base script is generated (or
+reused through the duplicate index), and then every target language is
+translated and synthesized concurrently. Each extra language costs one
+translation request plus its TTS; a target equal to the source language is
+synthesized straight from the base script.
+
+All languages of one fan-out belong to the same run, so the library lists
+them as one session and retention treats them as one episode:
+
+    output/runs/<run_id>/metadata/blog_content.md     scraped once
+    output/runs/<run_id>/scripts/podcast_script.txt   base script, generated once
+    output/runs/<run_id>/languages/<code>/            one workspace per language
+        scripts/podcast_script.txt, audio/podcast_<code>.<ext>,
+        metadata/podcast_audio_info.txt
+
+Usage:
+    python -m blog_to_podcast.main --url <url> --languages en,es,de
+
+Configuration (environment variables):
+    FANOUT_SOURCE_LANGUAGE   Language of the base script (default: en)
+    FANOUT_WORKERS           Languages translated and synthesized at once
+                             (default: all of them)
+"""
+
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import openai
+
+from blog_to_podcast import budget, llm_backend
+from blog_to_podcast.logging_config import get_logger, log_event, payload
+from blog_to_podcast.retention import record_access
+from blog_to_podcast.search_index import index_episode
+from blog_to_podcast.tools.audio_generator import clean_script_for_tts
+from blog_to_podcast.tools.content_processor import format_script
+from blog_to_podcast.tracing import get_tracer
+from blog_to_podcast.workspace import DEFAULT_RUNS_DIR, RunWorkspace, atomic_write_text
+
+logger = get_logger("fanout")
+
+LANGUAGE_NAMES = {
+    "ar": "Arabic",
+    "de": "German",
+    "en": "English",
+    "es": "Spanish",
+    "fr": "French",
+    "hi": "Hindi",
+    "it": "Italian",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "nl": "Dutch",
+    "pl": "Polish",
+    "pt": "Portuguese",
+    "ru": "Russian",
+    "sv": "Swedish",
+    "tr": "Turkish",
+    "zh": "Chinese",
+}
+
+TRANSLATION_PROMPT = """
+You are a professional translator of podcast scripts. Translate the script into {language}.
+
+Guidelines:
+1. Keep the meaning, tone and paragraph structure of the original
+2. Adapt idioms and examples so they sound natural to a native listener
+3. Keep names, product names and quoted titles as they are
+4. Write numbers, dates and units the way a {language} speaker would say them
+5. Output only the translated script, without notes or commentary
+"""
+
+
+class FanoutError(Exception):
+    """The shared scrape or base script failed, so no language can be produced."""
+
+
+def language_name(code: str) -> str:
+    """English name of a language code; unknown codes are used as given."""
+    return LANGUAGE_NAMES.get(code.lower(), code)
+
+
+def parse_languages(value: str) -> List[str]:
+    """Split a comma-separated language list, dropping blanks and duplicates."""
+    languages = []
+    for code in value.split(","):
+        code = code.strip().lower()
+        if code and code not in languages:
+            languages.append(code)
+    return languages
+
+
+def build_translation_messages(script: str, language: str) -> List[Dict[str, str]]:
+    """Build the chat messages that translate a spoken script."""
+    return [
+        {"role": "system", "content": TRANSLATION_PROMPT.format(language=language_name(language)).strip()},
+        {"role": "user", "content": script}
+    ]
+
+
+def translate_script(base_script: str, language: str) -> str:
+    """
+    Translate a formatted base script into language.
+
+    Only the spoken text is sent (the generator header and footer are
+    stripped) and the translation is wrapped in the usual header again.
+    """
+    with get_tracer().span("fanout.translate", **{"fanout.language": language}) as span, budget.stage("translate"):
+        spoken = clean_script_for_tts(base_script)
+        settings = llm_backend.llm_settings()
+        # About as many tokens come out as go in
+        tokens = len(spoken) // budget.CHARS_PER_TOKEN
+        budget.check_stage("translate", budget.chat_cost(settings["model"], tokens, tokens,
+                                                         local=settings["base_url"] is not None))
+        translated = llm_backend.complete(build_translation_messages(spoken, language))
+        span.set_attributes(**{"fanout.chars_in": len(spoken), "fanout.chars_out": len(translated)})
+    if not translated.strip():
+        raise FanoutError(f"empty translation for {language}")
+    return format_script(translated.strip())
+
+
+def language_workspace(workspace: RunWorkspace, language: str) -> RunWorkspace:
+    """The workspace holding one language's script, audio and info."""
+    return RunWorkspace.create(base_dir=os.path.join(workspace.root, "languages"), run_id=language)
+
+
+def _check(output: str) -> str:
+    """Tools report failures as "Error: ..." strings."""
+    if not output or output.startswith("Error:"):
+        raise FanoutError(output or "empty output")
+    return output
+
+
+def _produce_language(workspace: RunWorkspace, blog_url: str, base_script: str, language: str,
+                      source_language: str, voice: str, tts_backend: Optional[str]) -> Dict:
+    from blog_to_podcast.tools import AudioGenerator
+
+    target = language_workspace(workspace, language)
+    result = {"language": language, "name": language_name(language), "error": None}
+    try:
+        script = base_script if language == source_language else translate_script(base_script, language)
+        atomic_write_text(target.script_path, script)
+        generator = AudioGenerator(workspace=target, tts_backend=tts_backend, language=language)
+        info = _check(generator._run(script, voice, f"podcast_{language}"))
+        atomic_write_text(target.info_path, info)
+        index_episode(target, blog_url, voice, language, workspace.run_id, workspace.content_path)
+    except (FanoutError, budget.BudgetExceeded, openai.APIError) as e:
+        result["error"] = str(e)
+    result.update({key: value for key, value in target.artifacts().items() if key != "run_id"})
+    return result
+
+
+def convert_languages(blog_url: str, languages: Iterable[str], voice: str = "alloy",
+                      tts_backend: Optional[str] = None, base_dir: str = DEFAULT_RUNS_DIR,
+                      progress: Optional[Callable[[str, str], None]] = None) -> Dict:
+    """
+    Convert one post into several languages, scraping and scripting once.
+
+    Args:
+        blog_url: The URL of the blog post to convert
+        languages: Target language codes, e.g. ["en", "es", "de"]
+        voice: Voice to use for TTS (default: alloy)
+        tts_backend: TTS backend for every language (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+        base_dir: Directory holding run workspaces
+        progress: Optional callable(step, state), told when "scrape", "script"
+            and each language are "started" and "finished" (or "failed")
+
+    Returns:
+        Dictionary with run_id, the shared content and script paths, and
+        "languages": {code: {"name", "audio", "script", "info", "error"}}
+
+    Raises:
+        FanoutError: If the scrape or the base script fails
+        budget.BudgetExceeded: If the languages do not fit the configured budgets
+    """
+    # Imported here so listing languages does not load the tool stack
+    from blog_to_podcast.tools import ContentProcessor, FirecrawlScraper
+
+    languages = list(languages)
+    if not languages:
+        raise ValueError("at least one target language is required")
+    source_language = os.getenv("FANOUT_SOURCE_LANGUAGE", "en").lower()
+    progress = progress or (lambda step, state: None)
+    workspace = RunWorkspace.create(base_dir)
+
+    with get_tracer().span("conversion.fanout", **{
+        "run.id": workspace.run_id, "blog.url": blog_url, "tts.voice": voice,
+        "fanout.languages": ",".join(languages)
+    }), budget.admitted(workspace.run_id, voice, tts_backend, languages=len(languages)) as decision:
+        tts_backend = decision.plan.tts_backend
+        progress("scrape", "started")
+        content = _check(FirecrawlScraper()._run(blog_url))
+        atomic_write_text(workspace.content_path, content)
+        progress("scrape", "finished")
+
+        progress("script", "started")
+        base_script = _check(ContentProcessor()._run(content))
+        atomic_write_text(workspace.script_path, base_script)
+        log_event(logger, "script.ready", run_id=workspace.run_id, url=blog_url, script=payload(base_script))
+        progress("script", "finished")
+
+        def produce(language: str) -> Dict:
+            progress(language, "started")
+            result = _produce_language(workspace, blog_url, base_script, language, source_language,
+                                       voice, tts_backend)
+            if result["error"]:
+                log_event(logger, "language.failed", logging.WARNING, workspace.run_id, language=language,
+                          error=result["error"][:500])
+            else:
+                log_event(logger, "language.finished", run_id=workspace.run_id, language=language,
+                          audio_files=len(result["audio"]))
+            progress(language, "failed" if result["error"] else "finished")
+            return result
+
+        workers = int(os.getenv("FANOUT_WORKERS", "0")) or len(languages)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each thread runs in a copy of this context so its spans nest under the run
+            futures = [executor.submit(contextvars.copy_context().run, produce, language) for language in languages]
+            results = [future.result() for future in futures]
+
+    record_access(workspace.root)
+    return {
+        "run_id": workspace.run_id,
+        "content": workspace.content_path,
+        "script": workspace.script_path,
+        "languages": {result.pop("language"): result for result in results},
+    }
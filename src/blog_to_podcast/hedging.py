@@ -0,0 +1,442 @@
+"""
+Hedged requests for idempotent API calls.
+
+A single slow TTS or scrape call can dominate a conversion's total time. A
+hedged call starts the request, and if it has not finished by an adaptive
+deadline (a percentile of that operation's recently observed latencies) it
+fires a duplicate and takes whichever finishes first. The loser is told to
+stop through a cancellation event; calls that stream their response (TTS)
+abort the download, others finish in the background and are discarded.
+
+Duplicates are capped by a token bucket: every call earns ``max_rate``
+tokens and a hedge spends one, so at most ~5% extra requests by default.
+A duplicate is billed like the original, so callers pass ``on_hedge`` to
+record its spend.
+
+Latency grows with the size of the input (a 200-character streamed TTS
+chunk against a whole script), so callers that know it pass ``size`` and
+each size class gets its own histogram and deadline, e.g.
+``openai.audio.speech[<=1k]``.
+
+An attempt that loses the race is not seen to the end, so its latency is
+recorded as the time it had run when the winner finished: a lower bound.
+Dropping it instead would censor the slow tail, pull the percentile
+deadline down and cause more hedging.
+
+Every process exports its own metrics file next to HEDGE_METRICS_PATH
+(``hedging.<host>-<pid>.json``) every METRICS_INTERVAL_SECONDS and at exit,
+so pool and stage workers do not overwrite each other; the CLI merges them.
+
+Configuration (environment variables):
+    HEDGING_ENABLED      Set to false to disable hedging (default: true)
+    HEDGE_PERCENTILE     Latency percentile used as the deadline (default: 95)
+    HEDGE_MAX_RATE       Maximum hedges per call (default: 0.05)
+    HEDGE_METRICS_PATH   Base path of the exported latency histograms and hedge
+                         rates (default: output/metrics/hedging.json)
+
+Run ``python -m blog_to_podcast.hedging`` to print the merged metrics of
+every process.
+"""
+
+import atexit
+import bisect
+import contextvars
+import glob
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from blog_to_podcast.tracing import current_span
+from blog_to_podcast.workspace import atomic_write_text
+
+T = TypeVar("T")
+
+DEFAULT_METRICS_PATH = os.path.join("output", "metrics", "hedging.json")
+
+# Metrics files are rewritten this often when there were calls since the last export
+METRICS_INTERVAL_SECONDS = 30.0
+
+# Upper bounds (seconds) of the exported latency histogram buckets
+HISTOGRAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+# Upper bounds of the input size classes (characters, bytes, ...) with their labels
+SIZE_CLASSES = ((256, "<=256"), (1024, "<=1k"), (4096, "<=4k"), (16384, "<=16k"))
+
+
+def size_class(size: int) -> str:
+    """Label of the size class an input of this size falls into."""
+    for bound, label in SIZE_CLASSES:
+        if size <= bound:
+            return label
+    return f">{SIZE_CLASSES[-1][1][2:]}"
+
+
+class LatencyHistogram:
+    """
+    Latencies of one operation: a rolling window for percentiles and
+    cumulative bucket counts for export.
+    """
+
+    def __init__(self, window: int = 500):
+        self._recent = deque(maxlen=window)
+        self._sorted = []
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float):
+        if len(self._recent) == self._recent.maxlen:
+            oldest = self._recent[0]
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._recent.append(seconds)
+        bisect.insort(self._sorted, seconds)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0-100) of the rolling window, or None when empty."""
+        if not self._sorted:
+            return None
+        index = min(len(self._sorted) - 1, int(round(q / 100 * (len(self._sorted) - 1))))
+        return self._sorted[index]
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def to_dict(self) -> Dict:
+        labels = [f"le_{bound}" for bound in HISTOGRAM_BUCKETS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class _Attempt:
+    """One run of the hedged callable; its latency is recorded exactly once."""
+
+    __slots__ = ("cancelled", "started", "recorded")
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.started: Optional[float] = None
+        self.recorded = False
+
+
+class Hedger:
+    """
+    Hedges calls of one operation against its own latency distribution.
+
+    Args:
+        name: Operation name used in metrics
+        percentile: Latency percentile after which a duplicate is fired
+        max_rate: Maximum duplicate requests per call (token bucket refill)
+        burst: Maximum hedges that can be banked
+        initial_delay: Deadline used until min_samples latencies are known
+        min_samples: Observations needed before the percentile is trusted
+        min_delay: Lower bound on the deadline, to avoid hedging fast calls
+    """
+
+    def __init__(self, name: str, percentile: float = 95, max_rate: float = 0.05, burst: float = 2,
+                 initial_delay: float = 10.0, min_samples: int = 20, min_delay: float = 0.5):
+        self.name = name
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.burst = burst
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.histogram = LatencyHistogram()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_denied = 0
+        self.censored = 0
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def deadline(self) -> float:
+        """Seconds to wait for the first attempt before hedging."""
+        with self._lock:
+            return self._deadline()
+
+    def _deadline(self) -> float:
+        if len(self.histogram) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, self.histogram.percentile(self.percentile))
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.hedges += 1
+                return True
+            self.hedges_denied += 1
+            return False
+
+    def _observe(self, attempt: _Attempt, censored: bool = False):
+        """Record an attempt's latency, or for a cancelled loser its elapsed time so far."""
+        with self._lock:
+            if attempt.recorded or attempt.started is None:
+                return
+            attempt.recorded = True
+            self.histogram.record(time.perf_counter() - attempt.started)
+            if censored:
+                self.censored += 1
+
+    def _attempt(self, fn: Callable[[threading.Event], T], attempt: _Attempt) -> T:
+        attempt.started = time.perf_counter()
+        result = fn(attempt.cancelled)
+        if not attempt.cancelled.is_set():
+            self._observe(attempt)
+        return result
+
+    def call(self, fn: Callable[[threading.Event], T], on_hedge: Optional[Callable[[], None]] = None) -> T:
+        """
+        Run fn, firing a duplicate if it is slower than the adaptive deadline.
+
+        Args:
+            fn: Idempotent callable taking a cancellation event; it should stop
+                early (and may return anything) once the event is set
+            on_hedge: Called in the caller's thread when a duplicate is fired,
+                e.g. to record its spend
+
+        Returns:
+            The result of whichever attempt finished first successfully
+        """
+        with self._lock:
+            self.calls += 1
+            self._tokens = min(self.burst, self._tokens + self.max_rate)
+
+        attempts = [_Attempt()]
+        futures = [_submit(self._attempt, fn, attempts[0])]
+        done, _ = wait(futures, timeout=self.deadline())
+
+        span = current_span()
+        if not done and self._take_token():
+            attempts.append(_Attempt())
+            futures.append(_submit(self._attempt, fn, attempts[1]))
+            span.set_attribute("hedge.fired", True)
+            if on_hedge:
+                on_hedge()
+
+        pending = set(futures)
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    winner = futures.index(future)
+                    if winner == 1:
+                        with self._lock:
+                            self.hedge_wins += 1
+                        span.set_attribute("hedge.won", True)
+                    return future.result()
+            raise error
+        finally:
+            for future, attempt in zip(futures, attempts):
+                if future in pending:
+                    attempt.cancelled.set()
+                    future.cancel()
+                    # Its latency is at least what it has run so far
+                    self._observe(attempt, censored=True)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "hedges_denied": self.hedges_denied,
+                "censored": self.censored,
+                "deadline_seconds": self._deadline(),
+                "latency": self.histogram.to_dict(),
+            }
+
+
+# Attempts block on network I/O, so threads are cheap relative to the calls
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+def _submit(fn, *args):
+    return _executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+_export_lock = threading.Lock()
+# Process that started the exporter thread (a forked child needs its own)
+_exporter_pid: Optional[int] = None
+
+
+def hedging_enabled() -> bool:
+    return os.getenv("HEDGING_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def get_hedger(name: str, initial_delay: float = 10.0) -> Hedger:
+    """Shared hedger for an operation, configured from the environment."""
+    with _hedgers_lock:
+        _start_exporter()
+        if name not in _hedgers:
+            _hedgers[name] = Hedger(
+                name,
+                percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+                max_rate=float(os.getenv("HEDGE_MAX_RATE", "0.05")),
+                initial_delay=initial_delay
+            )
+        return _hedgers[name]
+
+
+def hedged_call(name: str, fn: Callable[[threading.Event], T], initial_delay: float = 10.0,
+                size: Optional[int] = None, on_hedge: Optional[Callable[[], None]] = None) -> T:
+    """
+    Run fn through the named hedger, or directly when hedging is disabled.
+
+    Args:
+        size: Input size; calls of different size classes are hedged against
+            their own latencies
+        on_hedge: Called when a duplicate is fired (see Hedger.call)
+    """
+    if not hedging_enabled():
+        return fn(threading.Event())
+    if size is not None:
+        name = f"{name}[{size_class(size)}]"
+    return get_hedger(name, initial_delay).call(fn, on_hedge)
+
+
+def _calls() -> int:
+    with _hedgers_lock:
+        hedgers = list(_hedgers.values())
+    return sum(hedger.calls for hedger in hedgers)
+
+
+def _export_loop():
+    exported = 0
+    while True:
+        time.sleep(METRICS_INTERVAL_SECONDS)
+        calls = _calls()
+        if calls == exported:
+            continue
+        try:
+            export_metrics()
+            exported = calls
+        except OSError:
+            # Metrics are best effort; the next interval tries again
+            pass
+
+
+def _export_at_exit():
+    if _calls():
+        try:
+            export_metrics()
+        except OSError:
+            pass
+
+
+def _start_exporter():
+    """Start this process's periodic exporter once (caller holds _hedgers_lock)."""
+    global _exporter_pid
+    if _exporter_pid == os.getpid():
+        return
+    _exporter_pid = os.getpid()
+    threading.Thread(target=_export_loop, name="hedging-metrics", daemon=True).start()
+    atexit.register(_export_at_exit)
+
+
+def _process_path(base_path: str) -> str:
+    stem, extension = os.path.splitext(base_path)
+    return f"{stem}.{socket.gethostname()}-{os.getpid()}{extension}"
+
+
+def export_metrics(path: Optional[str] = None) -> Dict:
+    """Write this process's latency histograms and hedge rates as JSON (see _process_path)."""
+    path = path or _process_path(os.getenv("HEDGE_METRICS_PATH", DEFAULT_METRICS_PATH))
+    with _hedgers_lock:
+        hedgers = list(_hedgers.values())
+    metrics = {hedger.name: hedger.to_dict() for hedger in hedgers}
+    with _export_lock:
+        atomic_write_text(path, json.dumps(metrics, indent=2))
+    return metrics
+
+
+def _bucket_percentile(buckets: List[int], q: float) -> Optional[float]:
+    """Upper bound of the histogram bucket holding the q-th percentile."""
+    total = sum(buckets)
+    if not total:
+        return None
+    seen = 0
+    for bound, count in zip(HISTOGRAM_BUCKETS + (float("inf"),), buckets):
+        seen += count
+        if seen >= q / 100 * total:
+            return bound
+    return float("inf")
+
+
+def merge_metrics(files: List[Dict]) -> Dict:
+    """
+    Combine the exports of several processes.
+
+    Counts and buckets are summed. Percentiles are estimated from the merged
+    buckets (as bucket upper bounds), and the deadline is the highest of
+    any process.
+    """
+    labels = [f"le_{bound}" for bound in HISTOGRAM_BUCKETS] + ["le_inf"]
+    merged: Dict[str, Dict] = {}
+    for metrics in files:
+        for name, row in metrics.items():
+            target = merged.setdefault(name, {
+                "calls": 0, "hedges": 0, "hedge_wins": 0, "hedges_denied": 0, "censored": 0,
+                "deadline_seconds": 0.0,
+                "latency": {"count": 0, "total": 0.0, "buckets": dict.fromkeys(labels, 0)},
+            })
+            for key in ("calls", "hedges", "hedge_wins", "hedges_denied", "censored"):
+                target[key] += row.get(key, 0)
+            target["deadline_seconds"] = max(target["deadline_seconds"], row["deadline_seconds"])
+            latency = row["latency"]
+            target["latency"]["count"] += latency["count"]
+            target["latency"]["total"] += (latency["mean"] or 0.0) * latency["count"]
+            for label in labels:
+                target["latency"]["buckets"][label] += latency["buckets"].get(label, 0)
+    for row in merged.values():
+        latency = row["latency"]
+        buckets = [latency["buckets"][label] for label in labels]
+        row["hedge_rate"] = row["hedges"] / row["calls"] if row["calls"] else 0.0
+        latency["mean"] = latency.pop("total") / latency["count"] if latency["count"] else None
+        latency.update({f"p{q}": _bucket_percentile(buckets, q) for q in (50, 95, 99)})
+    return merged
+
+
+def load_metrics(base_path: Optional[str] = None) -> Dict:
+    """Merged metrics of every process that exported next to base_path."""
+    stem, extension = os.path.splitext(base_path or os.getenv("HEDGE_METRICS_PATH", DEFAULT_METRICS_PATH))
+    files = []
+    for path in sorted(glob.glob(f"{glob.escape(stem)}.*{extension}")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                files.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return merge_metrics(files)
+
+
+if __name__ == "__main__":
+    metrics = load_metrics(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"{'operation':<24}{'calls':>8}{'hedge %':>9}{'wins':>6}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'deadline':>10}")
+    for name, row in sorted(metrics.items()):
+        latency = row["latency"]
+        print(f"{name:<24}{row['calls']:>8}{row['hedge_rate'] * 100:>8.1f}%{row['hedge_wins']:>6}"
+              f"{latency['p50'] or 0:>8.2f}{latency['p95'] or 0:>8.2f}{latency['p99'] or 0:>8.2f}"
+              f"{row['deadline_seconds']:>10.2f}")
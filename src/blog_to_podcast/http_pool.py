@@ -0,0 +1,237 @@
+"""
+Per-host connection pooling and politeness for page fetches.
+
+Bulk scraping sends most requests to one host. Each host gets its own
+keep-alive client (HTTP/2 when the ``h2`` package is installed), a cap on
+concurrent requests and a minimum spacing between request starts, raised to
+the host's robots.txt ``Crawl-delay`` when that is longer. Limits are per
+host, so a slow or strict host never holds up the others: ``fetch_many``
+only occupies a shared worker slot while a request is actually in flight.
+Redirects are followed hop by hop through the pool, so a hop to another
+host is checked against that host's robots.txt and waits for its limits.
+
+Configuration (environment variables):
+    SCRAPE_HOST_CONCURRENCY   Concurrent requests per host (default: 2)
+    SCRAPE_HOST_DELAY         Seconds between request starts per host (default: 1.0)
+    SCRAPE_RESPECT_ROBOTS     Honour robots.txt rules and Crawl-delay (default: true)
+    SCRAPE_MAX_CRAWL_DELAY    Upper bound applied to Crawl-delay (default: 30)
+
+Limits apply per process; a worker pool multiplies them by its size.
+"""
+
+import importlib.util
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import httpx
+
+USER_AGENT = "Mozilla/5.0 (compatible; blog-to-podcast/0.1; +https://github.com/Ocolus1/blog-to-podcast-ai)"
+ROBOTS_AGENT = "blog-to-podcast"
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+MAX_REDIRECTS = 10
+
+
+class RobotsDisallowed(ValueError):
+    """Raised when robots.txt disallows fetching a URL."""
+
+
+class _Host:
+    """Connection pool, robots rules and politeness state of one host."""
+
+    def __init__(self, origin: str, concurrency: int, delay: float, timeout: float):
+        self.origin = origin
+        self.concurrency = concurrency
+        self.delay = delay
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        )
+        self.robots: Optional[robotparser.RobotFileParser] = None
+        self.robots_lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.next_start = 0.0
+
+    def acquire(self):
+        """Wait for a free slot and this host's next allowed start time."""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.in_flight < self.concurrency and now >= self.next_start:
+                    self.in_flight += 1
+                    self.next_start = now + self.delay
+                    return
+                timeout = self.next_start - now if self.in_flight < self.concurrency else None
+                self.condition.wait(timeout)
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+
+class HostPool:
+    """
+    Polite, pooled HTTP fetching keyed by host.
+
+    Args:
+        concurrency: Concurrent requests per host
+        delay: Minimum seconds between request starts per host
+        respect_robots: Honour robots.txt Disallow rules and Crawl-delay
+        max_crawl_delay: Upper bound applied to a host's Crawl-delay
+        timeout: Request timeout in seconds
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, delay: Optional[float] = None,
+                 respect_robots: Optional[bool] = None, max_crawl_delay: Optional[float] = None,
+                 timeout: float = 15.0):
+        self.concurrency = concurrency or int(os.getenv("SCRAPE_HOST_CONCURRENCY", "2"))
+        self.delay = delay if delay is not None else float(os.getenv("SCRAPE_HOST_DELAY", "1.0"))
+        if respect_robots is None:
+            respect_robots = os.getenv("SCRAPE_RESPECT_ROBOTS", "true").lower() not in ("0", "false", "no")
+        self.respect_robots = respect_robots
+        self.max_crawl_delay = max_crawl_delay if max_crawl_delay is not None else float(
+            os.getenv("SCRAPE_MAX_CRAWL_DELAY", "30"))
+        self.timeout = timeout
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> _Host:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        with self._lock:
+            if origin not in self._hosts:
+                self._hosts[origin] = _Host(origin, self.concurrency, self.delay, self.timeout)
+            return self._hosts[origin]
+
+    def _load_robots(self, host: _Host) -> robotparser.RobotFileParser:
+        """Fetch robots.txt once per host; missing or broken files allow everything."""
+        with host.robots_lock:
+            if host.robots is None:
+                parser = robotparser.RobotFileParser(f"{host.origin}/robots.txt")
+                try:
+                    # Redirects (e.g. http -> https) are followed for robots.txt itself
+                    response = host.client.get(f"{host.origin}/robots.txt", follow_redirects=True)
+                    lines = response.text.splitlines() if response.status_code == 200 else []
+                except httpx.HTTPError:
+                    lines = []
+                parser.parse(lines)
+                crawl_delay = parser.crawl_delay(ROBOTS_AGENT)
+                if crawl_delay:
+                    with host.condition:
+                        host.delay = max(host.delay, min(float(crawl_delay), self.max_crawl_delay))
+                host.robots = parser
+            return host.robots
+
+    def allowed(self, url: str) -> bool:
+        """Whether robots.txt allows fetching url (always True when robots are ignored)."""
+        if not self.respect_robots:
+            return True
+        return self._load_robots(self._host(url)).can_fetch(ROBOTS_AGENT, url)
+
+    def _get_once(self, url: str, slot: Optional[threading.BoundedSemaphore] = None,
+                  **kwargs) -> httpx.Response:
+        """One request without following redirects, within the host's limits."""
+        host = self._host(url)
+        if self.respect_robots and not self._load_robots(host).can_fetch(ROBOTS_AGENT, url):
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+        host.acquire()
+        try:
+            if slot is None:
+                return host.client.get(url, **kwargs)
+            with slot:
+                return host.client.get(url, **kwargs)
+        finally:
+            host.release()
+
+    def _follow(self, url: str, slot: Optional[threading.BoundedSemaphore] = None,
+                **kwargs) -> httpx.Response:
+        history = []
+        response = self._get_once(url, slot, **kwargs)
+        while response.next_request is not None:
+            if len(history) >= MAX_REDIRECTS:
+                raise httpx.TooManyRedirects(f"Exceeded {MAX_REDIRECTS} redirects for {url}",
+                                             request=response.request)
+            history.append(response)
+            response = self._get_once(str(response.next_request.url), slot, **kwargs)
+        response.history = history
+        return response
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET url through its host's pool, waiting for the host's politeness limits.
+
+        Redirects are followed one hop at a time, each through the pool of
+        the host it points to; response.history holds the redirect responses.
+        """
+        return self._follow(url, **kwargs)
+
+    def fetch_many(self, urls: Iterable[str], workers: int = 16
+                   ) -> Iterator[Tuple[str, Union[httpx.Response, Exception]]]:
+        """
+        Fetch many URLs, yielding (url, response or exception) as they complete.
+
+        Each host is drained by up to its concurrency limit of threads; a
+        shared semaphore bounds requests in flight across all hosts. Threads
+        waiting on a host's spacing do not hold a shared slot, so a slow host
+        never blocks the rest.
+        """
+        by_host: Dict[str, queue.SimpleQueue] = {}
+        total = 0
+        for url in urls:
+            by_host.setdefault(self._host(url).origin, queue.SimpleQueue()).put(url)
+            total += 1
+
+        results: queue.SimpleQueue = queue.SimpleQueue()
+        in_flight = threading.BoundedSemaphore(workers)
+
+        def drain(pending: queue.SimpleQueue):
+            while True:
+                try:
+                    url = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    results.put((url, self._follow(url, in_flight)))
+                except Exception as e:
+                    results.put((url, e))
+
+        threads = []
+        for origin, pending in by_host.items():
+            for _ in range(min(self.concurrency, pending.qsize())):
+                thread = threading.Thread(target=drain, args=(pending,), name=f"fetch-{origin}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        for _ in range(total):
+            yield results.get()
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        with self._lock:
+            hosts, self._hosts = list(self._hosts.values()), {}
+        for host in hosts:
+            host.client.close()
+
+
+_pool: Optional[HostPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HostPool:
+    """Process-wide host pool configured from the environment."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HostPool()
+        return _pool
@@ -0,0 +1,211 @@
+"""
+Persistent job store for the HTTP job API.
+
+Jobs and their progress events live in a local SQLite database so the API
+process only reads and writes small rows while conversions run in worker
+processes. Workers record their own progress (stage started/finished,
+success, failure) directly in the store; the API streams those events to
+clients.
+
+Job status moves queued -> running -> succeeded | failed. Events carry a
+global, increasing sequence number that doubles as the SSE event id, so a
+client reconnecting with ``Last-Event-ID`` resumes where it left off.
+Budget admission adds a ``budget`` event with each job's decision.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+DEFAULT_JOBS_PATH = os.path.join("output", "index", "jobs.db")
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+def jobs_path() -> str:
+    return os.getenv("JOBS_DB_PATH", DEFAULT_JOBS_PATH)
+
+
+class JobStore:
+    """
+    SQLite store of conversion jobs and their progress events.
+
+    Args:
+        path: SQLite database path (default: JOBS_DB_PATH or output/index/jobs.db)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or jobs_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    batch_id TEXT,
+                    blog_url TEXT NOT NULL,
+                    user TEXT,
+                    voice TEXT NOT NULL,
+                    tts_backend TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    run_id TEXT,
+                    artifacts TEXT,
+                    error TEXT,
+                    created TEXT NOT NULL,
+                    updated TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+                CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id);
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+            """)
+            # Stores created before jobs were charged to users
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "user" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN user TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["artifacts"] = json.loads(job["artifacts"]) if job["artifacts"] else None
+        return job
+
+    def _add_event(self, connection: sqlite3.Connection, job_id: str, event: str, data: Dict, now: str):
+        connection.execute(
+            "INSERT INTO events (job_id, event, data, created) VALUES (?, ?, ?, ?)",
+            (job_id, event, json.dumps(data), now)
+        )
+
+    def create(self, blog_url: str, voice: str, tts_backend: Optional[str] = None,
+               batch_id: Optional[str] = None, user: Optional[str] = None) -> Dict:
+        """Add a queued job and return it."""
+        return self.create_many([blog_url], voice, tts_backend, batch_id, user)[0]
+
+    def create_many(self, blog_urls: List[str], voice: str, tts_backend: Optional[str] = None,
+                    batch_id: Optional[str] = None, user: Optional[str] = None) -> List[Dict]:
+        """Add queued jobs in one transaction and return them in order."""
+        job_ids = [uuid.uuid4().hex for _ in blog_urls]
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT INTO jobs (id, batch_id, blog_url, user, voice, tts_backend, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+                [(job_id, batch_id, blog_url, user, voice, tts_backend, now, now)
+                 for job_id, blog_url in zip(job_ids, blog_urls)]
+            )
+            for job_id in job_ids:
+                self._add_event(connection, job_id, "status", {"status": "queued"}, now)
+        return [self.get(job_id) for job_id in job_ids]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, batch_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Most recent jobs first, optionally filtered by status or batch."""
+        query, params = "SELECT * FROM jobs WHERE 1 = 1", []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if batch_id:
+            query += " AND batch_id = ?"
+            params.append(batch_id)
+        query += " ORDER BY created DESC LIMIT ?"
+        params.append(limit)
+        return [self._to_dict(row) for row in self._connection().execute(query, params)]
+
+    def unfinished(self) -> List[Dict]:
+        """Jobs queued or running, oldest first (to resubmit after a restart)."""
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE status NOT IN ('succeeded', 'failed') ORDER BY created"
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def requeue(self, job_id: str):
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'queued', stage = NULL, updated = ? WHERE id = ?", (now, job_id)
+            )
+            self._add_event(connection, job_id, "status", {"status": "queued", "requeued": True}, now)
+
+    def start(self, job_id: str, run_id: str):
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'running', run_id = ?, updated = ? WHERE id = ?", (run_id, now, job_id)
+            )
+            self._add_event(connection, job_id, "status", {"status": "running", "run_id": run_id}, now)
+
+    def note_budget(self, job_ids: List[str], decisions: List[Dict]):
+        """Record the budget decision of each job as a ``budget`` event."""
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            for job_id, decision in zip(job_ids, decisions):
+                self._add_event(connection, job_id, "budget", decision, now)
+
+    def progress(self, job_id: str, stage: str, state: str):
+        """Record that a pipeline stage started or finished."""
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE jobs SET stage = ?, updated = ? WHERE id = ?", (stage, now, job_id))
+            self._add_event(connection, job_id, "stage", {"stage": stage, "state": state}, now)
+
+    def succeed(self, job_id: str, artifacts: Dict):
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'succeeded', artifacts = ?, error = NULL, updated = ? WHERE id = ?",
+                (json.dumps(artifacts), now, job_id)
+            )
+            self._add_event(connection, job_id, "status", {"status": "succeeded"}, now)
+
+    def fail(self, job_id: str, error: str):
+        """Mark a job failed unless it already finished."""
+        now = datetime.datetime.now().isoformat()
+        connection = self._connection()
+        with connection:
+            updated = connection.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated = ? "
+                "WHERE id = ? AND status NOT IN ('succeeded', 'failed')",
+                (error, now, job_id)
+            ).rowcount
+            if updated:
+                self._add_event(connection, job_id, "status", {"status": "failed", "error": error}, now)
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict]:
+        """Events of a job with a sequence number above ``after``, in order."""
+        rows = self._connection().execute(
+            "SELECT seq, event, data, created FROM events WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after)
+        ).fetchall()
+        return [
+            {"seq": row["seq"], "event": row["event"], "data": json.loads(row["data"]), "created": row["created"]}
+            for row in rows
+        ]
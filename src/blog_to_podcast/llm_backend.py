@@ -0,0 +1,165 @@
+"""
+Chat model used for podcast script generation.
+
+ContentProcessor and streaming mode talk to any OpenAI-compatible chat
+completions endpoint: OpenAI itself, or a self-hosted server such as
+llama.cpp server, vLLM or Ollama (``http://localhost:11434/v1``).
+
+Configuration (environment variables):
+    SCRIPT_LLM_BASE_URL      Endpoint base URL (default: OpenAI)
+    SCRIPT_LLM_API_KEY       API key (default: OPENAI_API_KEY; local servers
+                             usually accept any value)
+    SCRIPT_LLM_MODEL         Model name (default: MODEL, else gpt-4o)
+    SCRIPT_LLM_MAX_TOKENS    Completion token limit (default: 2000)
+    SCRIPT_LLM_TEMPERATURE   Sampling temperature (default: 0.7)
+    SCRIPT_LLM_TOP_P         Nucleus sampling (default: server default)
+    SCRIPT_LLM_EXTRA_BODY    JSON merged into the request body, for server
+                             specific options (e.g. {"options": {"num_ctx": 8192}})
+    SCRIPT_LLM_TIMEOUT       Request timeout in seconds (default: 600)
+    SCRIPT_LLM_CONCURRENCY   Requests in flight per process (default:
+                             unlimited for OpenAI, 2 for a custom base URL)
+
+A run downgraded by budget admission uses its plan's model instead (see
+``budget.py``), and every request's token usage, streamed ones included, is
+recorded in the cost ledger.
+
+A local server batches concurrent requests itself (vLLM continuous
+batching, ``llama-server --parallel N``), so concurrent callers such as the
+stage queue's script workers are capped at the concurrency limit and the
+server sees a steady batch.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+import openai
+
+from blog_to_podcast import budget
+from blog_to_podcast.tracing import get_tracer
+
+DEFAULT_MODEL = "gpt-4o"
+LOCAL_CONCURRENCY = 2
+
+
+def llm_settings() -> Dict:
+    """Read the script generation endpoint, model and request parameters."""
+    base_url = os.getenv("SCRIPT_LLM_BASE_URL") or None
+    plan = budget.current_plan()
+    default_concurrency = LOCAL_CONCURRENCY if base_url else 0
+
+    params = {
+        "max_tokens": int(os.getenv("SCRIPT_LLM_MAX_TOKENS", "2000")),
+        "temperature": float(os.getenv("SCRIPT_LLM_TEMPERATURE", "0.7")),
+    }
+    if os.getenv("SCRIPT_LLM_TOP_P"):
+        params["top_p"] = float(os.getenv("SCRIPT_LLM_TOP_P"))
+    extra_body = os.getenv("SCRIPT_LLM_EXTRA_BODY")
+    if extra_body:
+        params["extra_body"] = json.loads(extra_body)
+
+    return {
+        "base_url": base_url,
+        "api_key": os.getenv("SCRIPT_LLM_API_KEY") or os.getenv("OPENAI_API_KEY"),
+        "model": (plan.model if plan else None) or os.getenv("SCRIPT_LLM_MODEL") or os.getenv("MODEL") or DEFAULT_MODEL,
+        "params": params,
+        "timeout": float(os.getenv("SCRIPT_LLM_TIMEOUT", "600")),
+        "concurrency": int(os.getenv("SCRIPT_LLM_CONCURRENCY", default_concurrency)),
+    }
+
+
+def requires_api_key() -> bool:
+    """Hosted OpenAI needs a key; self-hosted servers run without one."""
+    settings = llm_settings()
+    return settings["base_url"] is None and not settings["api_key"]
+
+
+_clients: Dict[tuple, openai.OpenAI] = {}
+_semaphores: Dict[int, threading.BoundedSemaphore] = {}
+_lock = threading.Lock()
+
+
+def get_client() -> openai.OpenAI:
+    """Shared client for the configured endpoint (connections are reused)."""
+    settings = llm_settings()
+    key = (settings["base_url"], settings["api_key"], settings["timeout"])
+    with _lock:
+        if key not in _clients:
+            _clients[key] = openai.OpenAI(
+                base_url=settings["base_url"],
+                # The SDK insists on a key; local servers ignore it
+                api_key=settings["api_key"] or "not-needed",
+                timeout=settings["timeout"]
+            )
+        return _clients[key]
+
+
+@contextmanager
+def request_slot() -> Iterator[None]:
+    """Hold one of SCRIPT_LLM_CONCURRENCY request slots (no limit when 0)."""
+    limit = llm_settings()["concurrency"]
+    if limit <= 0:
+        yield
+        return
+    with _lock:
+        semaphore = _semaphores.setdefault(limit, threading.BoundedSemaphore(limit))
+    with semaphore:
+        yield
+
+
+def complete(messages: List[Dict[str, str]]) -> str:
+    """Run one chat completion and return the generated text."""
+    settings = llm_settings()
+    with request_slot(), get_tracer().span("openai.chat.completions", **{
+        "llm.model": settings["model"], "llm.base_url": settings["base_url"] or "openai"
+    }) as span:
+        response = get_client().chat.completions.create(
+            model=settings["model"],
+            messages=messages,
+            **settings["params"]
+        )
+        if getattr(response, "usage", None):
+            span.set_attributes(**{
+                "llm.prompt_tokens": response.usage.prompt_tokens,
+                "llm.completion_tokens": response.usage.completion_tokens
+            })
+            budget.record_chat(settings["model"], response.usage.prompt_tokens, response.usage.completion_tokens,
+                               local=settings["base_url"] is not None)
+    if not response.choices:
+        return ""
+    return response.choices[0].message.content or ""
+
+
+def stream(messages: List[Dict[str, str]]) -> Iterable[str]:
+    """Yield the completion text as the model produces it."""
+    settings = llm_settings()
+    with request_slot(), get_tracer().span("openai.chat.completions.stream", **{
+        "llm.model": settings["model"], "llm.base_url": settings["base_url"] or "openai"
+    }) as span:
+        response = get_client().chat.completions.create(
+            model=settings["model"],
+            messages=messages,
+            stream=True,
+            # The final event then carries the request's token usage
+            stream_options={"include_usage": True},
+            **settings["params"]
+        )
+        chars = 0
+        usage = None
+        for event in response:
+            usage = getattr(event, "usage", None) or usage
+            if event.choices and event.choices[0].delta.content:
+                chars += len(event.choices[0].delta.content)
+                yield event.choices[0].delta.content
+        span.set_attribute("llm.response_chars", chars)
+        if usage:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            # Servers that ignore stream_options: approximate from characters
+            prompt_chars = sum(len(message["content"]) for message in messages)
+            prompt_tokens, completion_tokens = prompt_chars // budget.CHARS_PER_TOKEN, chars // budget.CHARS_PER_TOKEN
+        span.set_attributes(**{"llm.prompt_tokens": prompt_tokens, "llm.completion_tokens": completion_tokens})
+        budget.record_chat(settings["model"], prompt_tokens, completion_tokens, local=settings["base_url"] is not None)
+
@@ -0,0 +1,194 @@
+"""
+Structured, size-bounded logging.
+
+With ``verbose=True`` CrewAI prints every agent thought, tool input and tool
+output, which means whole scraped articles and scripts, several times per
+conversion. Agents and the crew now run quietly unless CREW_VERBOSE is set,
+and the pipeline emits compact events instead: one JSON object per line,
+with large payloads (articles, scripts, tool outputs) reduced to their
+length, a short hash and an optional preview.
+
+- Levels are set globally (LOG_LEVEL) and per component (LOG_LEVELS); a
+  component is the logger name under ``blog_to_podcast``, e.g. ``crew``,
+  ``conversion``, ``queue`` or ``fanout``
+- LOG_SAMPLE_RATE keeps the INFO and DEBUG events of a fraction of runs.
+  The choice is made per run ID, so a sampled run is logged completely;
+  warnings and errors are always kept
+- CREW_VERBOSE=true restores the full CrewAI console output for debugging
+
+Events::
+
+    {"ts": "2026-10-19T16:21:02.84Z", "level": "INFO", "component": "crew",
+     "event": "task.finished", "run_id": "...", "task": "script_generation_task",
+     "output": {"chars": 5120, "sha256": "9f2c1a7e03b4d8c1", "preview": "PODCAST SCRIPT ..."}}
+
+Configuration (environment variables):
+    LOG_FORMAT          json or text (default: json)
+    LOG_LEVEL           Default level (default: INFO)
+    LOG_LEVELS          Per-component levels, e.g. crew=DEBUG,queue=WARNING
+    LOG_SAMPLE_RATE     Fraction of runs whose INFO/DEBUG events are kept (default: 1.0)
+    LOG_PAYLOAD_CHARS   Preview length of large payloads; 0 logs only length and
+                        hash (default: 80)
+    LOG_FILE            Append to this file instead of stderr
+    CREW_VERBOSE        Full verbose CrewAI console output (default: false)
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional
+
+ROOT_LOGGER = "blog_to_podcast"
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def crew_verbose() -> bool:
+    """Whether agents and crews print their full verbose console output."""
+    return os.getenv("CREW_VERBOSE", "false").lower() in ("1", "true", "yes")
+
+
+def get_logger(component: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+
+def payload(text: Any) -> Dict[str, Any]:
+    """Summarise a large text: its length, a short hash and a bounded preview."""
+    text = "" if text is None else str(text)
+    summary = {"chars": len(text), "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]}
+    limit = int(os.getenv("LOG_PAYLOAD_CHARS", "80"))
+    if limit > 0 and text:
+        preview = " ".join(text[:limit * 2].split())
+        summary["preview"] = preview[:limit] + ("…" if len(text) > limit else "")
+    return summary
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, run_id: Optional[str] = None,
+              **fields):
+    """Log a structured event; fields must be JSON serialisable."""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"run_id": run_id, "fields": fields})
+
+
+def _sampled(run_id: str, rate: float) -> bool:
+    if rate >= 1.0:
+        return True
+    bucket = int(hashlib.sha1(run_id.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return bucket < rate
+
+
+class SamplingFilter(logging.Filter):
+    """Drop INFO and DEBUG events of runs outside the sampled fraction."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        run_id = getattr(record, "run_id", None)
+        return record.levelno >= logging.WARNING or not run_id or _sampled(run_id, self.rate)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+            .isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "level": record.levelname,
+            "component": record.name[len(ROOT_LOGGER) + 1:] if record.name.startswith(ROOT_LOGGER + ".")
+            else record.name,
+            "event": record.getMessage(),
+        }
+        if getattr(record, "run_id", None):
+            event["run_id"] = record.run_id
+        event.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            event["error"] = self.formatException(record.exc_info).splitlines()[-1]
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Single-line human readable events, for terminals."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = dict(getattr(record, "fields", None) or {})
+        if getattr(record, "run_id", None):
+            fields = {"run_id": record.run_id, **fields}
+        details = " ".join(f"{key}={json.dumps(value, default=str, ensure_ascii=False)}"
+                           for key, value in fields.items())
+        time_text = datetime.datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+        return f"{time_text} {record.levelname:<7} {record.name} {record.getMessage()} {details}".rstrip()
+
+
+def _parse_levels(value: str) -> Dict[str, int]:
+    levels = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        component, level = (item.strip() for item in part.split("=", 1))
+        if not isinstance(logging.getLevelName(level.upper()), int):
+            raise ValueError(f"unknown log level in LOG_LEVELS: {level!r}")
+        levels[component] = logging.getLevelName(level.upper())
+    return levels
+
+
+def configure_logging(force: bool = False):
+    """
+    Install the handler, levels and sampling for ``blog_to_podcast`` loggers.
+
+    Safe to call from every entry point; only the first call (or a forced
+    one) configures anything.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured and not force:
+            return
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        log_file = os.getenv("LOG_FILE")
+        handler = logging.FileHandler(log_file, encoding="utf-8") if log_file else logging.StreamHandler(sys.stderr)
+        handler.setFormatter(TextFormatter() if os.getenv("LOG_FORMAT", "json").lower() == "text"
+                             else JsonFormatter())
+        handler.addFilter(SamplingFilter(float(os.getenv("LOG_SAMPLE_RATE", "1.0"))))
+        root.addHandler(handler)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+        for component, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(f"{ROOT_LOGGER}.{component}").setLevel(level)
+        _configured = True
+
+
+def crew_callbacks(run_id: str) -> Dict[str, Callable]:
+    """
+    Step and task callbacks that log a crew's progress for one run.
+
+    Agent steps (tool calls and final answers) are DEBUG events and finished
+    tasks INFO events; tool inputs and outputs are logged as payload
+    summaries, never in full.
+    """
+    logger = get_logger("crew")
+
+    def step_callback(step):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        tool = getattr(step, "tool", None)
+        if tool:
+            log_event(logger, "agent.tool", logging.DEBUG, run_id, tool=tool,
+                      input=payload(getattr(step, "tool_input", "")), output=payload(getattr(step, "result", "")))
+        else:
+            log_event(logger, "agent.answer", logging.DEBUG, run_id, output=payload(getattr(step, "output", "")))
+
+    def task_callback(output):
+        log_event(logger, "task.finished", logging.INFO, run_id, task=getattr(output, "name", None),
+                  agent=getattr(output, "agent", None), output=payload(getattr(output, "raw", "")))
+
+    return {"step_callback": step_callback, "task_callback": task_callback}
@@ -1,14 +1,32 @@
 #!/usr/bin/env python
+import os
 import sys
+import time
+import logging
 import warnings
 import argparse
 
 from datetime import datetime
 
+from blog_to_podcast import budget
 from blog_to_podcast.crew import BlogToPodcast
+from blog_to_podcast.crew_factory import STAGES, TASK_STAGES, get_crew_factory
+from blog_to_podcast.workspace import RunWorkspace, atomic_write_text
+from blog_to_podcast.tracing import get_tracer
+from blog_to_podcast import profiling
+from blog_to_podcast.retention import record_access
+from blog_to_podcast.search_index import index_episode
+from blog_to_podcast.logging_config import configure_logging, get_logger, log_event
+from blog_to_podcast.tts_backends import BACKENDS
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+logger = get_logger("conversion")
+
+
+class ConversionError(Exception):
+    """The crew finished without producing an episode."""
+
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
@@ -30,15 +48,9 @@ def run():
     if voice not in ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']:
         voice = 'alloy'
     
-    inputs = {
-        'blog_url': blog_url,
-        'voice': voice,
-        'current_year': str(datetime.now().year)
-    }
-    
+    configure_logging()
     try:
-        result = BlogToPodcast().crew().kickoff(inputs=inputs)
-        return result
+        return convert(blog_url, voice)['result']
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
@@ -83,27 +95,222 @@ def test():
         raise Exception(f"An error occurred while testing the crew: {e}")
 
 
-def run_cli(blog_url: str, voice: str = "alloy"):
+def convert(blog_url: str, voice: str = "alloy", workspace: RunWorkspace = None, profile: bool = False,
+            tts_backend: str = None, progress=None, admission: budget.Decision = None):
     """
-    Run blog-to-podcast conversion via CLI.
+    Run one conversion in its own workspace and return its exact artifacts.
+    
+    Safe to call concurrently: every run writes only inside its workspace.
     
     Args:
         blog_url: The URL of the blog post to convert
         voice: Voice to use for TTS (default: alloy)
+        workspace: Optional pre-created workspace (default: a new one)
+        profile: Capture CPU/memory profiles into output/profiles/<run_id>/
+        tts_backend: TTS backend for this run (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+        progress: Optional callable(stage, state) told when each pipeline
+            stage (scrape, script, audio) is "started" and "finished"
+        admission: Budget decision made when the job was submitted (default:
+            admit the run here, waiting while it is queued)
+        
+    Returns:
+        Dictionary with run_id, crew result, audio file list, script and info paths
+    
+    Raises:
+        budget.BudgetExceeded: If the run does not fit the configured budgets
+        ConversionError: If the crew finished without writing any audio
     """
+    workspace = workspace or RunWorkspace.create()
     inputs = {
         'blog_url': blog_url,
         'voice': voice,
         'current_year': str(datetime.now().year)
     }
     
+    if profile:
+        with profiling.profile_run(workspace.run_id) as profiler:
+            artifacts = convert(blog_url, voice, workspace, tts_backend=tts_backend, progress=progress,
+                                admission=admission)
+        artifacts['profile'] = profiler.summary_path
+        return artifacts
+    
+    task_callback = None
+    if progress:
+        def task_callback(output):
+            stage = TASK_STAGES.get(output.name)
+            if stage:
+                progress(stage, "finished")
+                if STAGES.index(stage) + 1 < len(STAGES):
+                    progress(STAGES[STAGES.index(stage) + 1], "started")
+    
+    log_event(logger, "conversion.started", run_id=workspace.run_id, url=blog_url, voice=voice)
+    started = time.perf_counter()
+    with get_tracer().span("conversion", **{
+        "run.id": workspace.run_id, "blog.url": blog_url, "tts.voice": voice
+    }) as span, budget.admitted(workspace.run_id, voice, tts_backend, crew=True, decision=admission) as decision:
+        if decision.action == "downgrade":
+            log_event(logger, "conversion.downgraded", run_id=workspace.run_id, plan=decision.to_dict()["plan"])
+        with profiling.stage("crew.setup"):
+            crew = get_crew_factory().create(workspace, tts_backend=decision.plan.tts_backend,
+                                             task_callback=task_callback)
+        if progress:
+            progress(STAGES[0], "started")
+        try:
+            with profiling.stage("crew.kickoff"):
+                result = crew.kickoff(inputs=inputs)
+        except Exception as e:
+            log_event(logger, "conversion.failed", logging.ERROR, workspace.run_id, error=str(e)[:500])
+            raise
+        budget.record_crew_usage(result)
+        artifacts = workspace.artifacts()
+        if not artifacts['audio']:
+            # A failing tool returns an "Error: ..." answer and the crew still finishes
+            error = getattr(result, 'raw', str(result)).strip()[:500] or "the crew returned nothing"
+            log_event(logger, "conversion.failed", logging.ERROR, workspace.run_id, error=error)
+            raise ConversionError(f"No audio was produced: {error}")
+    log_event(logger, "conversion.finished", run_id=workspace.run_id,
+              seconds=round(time.perf_counter() - started, 3), audio_files=len(artifacts['audio']))
+    artifacts['result'] = result
+    artifacts['trace_id'] = span.trace_id
+    record_access(workspace.root)
+    index_episode(workspace, blog_url, voice)
+    return artifacts
+
+
+def run_cli(blog_url: str, voice: str = "alloy", tts_backend: str = None):
+    """
+    Run blog-to-podcast conversion via CLI.
+    
+    Args:
+        blog_url: The URL of the blog post to convert
+        voice: Voice to use for TTS (default: alloy)
+        tts_backend: TTS backend for this run (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+    """
     try:
-        result = BlogToPodcast().crew().kickoff(inputs=inputs)
-        return result
+        return convert(blog_url, voice, tts_backend=tts_backend)['result']
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+def run_stream(blog_url: str, voice: str = "alloy", tts_backend: str = None):
+    """
+    Run blog-to-podcast conversion with streamed script generation.
+
+    Audio segments are synthesized while the script is still being written,
+    so total latency approaches max(LLM, TTS) instead of their sum.
+
+    Args:
+        blog_url: The URL of the blog post to convert
+        voice: Voice to use for TTS (default: alloy)
+        tts_backend: TTS backend for this run (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+    """
+    from blog_to_podcast.streaming import stream_podcast
+    from blog_to_podcast.tools import FirecrawlScraper
+
+    workspace = RunWorkspace.create()
+    with get_tracer().span("conversion.stream", **{
+        "run.id": workspace.run_id, "blog.url": blog_url, "tts.voice": voice
+    }), budget.admitted(workspace.run_id, voice, tts_backend) as decision:
+        blog_content = FirecrawlScraper()._run(blog_url)
+        if blog_content.startswith("Error:"):
+            raise Exception(blog_content)
+        # Kept for the search index's title and author, as the crew does
+        atomic_write_text(workspace.content_path, blog_content)
+
+        try:
+            result = stream_podcast(
+                blog_content,
+                voice=voice,
+                output_dir=workspace.root,
+                tts_backend=decision.plan.tts_backend,
+                on_segment=lambda part, path: print(f"Audio part {part} ready: {path}")
+            )
+        except Exception as e:
+            raise Exception(f"An error occurred while streaming the podcast: {e}")
+    record_access(workspace.root)
+    index_episode(workspace, blog_url, voice)
+    return result
+
+
+def run_fanout(blog_url: str, languages, voice: str = "alloy", tts_backend: str = None):
+    """
+    Produce one post in several languages from a single scrape and script.
+
+    Args:
+        blog_url: The URL of the blog post to convert
+        languages: Target language codes, e.g. ["en", "es", "de"]
+        voice: Voice to use for TTS (default: alloy)
+        tts_backend: TTS backend for every language (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+    """
+    from blog_to_podcast.fanout import convert_languages
+
+    try:
+        result = convert_languages(blog_url, languages, voice, tts_backend)
+    except Exception as e:
+        raise Exception(f"An error occurred while fanning out the podcast: {e}")
+    for language, output in result['languages'].items():
+        if output['error']:
+            print(f"Failed: {output['name']} ({language}): {output['error']}")
+        else:
+            print(f"Done: {output['name']} ({language}) -> {', '.join(str(f) for f in output['audio'])}")
+    return result
+
+
+def run_batch(blog_urls, voice: str = "alloy", workers: int = None, tts_backend: str = None):
+    """
+    Convert many blog posts concurrently on a pool of warm worker processes.
+    
+    Args:
+        blog_urls: Iterable of blog post URLs
+        voice: Voice to use for TTS (default: alloy)
+        workers: Number of worker processes (default: POOL_WORKERS or CPU count)
+        tts_backend: TTS backend for these runs (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+        
+    Returns:
+        List of artifact dictionaries, one per URL, in completion order
+    """
+    from blog_to_podcast.worker_pool import WarmCrewPool
+    
+    results = []
+    with WarmCrewPool(workers=workers) as pool:
+        for artifacts in pool.convert_many(blog_urls, voice, tts_backend):
+            if 'error' in artifacts:
+                print(f"Failed: {artifacts['blog_url']}: {artifacts['error']}")
+            else:
+                print(f"Done: {artifacts['blog_url']} -> {artifacts['run_id']}")
+            results.append(artifacts)
+    return results
+
+
+def run_crawl(root: str, voice: str = "alloy", workers: int = None, include=None, exclude=None,
+              max_depth: int = 3, max_pages: int = 5000, tts_backend: str = None):
+    """
+    Discover every post under a blog root or sitemap and convert them.
+    
+    Conversions start as posts are discovered. Crawl state is kept in
+    output/index/crawl.db, so re-running resumes unfinished posts and only
+    converts new or changed ones.
+    
+    Args:
+        root: Blog root URL or sitemap URL
+        voice: Voice to use for TTS (default: alloy)
+        workers: Number of worker processes (default: POOL_WORKERS or CPU count)
+        include: Regular expressions a post URL must match (any)
+        exclude: Extra regular expressions excluding URLs
+        max_depth: Link depth when no sitemap is available
+        max_pages: Maximum pages fetched for discovery
+        tts_backend: TTS backend for these runs (default: TTS_BACKEND_VOICES / TTS_BACKEND)
+        
+    Returns:
+        URL counts by status for this root
+    """
+    from blog_to_podcast.crawler import crawl_and_convert
+    
+    counts = crawl_and_convert(root, voice, workers, include, exclude, max_depth, max_pages, tts_backend)
+    print("Crawl finished: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    return counts
+
+
 def main():
     """Main entry point for CLI usage."""
     parser = argparse.ArgumentParser(
@@ -113,15 +320,59 @@ def main():
 Examples:
   python -m blog_to_podcast.main --url https://example.com/blog-post
   python -m blog_to_podcast.main --url https://example.com/blog-post --voice nova
+  python -m blog_to_podcast.main --url https://example.com/blog-post --stream
+  python -m blog_to_podcast.main --url https://example.com/blog-post --languages en,es,de
+  python -m blog_to_podcast.main --batch urls.txt --workers 8
+  python -m blog_to_podcast.main --crawl https://example.com/blog --include "/blog/" --max-depth 2
+  python -m blog_to_podcast.main --url https://example.com/blog-post --tts-backend piper
         """
     )
     
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    
+    source.add_argument(
         "--url", 
-        required=True, 
         help="URL of the blog post to convert to podcast"
     )
     
+    source.add_argument(
+        "--batch",
+        help="File with one blog URL per line to convert concurrently"
+    )
+    
+    source.add_argument(
+        "--crawl",
+        help="Blog root or sitemap URL; discover and convert every post (resumable)"
+    )
+    
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        help="Regex a post URL must match for --crawl (repeatable)"
+    )
+    
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Regex excluding URLs from --crawl (repeatable)"
+    )
+    
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=3,
+        help="Link depth for --crawl when the blog has no sitemap (default: 3)"
+    )
+    
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=5000,
+        help="Maximum pages fetched for --crawl discovery (default: 5000)"
+    )
+    
     parser.add_argument(
         "--voice", 
         choices=['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer'],
@@ -129,10 +380,63 @@ Examples:
         help="Voice to use for text-to-speech (default: alloy)"
     )
     
+    parser.add_argument(
+        "--tts-backend",
+        choices=list(BACKENDS),
+        default=None,
+        help="Speech engine for this run (default: TTS_BACKEND_VOICES / TTS_BACKEND, else openai)"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the script into TTS while it is being generated"
+    )
+    
+    parser.add_argument(
+        "--languages",
+        help="Comma-separated language codes; scrape and script once, then translate and voice each"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile a single --url conversion (CPU, sampled stacks, memory) into output/profiles/<run_id>/"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch and --crawl (default: POOL_WORKERS or CPU count)"
+    )
+    
     args = parser.parse_args()
+    if args.profile and (args.batch or args.crawl or args.languages or args.stream):
+        # Only convert() runs under the profiler; fail loudly rather than
+        # silently writing no profile
+        parser.error("--profile only applies to a single --url conversion; "
+                     "it cannot be combined with --batch, --crawl, --languages or --stream")
+    configure_logging()
     
     try:
-        run_cli(args.url, args.voice)
+        if args.batch:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                blog_urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            run_batch(blog_urls, args.voice, args.workers, args.tts_backend)
+        elif args.crawl:
+            run_crawl(args.crawl, args.voice, args.workers, args.include, args.exclude,
+                      args.max_depth, args.max_pages, args.tts_backend)
+        elif args.languages:
+            from blog_to_podcast.fanout import parse_languages
+            run_fanout(args.url, parse_languages(args.languages), args.voice, args.tts_backend)
+        elif args.stream:
+            run_stream(args.url, args.voice, args.tts_backend)
+        elif args.profile:
+            artifacts = convert(args.url, args.voice, profile=True, tts_backend=args.tts_backend)
+            print(f"Profile written to {os.path.dirname(artifacts['profile'])}")
+        else:
+            run_cli(args.url, args.voice, args.tts_backend)
     except KeyboardInterrupt:
         sys.exit(1)
     except Exception as e:
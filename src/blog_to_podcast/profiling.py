@@ -0,0 +1,177 @@
+"""
+Built-in profiling for conversions.
+
+A profiling session captures, for one run:
+    run.prof       cProfile statistics (open with snakeviz, or pstats)
+    stacks.folded  Sampled stacks in folded format, ready for flamegraph.pl,
+                   speedscope or inferno; each stack is rooted at its stage
+    summary.txt    Top-N functions by cumulative time, wall/CPU time per
+                   stage, and the top allocation sites per stage (tracemalloc)
+
+Stages mark the parts of a run worth separating (crew setup, kickoff, script
+cleaning, file writes, rendering). ``stage()`` is a no-op unless a session is
+active, so it can stay in hot paths.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_PROFILES_DIR = os.path.join("output", "profiles")
+
+
+class Profiler:
+    """
+    CPU, sampling and memory profiler for one run.
+
+    Args:
+        output_dir: Directory receiving run.prof, stacks.folded and summary.txt
+        sample_interval: Seconds between stack samples
+        top_n: Number of entries in each summary table
+    """
+
+    def __init__(self, output_dir: str, sample_interval: float = 0.005, top_n: int = 25):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.top_n = top_n
+        self._profile = cProfile.Profile()
+        self._samples: Counter = Counter()
+        self._stages: Dict[int, List[str]] = {}
+        self._stage_stats: List[Dict] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+        self.summary_path: Optional[str] = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and write the output files; returns the summary path."""
+        self._profile.disable()
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return self._write()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        thread_id = threading.get_ident()
+        stack = self._stages.setdefault(thread_id, [])
+        stack.append(name)
+
+        snapshot = None
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            allocations = []
+            peak = 0
+            if snapshot is not None and tracemalloc.is_tracing():
+                peak = tracemalloc.get_traced_memory()[1]
+                diff = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+                allocations = [str(stat) for stat in diff[:self.top_n] if stat.size_diff > 0]
+            self._stage_stats.append({
+                "name": "/".join(stack), "wall": wall, "cpu": cpu,
+                "peak_bytes": peak, "allocations": allocations
+            })
+            stack.pop()
+
+    def _sample_loop(self):
+        own_thread = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                root = [f"thread {names.get(thread_id, thread_id)}"] + list(self._stages.get(thread_id, []))
+                self._samples[";".join(root + stack)] += 1
+
+    def _write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._profile.dump_stats(os.path.join(self.output_dir, "run.prof"))
+
+        with open(os.path.join(self.output_dir, "stacks.folded"), "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        buffer = io.StringIO()
+        buffer.write("=== Stages ===\n")
+        for stats in self._stage_stats:
+            buffer.write(f"{stats['name']}: wall {stats['wall']:.3f}s, cpu {stats['cpu']:.3f}s, "
+                         f"peak traced memory {stats['peak_bytes'] / (1024 * 1024):.1f} MB\n")
+            for line in stats["allocations"][:5]:
+                buffer.write(f"    {line}\n")
+
+        buffer.write(f"\n=== Top {self.top_n} functions by cumulative time ===\n")
+        pstats.Stats(self._profile, stream=buffer).sort_stats("cumulative").print_stats(self.top_n)
+
+        buffer.write(f"\n=== Top {self.top_n} functions by own time ===\n")
+        pstats.Stats(self._profile, stream=buffer).sort_stats("tottime").print_stats(self.top_n)
+
+        summary_path = os.path.join(self.output_dir, "summary.txt")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(buffer.getvalue())
+        return summary_path
+
+
+_active: Optional[Profiler] = None
+
+
+@contextmanager
+def profile_run(run_id: str, base_dir: str = DEFAULT_PROFILES_DIR) -> Iterator[Profiler]:
+    """
+    Profile everything inside the block into ``<base_dir>/<run_id>/``.
+
+    Only one session can be active per process at a time.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("A profiling session is already active")
+    profiler = Profiler(os.path.join(base_dir, run_id))
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active = None
+        profiler.summary_path = profiler.stop()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mark a named stage of the active profiling session (no-op otherwise)."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
@@ -0,0 +1,466 @@
+"""
+Quota-based retention and garbage collection for conversion output.
+
+Every run workspace under ``output/runs`` (and every file in the flat
+``output/audio``, ``output/scripts``, ``output/metadata`` and
+``output/artifacts`` directories) is an entry in a small SQLite index with its size, creation
+time, last access and pin flag. Sizes and usage come from the index, so
+reporting disk usage never walks the output tree.
+
+A background thread works incrementally: each pass reconciles a bounded
+slice of the output directories with the index, then evicts at most a
+bounded number of entries. Evicted entries are:
+
+- unpinned entries idle (not accessed) for longer than RETENTION_MAX_IDLE_DAYS
+- while usage exceeds RETENTION_QUOTA, unpinned entries in least-recently-
+  accessed order until usage is back under the low watermark
+
+Entries modified within the last RETENTION_GRACE_MINUTES are never touched,
+so conversions in progress are neither indexed early nor deleted. Runs
+that are still unfinished in the stage queue or the job store are never
+evicted either, however long they wait between stages. Access
+is recorded when a conversion finishes, when its result is shown or its
+parts are downloaded in the app, when the API serves its files and when
+its audio is reused for a duplicate post. Pinned episodes are never
+evicted. An evicted run also leaves the search index, and evicted audio
+is detached from the duplicate index so it is never offered for reuse.
+
+Usage:
+    python -m blog_to_podcast.retention status
+    python -m blog_to_podcast.retention collect
+    python -m blog_to_podcast.retention pin <run_id | path>
+    python -m blog_to_podcast.retention unpin <run_id | path>
+
+Configuration (environment variables):
+    RETENTION_QUOTA            Disk quota for managed output, e.g. 20GB (default: none)
+    RETENTION_MAX_IDLE_DAYS    Evict entries not accessed for this long (default: never)
+    RETENTION_GRACE_MINUTES    Leave recently modified entries alone (default: 10)
+    RETENTION_INTERVAL         Seconds between background passes (default: 60)
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from blog_to_podcast.dedup import get_duplicate_index
+from blog_to_podcast.jobs import TERMINAL_STATUSES, jobs_path
+from blog_to_podcast.search_index import get_search_index
+from blog_to_podcast.workspace import DEFAULT_RUNS_DIR
+
+DEFAULT_RETENTION_PATH = os.path.join("output", "index", "retention.db")
+LEGACY_DIRS = [os.path.join("output", name) for name in ("audio", "scripts", "metadata", "artifacts")]
+# The stage queue's default database; stage_queue is not imported here because it loads the crew
+DEFAULT_QUEUE_PATH = os.path.join("output", "index", "stage_queue.db")
+
+# Usage is brought down to this fraction of the quota once exceeded
+LOW_WATERMARK = 0.9
+# Work done per background pass, to keep each pass short
+RECONCILE_BATCH = 500
+EVICT_BATCH = 50
+
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*$", re.I)
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2,
+               "G": 1024 ** 3, "GB": 1024 ** 3, "T": 1024 ** 4, "TB": 1024 ** 4}
+
+
+def parse_size(value: Optional[str]) -> Optional[int]:
+    """Parse "20GB", "500 MB" or a byte count; empty means no limit."""
+    if not value:
+        return None
+    match = _SIZE.match(value)
+    if not match:
+        raise ValueError(f"invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def _tree_stats(path: str) -> Tuple[int, float]:
+    """Total size and newest modification time of a file or directory tree."""
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime
+    size, newest = 0, os.stat(path).st_mtime
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime)
+    return size, newest
+
+
+class RetentionManager:
+    """
+    Index of output entries with quota, idle-time and pin-based eviction.
+
+    Args:
+        path: SQLite index path (default: output/index/retention.db)
+        runs_dir: Run workspaces directory; each run is one entry
+        legacy_dirs: Flat directories whose files are entries of their own
+        quota_bytes: Disk quota (default: RETENTION_QUOTA; None disables)
+        max_idle_days: Idle time before eviction (default: RETENTION_MAX_IDLE_DAYS; None disables)
+        grace_seconds: Entries modified more recently are left alone
+    """
+
+    def __init__(self, path: str = DEFAULT_RETENTION_PATH, runs_dir: str = DEFAULT_RUNS_DIR,
+                 legacy_dirs: Optional[List[str]] = None, quota_bytes: Optional[int] = None,
+                 max_idle_days: Optional[float] = None, grace_seconds: Optional[float] = None):
+        self.path = path
+        self.runs_dir = runs_dir
+        self.legacy_dirs = LEGACY_DIRS if legacy_dirs is None else legacy_dirs
+        self.quota_bytes = quota_bytes if quota_bytes is not None else parse_size(os.getenv("RETENTION_QUOTA"))
+        if max_idle_days is None and os.getenv("RETENTION_MAX_IDLE_DAYS"):
+            max_idle_days = float(os.getenv("RETENTION_MAX_IDLE_DAYS"))
+        self.max_idle_days = max_idle_days
+        self.grace_seconds = grace_seconds if grace_seconds is not None else \
+            float(os.getenv("RETENTION_GRACE_MINUTES", "10")) * 60
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._cursors: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        with self._connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    pinned INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS entries_lru ON entries (pinned, last_access);
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _entry_path(self, path: str) -> Optional[str]:
+        """The managed entry containing path: its run directory or legacy file."""
+        path = os.path.normpath(path)
+        runs_dir = os.path.normpath(self.runs_dir)
+        if os.path.commonpath([os.path.abspath(path), os.path.abspath(runs_dir)]) == os.path.abspath(runs_dir):
+            relative = os.path.relpath(path, runs_dir)
+            if relative != ".":
+                return os.path.join(runs_dir, relative.split(os.sep)[0])
+        for directory in self.legacy_dirs:
+            if os.path.dirname(os.path.abspath(path)) == os.path.abspath(directory):
+                return os.path.join(os.path.normpath(directory), os.path.basename(path))
+        return None
+
+    def _resolve(self, target: str) -> Optional[str]:
+        """Accept a run ID or any path inside an entry."""
+        if os.sep not in target and os.path.isdir(os.path.join(self.runs_dir, target)):
+            return os.path.join(os.path.normpath(self.runs_dir), target)
+        return self._entry_path(target)
+
+    def register(self, path: str) -> Optional[str]:
+        """Index (or re-measure) the entry containing path."""
+        entry = self._entry_path(path)
+        if entry is None or not os.path.exists(entry):
+            return None
+        size, modified = _tree_stats(entry)
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT INTO entries (path, size, created, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET size = excluded.size",
+                (entry, size, modified, modified)
+            )
+        return entry
+
+    def touch(self, path: str):
+        """Record an access to the entry containing path."""
+        entry = self._entry_path(path)
+        if entry is None:
+            return
+        connection = self._connection()
+        with connection:
+            updated = connection.execute(
+                "UPDATE entries SET last_access = ? WHERE path = ?", (time.time(), entry)
+            ).rowcount
+        if not updated:
+            self.register(entry)
+
+    def set_pinned(self, target: str, pinned: bool = True) -> Optional[str]:
+        """Pin or unpin an entry by run ID or path; returns the entry path."""
+        entry = self._resolve(target)
+        if entry is None or not os.path.exists(entry):
+            return None
+        self.register(entry)
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE entries SET pinned = ? WHERE path = ?", (int(pinned), entry))
+        return entry
+
+    def is_pinned(self, target: str) -> bool:
+        entry = self._resolve(target)
+        row = self._connection().execute("SELECT pinned FROM entries WHERE path = ?", (entry,)).fetchone()
+        return bool(row and row[0])
+
+    def usage(self) -> Dict:
+        """Indexed usage: entries, bytes, pinned bytes and the configured limits."""
+        count, total, pinned = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(CASE WHEN pinned THEN size END), 0) FROM entries"
+        ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total,
+            "pinned_bytes": pinned,
+            "quota_bytes": self.quota_bytes,
+            "max_idle_days": self.max_idle_days,
+        }
+
+    def reconcile(self, batch: Optional[int] = RECONCILE_BATCH) -> Tuple[int, int]:
+        """
+        Sync a slice of the output directories with the index.
+
+        Each call continues after the last name seen in every directory, so
+        repeated calls cover the whole tree without scanning it at once.
+        ``batch=None`` syncs everything in one call.
+
+        Returns:
+            (entries added, entries dropped because they vanished)
+        """
+        connection = self._connection()
+        now = time.time()
+        added = dropped = 0
+        for directory in [self.runs_dir] + self.legacy_dirs:
+            if not os.path.isdir(directory):
+                continue
+            directory = os.path.normpath(directory)
+            cursor = self._cursors.get(directory, "")
+            names = sorted(name for name in os.listdir(directory)
+                           if name > cursor and not name.startswith(".tmp_"))
+            if batch is not None:
+                names = names[:batch]
+                # Start over from the beginning once the end is reached
+                self._cursors[directory] = names[-1] if len(names) == batch else ""
+            if not names:
+                continue
+
+            entries = [os.path.join(directory, name) for name in names]
+            known = set()
+            for start in range(0, len(entries), 500):
+                chunk = entries[start:start + 500]
+                known.update(row[0] for row in connection.execute(
+                    f"SELECT path FROM entries WHERE path IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            for entry in entries:
+                if entry in known:
+                    continue
+                try:
+                    _, modified = _tree_stats(entry)
+                except FileNotFoundError:
+                    continue
+                if now - modified >= self.grace_seconds:
+                    self.register(entry)
+                    added += 1
+
+        query = "SELECT path FROM entries" + (" ORDER BY RANDOM() LIMIT ?" if batch is not None else "")
+        for (entry,) in connection.execute(query, (batch,) if batch is not None else ()).fetchall():
+            if not os.path.exists(entry):
+                with connection:
+                    connection.execute("DELETE FROM entries WHERE path = ?", (entry,))
+                dropped += 1
+        return added, dropped
+
+    def _remove(self, entry: str) -> int:
+        """Delete an entry from disk and the index; returns bytes freed."""
+        row = self._connection().execute("SELECT size FROM entries WHERE path = ?", (entry,)).fetchone()
+        try:
+            if os.path.isdir(entry):
+                shutil.rmtree(entry)
+            elif os.path.exists(entry):
+                os.remove(entry)
+        except OSError:
+            return 0
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM entries WHERE path = ?", (entry,))
+        if os.path.dirname(entry) == os.path.normpath(self.runs_dir):
+            get_search_index().remove_run(os.path.basename(entry))
+        # Deleted audio must not be offered for reuse to later duplicates
+        index = get_duplicate_index()
+        if index is not None:
+            index.detach_audio(entry)
+        return row[0] if row else 0
+
+    def active_runs(self) -> Set[str]:
+        """
+        Run IDs whose workspaces may still be written to.
+
+        These are runs still running in the stage queue (including items
+        waiting for their next stage) and jobs not yet succeeded or failed.
+        Both databases are read only if they exist.
+        """
+        sources = [
+            (os.getenv("STAGE_QUEUE_PATH", DEFAULT_QUEUE_PATH), "SELECT run_id FROM runs WHERE status = 'running'", ()),
+            (jobs_path(), f"SELECT run_id FROM jobs WHERE run_id IS NOT NULL AND status NOT IN "
+                          f"({','.join('?' * len(TERMINAL_STATUSES))})", TERMINAL_STATUSES),
+        ]
+        active = set()
+        for path, query, parameters in sources:
+            if not os.path.exists(path):
+                continue
+            try:
+                connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, timeout=5)
+                try:
+                    active.update(row[0] for row in connection.execute(query, parameters))
+                finally:
+                    connection.close()
+            except sqlite3.Error:
+                # A table that does not exist yet has no active runs
+                continue
+        return active
+
+    def _in_use(self, entry: str, now: float, active: Set[str]) -> bool:
+        if os.path.dirname(entry) == os.path.normpath(self.runs_dir) and os.path.basename(entry) in active:
+            return True
+        return self._recently_modified(entry, now)
+
+    def collect(self, limit: int = EVICT_BATCH) -> Dict[str, int]:
+        """
+        Evict up to limit entries by idle time, then by quota (LRU).
+
+        Recently modified entries and runs still in progress are skipped.
+
+        Returns:
+            Counts of evicted entries and freed bytes
+        """
+        connection = self._connection()
+        now = time.time()
+        evicted = freed = 0
+        active = self.active_runs()
+
+        if self.max_idle_days:
+            idle = connection.execute(
+                "SELECT path, created FROM entries WHERE pinned = 0 AND last_access < ? "
+                "ORDER BY last_access LIMIT ?", (now - self.max_idle_days * 86400, limit + len(active))
+            ).fetchall()
+            for entry, _ in idle:
+                if evicted >= limit:
+                    break
+                if not self._in_use(entry, now, active):
+                    freed += self._remove(entry)
+                    evicted += 1
+
+        if self.quota_bytes is not None and evicted < limit:
+            usage = self.usage()["bytes"]
+            if usage > self.quota_bytes:
+                target = self.quota_bytes * LOW_WATERMARK
+                for entry, size in connection.execute(
+                        "SELECT path, size FROM entries WHERE pinned = 0 ORDER BY last_access LIMIT ?",
+                        (limit - evicted + len(active),)).fetchall():
+                    if usage <= target or evicted >= limit:
+                        break
+                    if self._in_use(entry, now, active):
+                        continue
+                    removed = self._remove(entry)
+                    usage -= removed
+                    freed += removed
+                    evicted += 1
+
+        return {"evicted": evicted, "freed_bytes": freed}
+
+    def _recently_modified(self, entry: str, now: float) -> bool:
+        try:
+            return now - _tree_stats(entry)[1] < self.grace_seconds
+        except FileNotFoundError:
+            return False
+
+    def run_once(self) -> Dict[str, int]:
+        """One incremental pass: reconcile a slice, then evict a bounded batch."""
+        added, dropped = self.reconcile()
+        stats = self.collect()
+        stats.update(added=added, dropped=dropped)
+        return stats
+
+    def _loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except (OSError, sqlite3.Error):
+                # Retention is best effort; the next pass tries again
+                pass
+
+    def start(self, interval: Optional[float] = None):
+        """Start the background thread (once per manager)."""
+        if self._thread and self._thread.is_alive():
+            return
+        interval = interval or float(os.getenv("RETENTION_INTERVAL", "60"))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_manager: Optional[RetentionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_retention_manager() -> RetentionManager:
+    """Process-wide retention manager configured from the environment."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = RetentionManager()
+        return _manager
+
+
+def record_access(path) -> None:
+    """Record that an output file was used; never fails the caller."""
+    try:
+        get_retention_manager().touch(str(path))
+    except (OSError, sqlite3.Error, ValueError):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output retention and garbage collection")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show indexed usage and limits")
+    commands.add_parser("collect", help="Index the output tree and evict until within limits")
+    for name in ("pin", "unpin"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} an episode")
+        command.add_argument("target", help="Run ID or a path inside the episode")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    manager = get_retention_manager()
+
+    if args.command in ("pin", "unpin"):
+        entry = manager.set_pinned(args.target, args.command == "pin")
+        print(f"{args.command.capitalize()}ned {entry}" if entry else f"No episode found for {args.target}")
+        return
+    if args.command == "collect":
+        # Sync the whole tree once, then evict in batches until within limits
+        manager.reconcile(batch=None)
+        while True:
+            stats = manager.collect()
+            if not stats["evicted"]:
+                break
+            print(f"Evicted {stats['evicted']} entries, freed {stats['freed_bytes'] / 1024 ** 2:.1f} MB")
+
+    usage = manager.usage()
+    quota = f"{usage['quota_bytes'] / 1024 ** 3:.2f} GB" if usage["quota_bytes"] is not None else "none"
+    idle = f"{usage['max_idle_days']:g} days" if usage["max_idle_days"] else "never"
+    print(f"Entries: {usage['entries']}  Used: {usage['bytes'] / 1024 ** 2:.1f} MB  "
+          f"Pinned: {usage['pinned_bytes'] / 1024 ** 2:.1f} MB  Quota: {quota}  Idle eviction: {idle}")
+
+
+if __name__ == "__main__":
+    main()
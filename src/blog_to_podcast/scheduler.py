@@ -0,0 +1,116 @@
+"""
+Priority classes and weighted fair sharing for the stage queue.
+
+Every run belongs to a class: ``interactive`` (a user waiting in the app),
+``scheduled`` (regular API or cron submissions) or ``backfill`` (bulk
+re-conversions and crawls). At each stage boundary a free worker picks the
+class to serve by stride scheduling: a class advances its pass by
+``STRIDE / weight`` each time it is served and the class with the lowest
+pass goes next, so under contention classes share workers (and with them
+the LLM/TTS quota) in proportion to their weights.
+
+A class that had nothing queued re-enters at the current virtual time
+instead of its stale pass, and ties go to the higher-priority class. An
+interactive run arriving behind a long backfill is therefore served at the
+very next claim of every stage, and its latency does not depend on the size
+of the background backlog.
+
+Queue wait (ready to claimed) is recorded per stage and class and exported
+to ``SCHEDULER_METRICS_PATH``.
+
+Configuration (environment variables):
+    SCHEDULER_WEIGHTS        Class weights (default: interactive=16,scheduled=4,backfill=1)
+    SCHEDULER_METRICS_PATH   Wait-time export (default: output/metrics/scheduler.json)
+"""
+
+import datetime
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Tuple
+
+from blog_to_podcast.workspace import atomic_write_text
+
+# Highest priority first; also the tie-break order
+PRIORITY_CLASSES = ["interactive", "scheduled", "backfill"]
+DEFAULT_CLASS = "scheduled"
+DEFAULT_WEIGHTS = {"interactive": 16, "scheduled": 4, "backfill": 1}
+STRIDE = 1_000_000.0
+
+DEFAULT_METRICS_PATH = os.path.join("output", "metrics", "scheduler.json")
+
+
+def class_weights() -> Dict[str, float]:
+    """Read SCHEDULER_WEIGHTS ("class=weight,..."); unlisted classes keep their default."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in os.getenv("SCHEDULER_WEIGHTS", "").split(","):
+        if "=" not in part:
+            continue
+        name, value = (item.strip() for item in part.split("=", 1))
+        if name not in PRIORITY_CLASSES:
+            raise ValueError(f"unknown priority class in SCHEDULER_WEIGHTS: {name!r}")
+        if float(value) <= 0:
+            raise ValueError(f"SCHEDULER_WEIGHTS weight for {name} must be positive")
+        weights[name] = float(value)
+    return weights
+
+
+def choose_class(backlogged: Iterable[str], passes: Dict[str, float], virtual_time: float,
+                 weights: Dict[str, float]) -> Tuple[str, float, float]:
+    """
+    Pick the class to serve next by stride scheduling.
+
+    Args:
+        backlogged: Classes with work ready
+        passes: Stored pass of each class (missing means never served)
+        virtual_time: Pass of the most recently served class
+        weights: Class weights
+
+    Returns:
+        (class, its new pass, the new virtual time)
+    """
+    effective = {name: max(passes.get(name, 0.0), virtual_time) for name in backlogged}
+    chosen = min(effective, key=lambda name: (effective[name], PRIORITY_CLASSES.index(name)))
+    return chosen, effective[chosen] + STRIDE / weights[chosen], effective[chosen]
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize_waits(waits: Iterable[Tuple[str, str, float]]) -> Dict[str, Dict[str, Dict]]:
+    """
+    Summarise (stage, class, wait seconds) samples per stage and class.
+
+    Returns:
+        {stage: {class: {"count", "mean", "p50", "p95", "max"}}}
+    """
+    grouped: Dict[Tuple[str, str], List[float]] = {}
+    for stage, priority, wait in waits:
+        grouped.setdefault((stage, priority), []).append(max(wait, 0.0))
+
+    summary: Dict[str, Dict[str, Dict]] = {}
+    for (stage, priority), samples in sorted(grouped.items()):
+        samples.sort()
+        summary.setdefault(stage, {})[priority] = {
+            "count": len(samples),
+            "mean": round(sum(samples) / len(samples), 3),
+            "p50": round(_percentile(samples, 50), 3),
+            "p95": round(_percentile(samples, 95), 3),
+            "max": round(samples[-1], 3),
+        }
+    return summary
+
+
+def export_metrics(summary: Dict, window_seconds: float, path: str = None) -> str:
+    """Write queue-wait metrics as JSON and return the path."""
+    path = path or os.getenv("SCHEDULER_METRICS_PATH", DEFAULT_METRICS_PATH)
+    document = {
+        "updated": datetime.datetime.now().isoformat(),
+        "window_seconds": window_seconds,
+        "weights": class_weights(),
+        "queue_wait_seconds": summary,
+    }
+    return atomic_write_text(path, json.dumps(document, indent=2))
@@ -0,0 +1,647 @@
+"""
+Stage-specialised workers over a shared, durable work queue.
+
+The crew runs scraping, script generation and TTS as one sequential unit
+per URL, so a conversion holds every resource for its whole duration.
+Here each stage is a separate work item in a SQLite queue, claimed by
+workers dedicated to that stage: scrape workers are limited by politeness,
+script workers by the LLM's quota or local batch size, TTS workers by
+synthesis throughput, and each pool is sized for its own bottleneck, e.g.
+4 scrape, 2 script and 16 TTS workers.
+
+Stages pass artifacts by reference: the scrape stage writes the article
+to the run workspace (``metadata/blog_content.md``) and enqueues the
+script stage with that path; the script stage writes
+``scripts/podcast_script.txt`` and enqueues TTS, which writes the audio and
+info files. Work items are leased; an item whose worker died becomes
+claimable again once its lease expires, and failures are retried up to
+``STAGE_MAX_ATTEMPTS`` times. Only the worker holding an item's lease can
+complete or fail it, so a reclaimed item's next stage is queued once.
+
+Runs carry a priority class (interactive, scheduled, backfill). At every
+claim the stage's workers pick a class by weighted fair sharing, so an
+interactive run jumps ahead of queued background work at each stage
+boundary (see ``scheduler.py``).
+
+Runs are admitted against the configured budgets when they are enqueued
+(see ``budget.py``): a rejected run is never queued, a downgraded run
+carries its cheaper plan in the payload, and a run queued for budget is
+admitted again each time a scrape worker picks it up, without using up
+its attempts. Every stage is metered and checks its own estimate, from
+the real article and script length, before it spends anything.
+
+Any number of worker processes, on one machine or on several sharing the
+queue file and ``output/runs`` (e.g. over NFS), can serve the same queue.
+SQLite is the local stand-in; the queue operations are the ones a Redis or
+database-backed queue would provide.
+
+Usage:
+    python -m blog_to_podcast.stage_queue enqueue <url> [<url> ...] [--voice nova] [--priority backfill] [--user U]
+    python -m blog_to_podcast.stage_queue work --scrape 4 --script 2 --audio 16
+    python -m blog_to_podcast.stage_queue status
+
+Configuration (environment variables):
+    STAGE_QUEUE_PATH       Queue database (default: output/index/stage_queue.db)
+    STAGE_LEASE_SECONDS    Lease on a claimed item before others may take it (default: 900)
+    STAGE_MAX_ATTEMPTS     Attempts per stage before a run fails (default: 3)
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from blog_to_podcast import budget, scheduler
+from blog_to_podcast.crew_factory import STAGES
+from blog_to_podcast.logging_config import configure_logging, get_logger, log_event
+from blog_to_podcast.retention import get_retention_manager, record_access
+from blog_to_podcast.search_index import index_episode
+from blog_to_podcast.tracing import get_tracer
+from blog_to_podcast.workspace import DEFAULT_RUNS_DIR, RunWorkspace, atomic_write_text
+
+logger = get_logger("queue")
+
+DEFAULT_QUEUE_PATH = os.path.join("output", "index", "stage_queue.db")
+# Seconds an idle worker waits before polling the queue again
+POLL_SECONDS = 1.0
+# Queue-wait metrics cover this window and are exported this often
+METRICS_WINDOW_SECONDS = 3600.0
+METRICS_INTERVAL_SECONDS = 30.0
+
+
+class StageError(Exception):
+    """A stage could not produce its artifact."""
+
+
+@dataclass
+class WorkItem:
+    """One stage of one run, claimed by a worker."""
+    id: int
+    run_id: str
+    stage: str
+    attempts: int
+    payload: Dict
+    priority: str = scheduler.DEFAULT_CLASS
+    owner: Optional[str] = None
+
+
+class StageQueue:
+    """
+    Durable queue of per-stage work items and the runs they belong to.
+
+    Args:
+        path: SQLite database path (default: STAGE_QUEUE_PATH or output/index/stage_queue.db)
+        lease_seconds: How long a claimed item stays reserved for its worker
+        max_attempts: Attempts per stage before the run is marked failed
+    """
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None):
+        self.path = path or os.getenv("STAGE_QUEUE_PATH", DEFAULT_QUEUE_PATH)
+        self.lease_seconds = lease_seconds or float(os.getenv("STAGE_LEASE_SECONDS", "900"))
+        self.max_attempts = max_attempts or int(os.getenv("STAGE_MAX_ATTEMPTS", "3"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._transaction() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    blog_url TEXT NOT NULL,
+                    root TEXT NOT NULL,
+                    priority TEXT NOT NULL DEFAULT 'scheduled',
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    error TEXT,
+                    created TEXT NOT NULL,
+                    updated TEXT NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS work (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    priority TEXT NOT NULL DEFAULT 'scheduled',
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_expires REAL,
+                    available_at REAL NOT NULL,
+                    error TEXT,
+                    created TEXT NOT NULL,
+                    updated TEXT NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS shares (
+                    stage TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    pass REAL NOT NULL,
+                    PRIMARY KEY (stage, priority)
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS clocks (
+                    stage TEXT PRIMARY KEY,
+                    virtual_time REAL NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS waits (
+                    stage TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    wait REAL NOT NULL,
+                    claimed REAL NOT NULL
+                )
+            """)
+            # Queues created before priority classes existed
+            for table in ("runs", "work"):
+                columns = {row["name"] for row in connection.execute(f"PRAGMA table_info({table})")}
+                if "priority" not in columns:
+                    connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN priority TEXT NOT NULL DEFAULT 'scheduled'"
+                    )
+            connection.execute("CREATE INDEX IF NOT EXISTS work_ready ON work (stage, status, available_at, id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS waits_claimed ON waits (claimed)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit mode: transactions are opened explicitly below
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction taking the database lock up front, so claims never race."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _add_work(self, connection: sqlite3.Connection, run_id: str, stage: str, priority: str,
+                  payload: Dict, now: str):
+        connection.execute(
+            "INSERT INTO work (run_id, stage, priority, payload, status, available_at, created, updated) "
+            "VALUES (?, ?, ?, ?, 'ready', ?, ?, ?)",
+            (run_id, stage, priority, json.dumps(payload), time.time(), now, now)
+        )
+        connection.execute(
+            "UPDATE runs SET stage = ?, updated = ? WHERE run_id = ?", (stage, now, run_id)
+        )
+
+    def enqueue(self, blog_url: str, voice: str = "alloy", tts_backend: Optional[str] = None,
+                base_dir: str = DEFAULT_RUNS_DIR, priority: str = scheduler.DEFAULT_CLASS,
+                user: Optional[str] = None, batch_id: Optional[str] = None) -> str:
+        """
+        Admit a run against the budgets, create its workspace and queue its first (scrape) stage.
+
+        Args:
+            priority: Priority class of the run (interactive, scheduled or backfill)
+            user: User the run is charged to
+            batch_id: Batch the run is charged to
+
+        Returns:
+            The run ID
+
+        Raises:
+            budget.BudgetExceeded: If the run is rejected
+        """
+        if priority not in scheduler.PRIORITY_CLASSES:
+            raise ValueError(f"unknown priority class {priority!r}")
+        decision = budget.admit([uuid.uuid4().hex], voice, tts_backend, user, batch_id)[0]
+        if decision.action == "reject":
+            raise budget.BudgetExceeded(f"Budget exceeded: {decision.reason}")
+        workspace = RunWorkspace.create(base_dir=base_dir)
+        now = datetime.datetime.now().isoformat()
+        payload = {"blog_url": blog_url, "voice": voice, "tts_backend": tts_backend, "root": workspace.root,
+                   "budget": decision.to_dict()}
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO runs (run_id, blog_url, root, priority, status, created, updated) "
+                "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+                (workspace.run_id, blog_url, workspace.root, priority, now, now)
+            )
+            self._add_work(connection, workspace.run_id, STAGES[0], priority, payload, now)
+        return workspace.run_id
+
+    def claim(self, stage: str, owner: str) -> Optional[WorkItem]:
+        """
+        Lease the next item of a stage.
+
+        The priority class is chosen by weighted fair sharing; within a
+        class the oldest item goes first. Items whose lease has expired
+        (their worker died or hung) are available again.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            ready = connection.execute(
+                "SELECT priority, MIN(id) AS id FROM work "
+                "WHERE stage = ? AND ((status = 'ready' AND available_at <= ?) "
+                "OR (status = 'leased' AND lease_expires < ?)) GROUP BY priority",
+                (stage, now, now)
+            ).fetchall()
+            if not ready:
+                return None
+
+            oldest = {row["priority"]: row["id"] for row in ready}
+            passes = dict(connection.execute(
+                "SELECT priority, pass FROM shares WHERE stage = ?", (stage,)
+            ).fetchall())
+            clock = connection.execute("SELECT virtual_time FROM clocks WHERE stage = ?", (stage,)).fetchone()
+            priority, new_pass, virtual_time = scheduler.choose_class(
+                oldest, passes, clock["virtual_time"] if clock else 0.0, scheduler.class_weights()
+            )
+            connection.execute(
+                "INSERT INTO shares (stage, priority, pass) VALUES (?, ?, ?) "
+                "ON CONFLICT (stage, priority) DO UPDATE SET pass = excluded.pass",
+                (stage, priority, new_pass)
+            )
+            connection.execute(
+                "INSERT INTO clocks (stage, virtual_time) VALUES (?, ?) "
+                "ON CONFLICT (stage) DO UPDATE SET virtual_time = excluded.virtual_time",
+                (stage, virtual_time)
+            )
+
+            row = connection.execute(
+                "SELECT id, run_id, stage, priority, attempts, payload, status, available_at, lease_expires "
+                "FROM work WHERE id = ?", (oldest[priority],)
+            ).fetchone()
+            ready_since = row["lease_expires"] if row["status"] == "leased" else row["available_at"]
+            connection.execute(
+                "INSERT INTO waits (stage, priority, wait, claimed) VALUES (?, ?, ?, ?)",
+                (stage, priority, now - ready_since, now)
+            )
+            connection.execute(
+                "UPDATE work SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated = ? WHERE id = ?",
+                (owner, now + self.lease_seconds, datetime.datetime.now().isoformat(), row["id"])
+            )
+        return WorkItem(row["id"], row["run_id"], row["stage"], row["attempts"] + 1,
+                        json.loads(row["payload"]), row["priority"], owner)
+
+    def complete(self, item: WorkItem, payload: Dict) -> bool:
+        """
+        Finish an item and queue the run's next stage (or finish the run).
+
+        Returns:
+            False if the item's lease expired and another worker reclaimed it;
+            nothing is queued then, so the next stage runs only once
+        """
+        now = datetime.datetime.now().isoformat()
+        position = STAGES.index(item.stage)
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE work SET status = 'done', owner = NULL, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND owner = ? AND status = 'leased'",
+                (now, item.id, item.owner)
+            ).rowcount
+            if not updated:
+                return False
+            if position + 1 < len(STAGES):
+                self._add_work(connection, item.run_id, STAGES[position + 1], item.priority, payload, now)
+            else:
+                connection.execute(
+                    "UPDATE runs SET status = 'succeeded', updated = ? WHERE run_id = ?", (now, item.run_id)
+                )
+        return True
+
+    def fail(self, item: WorkItem, error: str, retry: bool = True) -> bool:
+        """
+        Retry an item with backoff, or fail its run after max_attempts (at once without retry).
+
+        Returns:
+            Whether the run failed (False as well if another worker has
+            reclaimed the item, which then decides its outcome)
+        """
+        now = datetime.datetime.now().isoformat()
+        with self._transaction() as connection:
+            if retry and item.attempts < self.max_attempts:
+                connection.execute(
+                    "UPDATE work SET status = 'ready', owner = NULL, lease_expires = NULL, available_at = ?, "
+                    "error = ?, updated = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                    (time.time() + 2 ** item.attempts, error, now, item.id, item.owner)
+                )
+                return False
+            updated = connection.execute(
+                "UPDATE work SET status = 'failed', owner = NULL, lease_expires = NULL, error = ?, "
+                "updated = ? WHERE id = ? AND owner = ? AND status = 'leased'", (error, now, item.id, item.owner)
+            ).rowcount
+            if updated:
+                connection.execute(
+                    "UPDATE runs SET status = 'failed', error = ?, updated = ? WHERE run_id = ?",
+                    (error, now, item.run_id)
+                )
+        return bool(updated)
+
+    def defer(self, item: WorkItem, delay: float, reason: str):
+        """Put an item back for later without counting the attempt (e.g. a run queued for budget)."""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE work SET status = 'ready', owner = NULL, lease_expires = NULL, available_at = ?, "
+                "attempts = attempts - 1, error = ?, updated = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + delay, reason, datetime.datetime.now().isoformat(), item.id, item.owner)
+            )
+
+    def run(self, run_id: str) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def wait(self, run_id: str, timeout: Optional[float] = None,
+             on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Block until a run succeeds or fails and return its record.
+
+        Args:
+            timeout: Seconds to wait (default: no limit)
+            on_stage: Called with each stage the run enters
+
+        Raises:
+            TimeoutError: when the run is still running after timeout
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        stage = None
+        while True:
+            run = self.run(run_id)
+            if run is None:
+                raise KeyError(f"unknown run {run_id}")
+            if on_stage and run["stage"] != stage:
+                stage = run["stage"]
+                on_stage(stage)
+            if run["status"] != "running":
+                return run
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"run {run_id} still {run['stage']} after {timeout:.0f}s")
+            time.sleep(POLL_SECONDS)
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Work items per stage and status."""
+        counts: Dict[str, Dict[str, int]] = {stage: {} for stage in STAGES}
+        for stage, status, count in self._connection().execute(
+                "SELECT stage, status, COUNT(*) FROM work GROUP BY stage, status"):
+            counts.setdefault(stage, {})[status] = count
+        return counts
+
+    def run_counts(self) -> Dict[str, int]:
+        return dict(self._connection().execute("SELECT status, COUNT(*) FROM runs GROUP BY status").fetchall())
+
+    def backlog(self) -> Dict[str, Dict[str, int]]:
+        """Ready items per stage and priority class."""
+        backlog: Dict[str, Dict[str, int]] = {stage: {} for stage in STAGES}
+        for stage, priority, count in self._connection().execute(
+                "SELECT stage, priority, COUNT(*) FROM work WHERE status = 'ready' GROUP BY stage, priority"):
+            backlog.setdefault(stage, {})[priority] = count
+        return backlog
+
+    def wait_metrics(self, window_seconds: float = METRICS_WINDOW_SECONDS) -> Dict[str, Dict[str, Dict]]:
+        """Queue wait per stage and priority class over the recent window."""
+        rows = self._connection().execute(
+            "SELECT stage, priority, wait FROM waits WHERE claimed >= ?", (time.time() - window_seconds,)
+        ).fetchall()
+        return scheduler.summarize_waits((row["stage"], row["priority"], row["wait"]) for row in rows)
+
+    def export_wait_metrics(self, window_seconds: float = METRICS_WINDOW_SECONDS) -> str:
+        """Drop samples older than the window and export the rest (see scheduler.export_metrics)."""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM waits WHERE claimed < ?", (time.time() - window_seconds,))
+        return scheduler.export_metrics(self.wait_metrics(window_seconds), window_seconds)
+
+
+def _check(output: str) -> str:
+    """Tools report failures as "Error: ..." strings."""
+    if output and output.startswith("Error: Budget exceeded"):
+        # Retrying cannot make a run fit its budget
+        raise budget.BudgetExceeded(output[len("Error: "):])
+    if not output or output.startswith("Error:"):
+        raise StageError(output or "empty output")
+    return output
+
+
+def run_stage(item: WorkItem) -> Dict:
+    """
+    Execute one stage and return the payload for the next one.
+
+    Every stage reads its input from the path the previous stage recorded
+    and writes its output into the run workspace. Spend is recorded against
+    the run's budget decision, and a run queued for budget is admitted
+    again first.
+
+    Raises:
+        budget.BudgetDeferred: If the run is still queued for budget
+        budget.BudgetExceeded: If the run or this stage does not fit the budgets
+    """
+    # Imported here so a queue-only process (enqueue/status) stays light
+    from blog_to_podcast.tools import AudioGenerator, ContentProcessor, FirecrawlScraper
+
+    payload = dict(item.payload)
+    workspace = RunWorkspace(run_id=item.run_id, root=payload["root"])
+    decision = budget.Decision.from_dict(payload["budget"]) if payload.get("budget") else None
+    if decision and decision.action == "queue":
+        decision = budget.admit_one(decision.ticket, payload.get("voice", "alloy"), payload.get("tts_backend"),
+                                    decision.user, decision.batch_id)
+        if decision.action == "queue":
+            raise budget.BudgetDeferred(decision.reason)
+        if decision.action == "reject":
+            raise budget.BudgetExceeded(f"Budget exceeded: {decision.reason}")
+        payload["budget"] = decision.to_dict()
+    tts_backend = decision.plan.tts_backend if decision else payload.get("tts_backend")
+
+    # Reservations are released once the run succeeds or fails for good (see StageWorkers)
+    with budget.metered(decision, item.run_id, settle=False) if decision else nullcontext():
+        if item.stage == "scrape":
+            content = _check(FirecrawlScraper()._run(payload["blog_url"]))
+            payload["content_path"] = atomic_write_text(workspace.content_path, content)
+        elif item.stage == "script":
+            with open(payload["content_path"], encoding="utf-8") as f:
+                content = f.read()
+            # ContentProcessor and AudioGenerator check their own stage estimates
+            script = _check(ContentProcessor()._run(content))
+            payload["script_path"] = atomic_write_text(workspace.script_path, script)
+        elif item.stage == "audio":
+            with open(payload["script_path"], encoding="utf-8") as f:
+                script = f.read()
+            generator = AudioGenerator(workspace=workspace, tts_backend=tts_backend)
+            info = _check(generator._run(script, payload.get("voice", "alloy")))
+            payload["info_path"] = atomic_write_text(workspace.info_path, info)
+        else:
+            raise StageError(f"unknown stage {item.stage!r}")
+    return payload
+
+
+def _settle(item: WorkItem):
+    """Release what is left of a finished run's budget reservation."""
+    if item.payload.get("budget"):
+        budget.get_ledger().settle(item.payload["budget"]["ticket"])
+
+
+class StageWorkers:
+    """
+    Threads serving the queue, a fixed number per stage.
+
+    Args:
+        queue: The shared stage queue
+        concurrency: Worker threads per stage, e.g. {"scrape": 4, "script": 2, "audio": 16}
+    """
+
+    def __init__(self, queue: StageQueue, concurrency: Dict[str, int]):
+        unknown = set(concurrency) - set(STAGES)
+        if unknown:
+            raise ValueError(f"unknown stages: {', '.join(sorted(unknown))}")
+        self.queue = queue
+        self.concurrency = concurrency
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _serve(self, stage: str, owner: str):
+        while not self._stop.is_set():
+            item = self.queue.claim(stage, owner)
+            if item is None:
+                self._stop.wait(POLL_SECONDS)
+                continue
+            started = time.perf_counter()
+            with get_tracer().span(f"stage.{stage}", **{
+                "run.id": item.run_id, "stage.attempt": item.attempts, "stage.priority": item.priority
+            }) as span:
+                try:
+                    next_payload = run_stage(item)
+                except budget.BudgetDeferred as e:
+                    span.set_attribute("stage.deferred", str(e))
+                    self.queue.defer(item, float(os.getenv("BUDGET_QUEUE_POLL", "5")), str(e))
+                    continue
+                except Exception as e:
+                    span.set_attribute("stage.error", str(e))
+                    log_event(logger, "stage.failed", logging.WARNING, item.run_id, stage=stage,
+                              attempt=item.attempts, error=str(e)[:500])
+                    # Retrying cannot make a run fit its budget
+                    if self.queue.fail(item, str(e), retry=not isinstance(e, budget.BudgetExceeded)):
+                        _settle(item)
+                    continue
+            if not self.queue.complete(item, next_payload):
+                # Our lease expired and another worker took the item over; its result counts
+                log_event(logger, "stage.lease_lost", logging.WARNING, item.run_id, stage=stage,
+                          attempt=item.attempts)
+                continue
+            log_event(logger, "stage.finished", run_id=item.run_id, stage=stage, priority=item.priority,
+                      seconds=round(time.perf_counter() - started, 3))
+            if stage == STAGES[-1]:
+                _settle(item)
+                record_access(next_payload["root"])
+                index_episode(RunWorkspace(run_id=item.run_id, root=next_payload["root"]),
+                              next_payload["blog_url"], next_payload.get("voice"))
+
+    def _export_metrics(self):
+        while not self._stop.wait(METRICS_INTERVAL_SECONDS):
+            try:
+                self.queue.export_wait_metrics()
+            except (OSError, sqlite3.Error):
+                # Metrics are best effort; the next interval tries again
+                pass
+
+    def start(self):
+        host = socket.gethostname()
+        get_retention_manager().start()
+        exporter = threading.Thread(target=self._export_metrics, name="scheduler-metrics", daemon=True)
+        exporter.start()
+        self._threads.append(exporter)
+        for stage, count in self.concurrency.items():
+            for number in range(count):
+                owner = f"{host}:{os.getpid()}:{stage}-{number}"
+                thread = threading.Thread(target=self._serve, args=(stage, owner), name=f"{stage}-{number}",
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, wait: bool = True):
+        """Stop claiming new items; in-flight items finish first when wait is True."""
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage-specialised conversion workers over a shared queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue URLs for conversion")
+    enqueue.add_argument("urls", nargs="+")
+    enqueue.add_argument("--voice", default="alloy")
+    enqueue.add_argument("--tts-backend")
+    enqueue.add_argument("--priority", choices=scheduler.PRIORITY_CLASSES, default=scheduler.DEFAULT_CLASS)
+    enqueue.add_argument("--user", help="User the runs are charged to")
+
+    work = commands.add_parser("work", help="Run stage workers until interrupted")
+    for stage in STAGES:
+        work.add_argument(f"--{stage}", type=int, default=0, metavar="N", help=f"{stage} worker threads")
+
+    commands.add_parser("status", help="Show queue depth and wait times per stage and class")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    configure_logging()
+    queue = StageQueue()
+
+    if args.command == "enqueue":
+        # URLs enqueued together share a batch budget
+        batch_id = uuid.uuid4().hex if len(args.urls) > 1 else None
+        for url in args.urls:
+            try:
+                run_id = queue.enqueue(url, args.voice, args.tts_backend, priority=args.priority, user=args.user,
+                                       batch_id=batch_id)
+            except budget.BudgetExceeded as e:
+                print(f"rejected  {url}: {e}")
+                continue
+            print(f"{run_id}  {url}")
+    elif args.command == "work":
+        concurrency = {stage: getattr(args, stage) for stage in STAGES if getattr(args, stage)}
+        if not concurrency:
+            parser.error("give at least one of " + ", ".join(f"--{stage} N" for stage in STAGES))
+        workers = StageWorkers(queue, concurrency)
+        workers.start()
+        print("Serving " + ", ".join(f"{count} {stage}" for stage, count in concurrency.items()) + " workers")
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            print("Stopping; finishing in-flight items...")
+            workers.stop()
+    else:
+        for stage, statuses in queue.counts().items():
+            print(f"{stage:<8}" + "  ".join(f"{status}={count}" for status, count in sorted(statuses.items())))
+        print("runs    " + "  ".join(f"{status}={count}" for status, count in sorted(queue.run_counts().items())))
+        backlog = queue.backlog()
+        waits = queue.wait_metrics()
+        print(f"\n{'stage':<8}{'class':<13}{'ready':>6}{'claims':>8}{'p50 wait':>10}{'p95 wait':>10}")
+        for stage in STAGES:
+            for priority in scheduler.PRIORITY_CLASSES:
+                ready = backlog.get(stage, {}).get(priority, 0)
+                wait = waits.get(stage, {}).get(priority)
+                if not (ready or wait):
+                    continue
+                p50 = f"{wait['p50']:.1f}s" if wait else "-"
+                p95 = f"{wait['p95']:.1f}s" if wait else "-"
+                claims = wait["count"] if wait else 0
+                print(f"{stage:<8}{priority:<13}{ready:>6}{claims:>8}{p50:>10}{p95:>10}")
+        print(f"\nMetrics: {queue.export_wait_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Streamed script generation feeding text-to-speech.
+
+The crew runs script generation and audio synthesis back to back, so the
+end-to-end latency is the sum of both stages. This module provides a
+streaming path instead: the chat completion is requested with
+``stream=True``, the token stream is cut at paragraph/sentence boundaries and
+each finished chunk is handed to TTS while the model is still writing.
+
+Parts are synthesized as ``<name>_partN`` files so playback can start on the
+first one; once the last chunk is done they are joined into a single episode
+file (WAV frames are concatenated directly, other formats with the ffmpeg
+concat demuxer) and the parts are removed, so the library, waveform previews
+and search index see one episode. If ffmpeg is missing the parts are kept.
+"""
+
+import contextvars
+import datetime
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+from blog_to_podcast import budget
+from blog_to_podcast.logging_config import get_logger, log_event
+from blog_to_podcast.tools.audio_generator import clean_script_for_tts
+from blog_to_podcast.text_normalizer import NormalizationReport, normalize_for_tts
+from blog_to_podcast.tts_backends import (
+    AUDIO_FORMATS, VALID_VOICES, select_backend, tts_settings
+)
+from blog_to_podcast import llm_backend
+from blog_to_podcast.tools.content_processor import build_messages, format_script
+from blog_to_podcast.transcode import TranscodeError, ffmpeg_binary
+from blog_to_podcast.waveform import write_waveform
+from blog_to_podcast.workspace import atomic_write_text
+
+logger = get_logger("streaming")
+
+# OpenAI TTS rejects inputs longer than 4096 characters
+TTS_MAX_CHARS = 4096
+
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+')
+
+
+class SentenceChunker:
+    """
+    Accumulate streamed text and release it in speakable chunks.
+
+    Chunks end on a paragraph break when possible, otherwise on the last
+    sentence end. The first chunk uses a smaller minimum so the first audio
+    segment is requested as early as possible.
+    """
+
+    def __init__(self, min_chars: int = 400, first_chunk_chars: int = 120,
+                 max_chars: int = TTS_MAX_CHARS):
+        self.min_chars = min_chars
+        self.first_chunk_chars = first_chunk_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return any chunks that are now complete."""
+        self._buffer += text
+        chunks = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+                self._emitted += 1
+        return chunks
+
+    def flush(self) -> List[str]:
+        """Return whatever text is left once the stream has finished."""
+        chunk, self._buffer = self._buffer.strip(), ""
+        return [chunk] if chunk else []
+
+    def _find_cut(self) -> Optional[int]:
+        minimum = self.first_chunk_chars if self._emitted == 0 else self.min_chars
+        if len(self._buffer) < minimum:
+            return None
+
+        window = self._buffer[:self.max_chars]
+
+        paragraph = window.rfind("\n\n")
+        if paragraph >= minimum:
+            return paragraph + 2
+
+        sentence_ends = [m.end() for m in _SENTENCE_END.finditer(window) if m.end() >= minimum]
+        if sentence_ends:
+            return sentence_ends[-1]
+
+        if len(self._buffer) >= self.max_chars:
+            # No boundary inside the TTS limit, fall back to the last space
+            space = window.rfind(" ")
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+
+def split_for_tts(text: str, max_chars: int = TTS_MAX_CHARS) -> List[str]:
+    """
+    Split normalized text into pieces of at most max_chars characters.
+
+    Chunks are sized before normalization, which expands units and symbols
+    ("km" -> "kilometers", "%" -> "percent"), so a chunk near the limit can
+    outgrow it; the overflow is cut at the same boundaries the chunker uses.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    chunker = SentenceChunker(min_chars=max_chars // 2, first_chunk_chars=max_chars // 2,
+                              max_chars=max_chars)
+    return chunker.feed(text) + chunker.flush()
+
+
+def stream_script_tokens(blog_content: str) -> Iterable[str]:
+    """Yield the podcast script text as it is produced by the chat model."""
+    return llm_backend.stream(build_messages(blog_content))
+
+
+def _join_wav(parts: List[str], tmp_path: str) -> None:
+    with wave.open(parts[0], "rb") as first:
+        params = first.getparams()
+    with wave.open(tmp_path, "wb") as out:
+        out.setparams(params)
+        for part in parts:
+            with wave.open(part, "rb") as f:
+                if (f.getnchannels(), f.getsampwidth(), f.getframerate()) != params[:3]:
+                    raise wave.Error(f"{os.path.basename(part)} does not match the first part's format")
+                while True:
+                    frames = f.readframes(65536)
+                    if not frames:
+                        break
+                    out.writeframes(frames)
+
+
+def _join_ffmpeg(parts: List[str], tmp_path: str) -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as listing:
+        for part in parts:
+            escaped = os.path.abspath(part).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    try:
+        completed = subprocess.run(
+            [ffmpeg_binary(), "-nostdin", "-v", "error", "-y", "-f", "concat", "-safe", "0",
+             "-i", listing.name, "-c", "copy", tmp_path],
+            capture_output=True, check=False
+        )
+    except FileNotFoundError:
+        raise TranscodeError("ffmpeg not found; install it or set FFMPEG_BINARY")
+    finally:
+        os.remove(listing.name)
+    if completed.returncode != 0:
+        raise TranscodeError(completed.stderr.decode("utf-8", "replace").strip() or "ffmpeg failed")
+
+
+def join_parts(parts: List[str], output_path: str) -> bool:
+    """
+    Join streamed audio parts into one episode file and remove the parts.
+
+    Args:
+        parts: Part files in playback order, all in the output format
+        output_path: Episode file to write
+
+    Returns:
+        True if the episode was written, False if the parts were kept because
+        they could not be joined (e.g. ffmpeg is missing)
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    extension = os.path.splitext(output_path)[1]
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=extension)
+    os.close(fd)
+    try:
+        if extension.lower() == ".wav":
+            _join_wav(parts, tmp_path)
+        else:
+            _join_ffmpeg(parts, tmp_path)
+        os.replace(tmp_path, output_path)
+    except (TranscodeError, wave.Error, EOFError, OSError) as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        log_event(logger, "stream.join_failed", logging.WARNING, parts=len(parts), error=str(e)[:500])
+        return False
+    for part in parts:
+        os.remove(part)
+    return True
+
+
+def stream_podcast(blog_content: str, voice: str = "alloy",
+                   output_dir: str = "output",
+                   max_tts_workers: int = 4,
+                   on_segment: Optional[Callable[[int, str], None]] = None,
+                   tts_backend: Optional[str] = None) -> Dict:
+    """
+    Generate a podcast script and its audio concurrently.
+
+    Args:
+        blog_content: The scraped blog content
+        voice: Voice selection (alloy, echo, fable, onyx, nova, shimmer)
+        output_dir: Root output directory containing audio/ and scripts/
+        max_tts_workers: Number of TTS requests allowed in flight at once
+        on_segment: Optional callback invoked with (part_number, path) as each
+            audio segment is written
+        tts_backend: Optional TTS backend name for this run (see tts_backends)
+
+    Returns:
+        Dictionary with the script path, the audio files (the joined episode,
+        or the ordered parts if they could not be joined), timings and the
+        characters removed by normalization
+
+    Raises:
+        budget.BudgetExceeded: If the run's budget cannot cover the script or
+            the next audio chunk
+    """
+    if voice not in VALID_VOICES:
+        voice = "alloy"
+
+    backend = select_backend(voice, tts_backend)
+    if llm_backend.requires_api_key() or (backend.name == "openai" and not os.getenv('OPENAI_API_KEY')):
+        raise ValueError("OPENAI_API_KEY not found in environment variables.")
+
+    audio_dir = os.path.join(output_dir, "audio")
+    scripts_dir = os.path.join(output_dir, "scripts")
+    os.makedirs(audio_dir, exist_ok=True)
+    os.makedirs(scripts_dir, exist_ok=True)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_name = f"podcast_{timestamp}_{uuid.uuid4().hex[:8]}"
+    settings = tts_settings()
+    extension = AUDIO_FORMATS[settings["format"]]
+
+    started = time.perf_counter()
+    timings = {}
+
+    def synthesize(part_number: int, text: str) -> str:
+        path = os.path.join(audio_dir, f"{base_name}_part{part_number}{extension}")
+        backend.synthesize(text, voice, path)
+        timings.setdefault("first_audio_seconds", time.perf_counter() - started)
+        if on_segment:
+            on_segment(part_number, path)
+        return path
+
+    chunker = SentenceChunker()
+    script_parts = []
+    futures = []
+    normalization = NormalizationReport(0, 0)
+
+    with ThreadPoolExecutor(max_workers=max_tts_workers) as executor:
+        def submit(chunks: List[str]) -> None:
+            nonlocal normalization
+            for chunk in chunks:
+                text, report = normalize_for_tts(clean_script_for_tts(chunk))
+                normalization += report
+                for piece in split_for_tts(text) if text else []:
+                    # Check before each request; chunks already in flight are
+                    # recorded as they finish
+                    budget.check_stage("audio", budget.tts_cost(len(piece), backend.name, settings["model"]))
+                    # Copy the context so TTS spans nest under the current trace
+                    context = contextvars.copy_context()
+                    futures.append(executor.submit(context.run, synthesize, len(futures) + 1, piece))
+
+        budget.check_stage("script", budget.estimate_script(len(blog_content),
+                                                            llm_backend.llm_settings()["model"]))
+        for token in stream_script_tokens(blog_content):
+            script_parts.append(token)
+            submit(chunker.feed(token))
+        submit(chunker.flush())
+        timings["script_seconds"] = time.perf_counter() - started
+
+        audio_files = [future.result() for future in futures]
+
+    # One episode file, so the library and search index never see the parts
+    episode_path = os.path.join(audio_dir, f"{base_name}{extension}")
+    if len(audio_files) > 1 and join_parts(audio_files, episode_path):
+        audio_files = [episode_path]
+    elif len(audio_files) == 1:
+        os.replace(audio_files[0], episode_path)
+        audio_files = [episode_path]
+    for path in audio_files:
+        # Summarise once now so the library never decodes the audio
+        write_waveform(path)
+    timings["total_seconds"] = time.perf_counter() - started
+
+    script_path = os.path.join(scripts_dir, "podcast_script.txt")
+    atomic_write_text(script_path, format_script("".join(script_parts)))
+
+    return {
+        'script': script_path,
+        'audio': audio_files,
+        'timings': timings,
+        'chars_saved': normalization.saved_chars
+    }
@@ -0,0 +1,346 @@
+"""
+Pre-TTS text normalization.
+
+Generated scripts carry text that is billed and synthesized but should not
+be spoken: speaker labels, stage directions ("[pause]", "(laughs)"),
+markdown emphasis, headings and bullets, emoji, full URLs and runs of
+whitespace or punctuation. TTS cost and latency are linear in characters,
+so everything removed here is a direct saving.
+
+Normalization also rewrites text engines tend to misread into speakable
+words: ISO dates, common abbreviations, units, percentages and currency.
+Plain numbers are left as digits by default (neural voices read them well
+and digits are shorter); set ``TTS_EXPAND_NUMBERS=true`` to spell them out,
+e.g. for local engines. The expansions produce English words, so they only
+apply to English scripts; other languages get markup removal only.
+
+Configuration (environment variables):
+    TTS_NORMALIZE          Normalize scripts before synthesis (default: true)
+    TTS_EXPAND_NUMBERS     Spell out numbers, ordinals and years (default: false)
+
+Run ``python -m blog_to_podcast.text_normalizer <script.txt>`` to see the
+normalized text and the characters saved, or ``--check`` to verify the
+REGRESSION_CASES below.
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Tuple
+from urllib.parse import urlsplit
+
+ONES = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+        "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+SCALES = [(10 ** 12, "trillion"), (10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand")]
+ORDINAL_WORDS = {"one": "first", "two": "second", "three": "third", "five": "fifth", "eight": "eighth",
+                 "nine": "ninth", "twelve": "twelfth"}
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+
+ABBREVIATIONS = {
+    "e.g.": "for example",
+    "i.e.": "that is",
+    "etc.": "et cetera",
+    "vs.": "versus",
+    "approx.": "approximately",
+    "Dr.": "Doctor",
+    "Mr.": "Mister",
+    "Mrs.": "Missus",
+    "Prof.": "Professor",
+    "w/o": "without",
+    "w/": "with",
+    "&": "and",
+}
+
+# Unit symbol -> (singular, plural)
+UNITS = {
+    "%": ("percent", "percent"),
+    "km/h": ("kilometer per hour", "kilometers per hour"),
+    "mph": ("mile per hour", "miles per hour"),
+    "km": ("kilometer", "kilometers"),
+    "kg": ("kilogram", "kilograms"),
+    "mg": ("milligram", "milligrams"),
+    "ms": ("millisecond", "milliseconds"),
+    "GB": ("gigabyte", "gigabytes"),
+    "MB": ("megabyte", "megabytes"),
+    "KB": ("kilobyte", "kilobytes"),
+    "TB": ("terabyte", "terabytes"),
+    "GHz": ("gigahertz", "gigahertz"),
+    "°C": ("degree Celsius", "degrees Celsius"),
+    "°F": ("degree Fahrenheit", "degrees Fahrenheit"),
+    "hrs": ("hour", "hours"),
+    "mins": ("minute", "minutes"),
+}
+CURRENCIES = {"$": ("dollar", "dollars"), "€": ("euro", "euros"), "£": ("pound", "pounds")}
+MAGNITUDES = {"k": "thousand", "K": "thousand", "m": "million", "M": "million", "bn": "billion", "B": "billion",
+              "thousand": "thousand", "million": "million", "billion": "billion", "trillion": "trillion"}
+
+STAGE_DIRECTIONS = (r"pause|long pause|short pause|beat|laughs?|laughing|chuckles?|sighs?|applause|"
+                    r"music[^)\]]*|intro music|outro music|sound effect[^)\]]*|sfx[^)\]]*|transition[^)\]]*|"
+                    r"break|silence|inhales?|exhales?")
+SPEAKER_ROLES = r"host|co-?host|narrator|speaker(?:\s*\d+)?|guest|announcer|interviewer|voice\s*-?over|vo"
+
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_URL = re.compile(r"\b(?:https?://|www\.)[^\s<>()\[\]]+", re.I)
+_BRACKETED = re.compile(r"\[[^\]\n]{0,60}\]")
+_DIRECTION = re.compile(rf"[(*_]{{1,2}}\s*(?:{STAGE_DIRECTIONS})\s*[)*_]{{1,2}}", re.I)
+# Production notes: bracketed ("(Note: ...)", "[Notes ...]") or labelled ("Production note:",
+# "Note to editor:"); a spoken line that merely starts with "Note:" is kept
+_NOTE_LINE = re.compile(
+    r"^\s*(?:[(\[]\s*notes?\b[^\n]*[)\]]"
+    r"|[(\[*_]*\s*(?:(?:speaker|production|host|editor|producer)\s+notes?"
+    r"|notes?\s+(?:to|for)\s+(?:self|(?:the\s+)?(?:editor|host|producer|speaker|engineer)s?))[*_]*\s*:.*)\s*$",
+    re.I | re.M
+)
+_SPEAKER = re.compile(
+    rf"^\s*[*_]*(?:(?:{SPEAKER_ROLES})(?:\s*\([^)]*\)|\s+[A-Z][a-z]+)?|[A-Z][A-Z0-9 .'-]{{1,30}})[*_]*\s*:[*_]*\s*",
+    re.I | re.M
+)
+_ALL_CAPS_SPEAKER = re.compile(r"^[A-Z][A-Z0-9 .'-]{1,30}$")
+_HEADING = re.compile(r"^\s*#{1,6}\s*", re.M)
+_QUOTE = re.compile(r"^\s*>\s?", re.M)
+_BULLET = re.compile(r"^\s*[-*+•]\s+", re.M)
+_RULE = re.compile(r"^\s*(?:[-*_=]\s*){3,}$", re.M)
+_EMPHASIS = re.compile(r"(\*\*|__)(.+?)\1|(?<![\w*])\*(?!\s)([^*\n]+?)\*(?!\w)|(?<!\w)_(?!\s)([^_\n]+?)_(?!\w)")
+_CODE = re.compile(r"`+([^`]*)`+")
+_EMOJI = re.compile(
+    "[\U0001F000-\U0001FAFF\U00002600-\U000027BF\U00002B00-\U00002BFF\U0000FE0F\U0000200D\U000020E3]+"
+)
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_CURRENCY = re.compile(r"([$€£])\s?(\d[\d,]*(?:\.\d+)?)(?:\s?(bn|[kKmMB]|thousand|million|billion|trillion)\b)?")
+_UNIT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s?(" + "|".join(re.escape(unit) for unit in
+                                                      sorted(UNITS, key=len, reverse=True)) + r")(?![\w/])")
+_ORDINAL = re.compile(r"\b(\d+)(?:st|nd|rd|th)\b")
+_NUMBER = re.compile(r"(?<![\w.])(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?(?![\w])")
+# (input, expected output) pairs checked by ``--check``; text that once came out mangled
+REGRESSION_CASES = [
+    ("It costs $20 per month.", "It costs 20 dollars per month."),
+    ("$1 for one, $5 for 3 items.", "1 dollar for one, 5 dollars for 3 items."),
+    ("A $5 million round.", "A 5 million dollars round."),
+    ("They raised $3 billion.", "They raised 3 billion dollars."),
+    ("They raised $3B and €2.5m.", "They raised 3 billion dollars and 2.5 million euros."),
+    ("Note: this is important to hear.", "Note: this is important to hear."),
+    ("Notes: bring a pen.", "Notes: bring a pen."),
+    ("Welcome!\nProduction note: cut the intro.\nLet's go.", "Welcome!\nLet's go."),
+    ("Welcome!\n(Note: lower the music here)\nLet's go.", "Welcome!\nLet's go."),
+    ("Welcome!\nNote to editor: trim this.\nNote to self: breathe.", "Welcome!"),
+]
+# (language, input, expected output): non-English scripts keep their units and numbers
+LANGUAGE_REGRESSION_CASES = [
+    ("es", "El 15 de marzo, 3 km y 50% de los usuarios.", "El 15 de marzo, 3 km y 50% de los usuarios."),
+    ("de", "**Wichtig:** Es kostet €20, z.B. für 2 GB.", "Wichtig: Es kostet €20, z.B. für 2 GB."),
+    ("en-GB", "It is 3 km away.", "It is 3 kilometers away."),
+]
+_REPEATED_PUNCTUATION = re.compile(r"([!?,;:])\1+")
+_ELLIPSIS = re.compile(r"\.{3,}")
+
+
+@dataclass
+class NormalizationReport:
+    """Characters before and after normalization."""
+    original_chars: int
+    normalized_chars: int
+
+    @property
+    def saved_chars(self) -> int:
+        return self.original_chars - self.normalized_chars
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.saved_chars / self.original_chars if self.original_chars else 0.0
+
+    def __add__(self, other: "NormalizationReport") -> "NormalizationReport":
+        return NormalizationReport(self.original_chars + other.original_chars,
+                                   self.normalized_chars + other.normalized_chars)
+
+
+def number_to_words(number: int) -> str:
+    """Spell out a non-negative integer (American English)."""
+    if number < 20:
+        return ONES[number]
+    if number < 100:
+        tens, ones = divmod(number, 10)
+        return TENS[tens] + (f"-{ONES[ones]}" if ones else "")
+    if number < 1000:
+        hundreds, rest = divmod(number, 100)
+        return f"{ONES[hundreds]} hundred" + (f" {number_to_words(rest)}" if rest else "")
+    for scale, name in SCALES:
+        if number >= scale:
+            high, rest = divmod(number, scale)
+            return f"{number_to_words(high)} {name}" + (f" {number_to_words(rest)}" if rest else "")
+    return str(number)
+
+
+def ordinal_to_words(number: int) -> str:
+    words = number_to_words(number)
+    head, separator, last = words.rpartition("-" if "-" in words.split(" ")[-1] else " ")
+    if last in ORDINAL_WORDS:
+        last = ORDINAL_WORDS[last]
+    elif last.endswith("y"):
+        last = last[:-1] + "ieth"
+    else:
+        last += "th"
+    return f"{head}{separator}{last}"
+
+
+def year_to_words(year: int) -> str:
+    """Read a year the way it is spoken ("nineteen ninety-nine", "two thousand five")."""
+    if 2000 <= year < 2010 or year % 1000 == 0:
+        return number_to_words(year)
+    high, low = divmod(year, 100)
+    if low == 0:
+        return f"{number_to_words(high)} hundred"
+    return f"{number_to_words(high)} {'oh ' if low < 10 else ''}{number_to_words(low)}"
+
+
+def _decimal_to_words(integer: str, fraction: str = "") -> str:
+    words = number_to_words(int(integer.replace(",", "")))
+    if fraction:
+        words += " point " + " ".join(ONES[int(digit)] for digit in fraction.lstrip("."))
+    return words
+
+
+def _plural(amount: str) -> bool:
+    return amount.replace(",", "") not in ("1", "1.0")
+
+
+def _strip_markup(text: str) -> str:
+    text = _LINK.sub(lambda m: m.group(1), text)
+    text = _URL.sub(lambda m: _speakable_url(m.group(0)), text)
+    text = _NOTE_LINE.sub("", text)
+    text = _DIRECTION.sub("", text)
+    text = _BRACKETED.sub("", text)
+    text = _RULE.sub("", text)
+    text = _HEADING.sub("", text)
+    text = _QUOTE.sub("", text)
+    text = _BULLET.sub("", text)
+    text = _SPEAKER.sub(_drop_speaker, text)
+    text = _CODE.sub(lambda m: m.group(1), text)
+    text = _EMPHASIS.sub(lambda m: m.group(2) or m.group(3) or m.group(4), text)
+    return _EMOJI.sub("", text)
+
+
+def _drop_speaker(match: re.Match) -> str:
+    label = match.group(0).strip(" *_:\t")
+    # Keep ordinary sentences that merely start with "Word:" unless the word
+    # is a speaker role or an all-caps name
+    if re.fullmatch(rf"(?:{SPEAKER_ROLES})(?:\s*\([^)]*\)|\s+[A-Z][a-z]+)?", label, re.I) \
+            or _ALL_CAPS_SPEAKER.fullmatch(label):
+        return ""
+    return match.group(0)
+
+
+def _speakable_url(url: str) -> str:
+    """Replace a URL with its bare host name, which is what a listener needs."""
+    stripped = url.rstrip(".,;:!?'\"")
+    host = urlsplit(stripped if "://" in stripped else f"http://{stripped}").netloc.lower()
+    # Keep sentence punctuation that the URL pattern swallowed
+    return (host[4:] if host.startswith("www.") else host) + url[len(stripped):]
+
+
+def _expand(text: str, expand_numbers: bool) -> str:
+    def date(m: re.Match) -> str:
+        year, month, day = (int(part) for part in m.groups())
+        if not (1 <= month <= 12 and 1 <= day <= 31):
+            return m.group(0)
+        if expand_numbers:
+            return f"{MONTHS[month - 1]} {ordinal_to_words(day)}, {year_to_words(year)}"
+        return f"{MONTHS[month - 1]} {day}, {year}"
+
+    text = _ISO_DATE.sub(date, text)
+    for abbreviation, expansion in ABBREVIATIONS.items():
+        text = re.sub(rf"(?<!\w){re.escape(abbreviation)}(?=\s|$)", expansion, text)
+
+    def currency(m: re.Match) -> str:
+        singular, plural = CURRENCIES[m.group(1)]
+        magnitude = MAGNITUDES.get(m.group(3) or "")
+        if magnitude:
+            return f"{m.group(2)} {magnitude} {plural}"
+        return f"{m.group(2)} {plural if _plural(m.group(2)) else singular}"
+
+    text = _CURRENCY.sub(currency, text)
+    text = _UNIT.sub(lambda m: f"{m.group(1)} {UNITS[m.group(2)][1 if _plural(m.group(1)) else 0]}", text)
+
+    if expand_numbers:
+        text = _ORDINAL.sub(lambda m: ordinal_to_words(int(m.group(1))), text)
+
+        def number(m: re.Match) -> str:
+            digits = m.group(1)
+            if not m.group(2) and "," not in digits and len(digits) == 4 and 1100 <= int(digits) < 2100:
+                return year_to_words(int(digits))
+            return _decimal_to_words(digits, m.group(2) or "")
+
+        text = _NUMBER.sub(number, text)
+    return text
+
+
+def _compact(text: str) -> str:
+    text = _ELLIPSIS.sub("…", text)
+    text = _REPEATED_PUNCTUATION.sub(r"\1", text)
+    lines = []
+    for line in text.split("\n"):
+        line = re.sub(r"[ \t ]+", " ", line).strip()
+        line = re.sub(r"\s+([,.;:!?…])", r"\1", line)
+        line = re.sub(r"\(\s*\)", "", line).strip()
+        # Lines emptied by markup removal, or left with punctuation only
+        if re.search(r"\w", line):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def normalize_for_tts(text: str, expand_numbers: bool = None,
+                      language: str = "en") -> Tuple[str, NormalizationReport]:
+    """
+    Remove non-spoken markup and expand hard-to-read tokens.
+
+    Args:
+        text: Script text (header/footer already removed)
+        expand_numbers: Spell out numbers (default: TTS_EXPAND_NUMBERS)
+        language: Language code of the script; dates, abbreviations, units,
+            currency and numbers are only expanded for English
+
+    Returns:
+        (normalized text, report of characters before and after)
+    """
+    if os.getenv("TTS_NORMALIZE", "true").lower() in ("0", "false", "no"):
+        return text, NormalizationReport(len(text), len(text))
+    if expand_numbers is None:
+        expand_numbers = os.getenv("TTS_EXPAND_NUMBERS", "false").lower() in ("1", "true", "yes")
+
+    stripped = _strip_markup(text)
+    if language.split("-")[0].lower() == "en":
+        stripped = _expand(stripped, expand_numbers)
+    normalized = _compact(stripped)
+    return normalized, NormalizationReport(len(text), len(normalized))
+
+
+def check_regressions() -> int:
+    """Normalize every REGRESSION_CASES and LANGUAGE_REGRESSION_CASES input and report mismatches; returns the failure count."""
+    failures = 0
+    cases = [("en", text, expected) for text, expected in REGRESSION_CASES] + LANGUAGE_REGRESSION_CASES
+    for language, text, expected in cases:
+        result, _ = normalize_for_tts(text, expand_numbers=False, language=language)
+        if result != expected:
+            failures += 1
+            print(f"FAIL {text!r} ({language})\n  expected {expected!r}\n  got      {result!r}")
+    print(f"{len(cases) - failures}/{len(cases)} regression cases passed")
+    return failures
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m blog_to_podcast.text_normalizer <script.txt> | --check")
+        sys.exit(1)
+    if sys.argv[1] == "--check":
+        sys.exit(1 if check_regressions() else 0)
+
+    from blog_to_podcast.tools.audio_generator import clean_script_for_tts
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        script = clean_script_for_tts(f.read())
+    result, report = normalize_for_tts(script)
+    print(result)
+    print(f"\n{report.original_chars:,} -> {report.normalized_chars:,} characters "
+          f"({report.saved_chars:,} saved, {report.saved_ratio:.1%})")
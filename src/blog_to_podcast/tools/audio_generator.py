@@ -1,15 +1,63 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Type, Optional
 from pydantic import BaseModel, Field
 import openai
 import os
+import shutil
 import hashlib
 import datetime
 
+from blog_to_podcast import budget
+from blog_to_podcast.artifacts import ArtifactError, get_artifact_store
+from blog_to_podcast.dedup import get_duplicate_index
+from blog_to_podcast.retention import record_access
+from blog_to_podcast.workspace import RunWorkspace
+from blog_to_podcast.tracing import current_span, traced
+from blog_to_podcast.waveform import write_waveform
+from blog_to_podcast.text_normalizer import normalize_for_tts
+from blog_to_podcast.tts_backends import (
+    AUDIO_FORMATS, VALID_VOICES, TTSBackendError, select_backend, tts_settings
+)
+from blog_to_podcast import profiling
+
+
+def clean_script_for_tts(podcast_script: str) -> str:
+    """Strip the generator header/footer metadata so only spoken text remains."""
+    lines = podcast_script.split('\n')
+    clean_script = []
+    skip_metadata = False
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("PODCAST SCRIPT GENERATED") or line.startswith("---"):
+            skip_metadata = True
+            continue
+        if skip_metadata and line and not line.startswith("Script generated"):
+            skip_metadata = False
+        if not skip_metadata and line:
+            clean_script.append(line)
+
+    return '\n'.join(clean_script).strip()
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """Hard-link an existing audio file into place, copying across filesystems."""
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return
+    tmp_path = f"{destination}.tmp"
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+
 
 class AudioGeneratorInput(BaseModel):
     """Input schema for AudioGenerator."""
-    podcast_script: str = Field(..., description="The podcast script to convert to audio.")
+    podcast_script: str = Field(
+        ...,
+        description="Artifact handle of the podcast script (artifact:script:...), passed exactly as received."
+    )
     voice: str = Field(default="alloy", description="Voice to use: alloy, echo, fable, onyx, nova, shimmer")
     output_filename: str = Field(default="", description="Optional custom filename for the audio file")
 
@@ -17,17 +65,22 @@ class AudioGeneratorInput(BaseModel):
 class AudioGenerator(BaseTool):
     name: str = "Audio Generator"
     description: str = (
-        "Converts podcast script to high-quality audio using OpenAI's Text-to-Speech API. "
-        "Supports multiple voices and generates MP3 files ready for podcast distribution."
+        "Converts podcast script to high-quality audio using OpenAI's Text-to-Speech API or a local speech engine. "
+        "Supports multiple voices and generates audio files (MP3, Opus, AAC or WAV) ready for podcast distribution."
     )
     args_schema: Type[BaseModel] = AudioGeneratorInput
+    workspace: Optional[RunWorkspace] = None
+    tts_backend: Optional[str] = None
+    # Language of the scripts this tool voices; expansions are English-only
+    language: str = "en"
 
+    @traced("tool.audio_generator", record_args=("voice",))
     def _run(self, podcast_script: str, voice: str = "alloy", output_filename: str = "") -> str:
         """
-        Convert podcast script to audio using OpenAI TTS.
+        Convert podcast script to audio with the selected TTS backend.
         
         Args:
-            podcast_script: The text script to convert to audio
+            podcast_script: The text script to convert to audio, or an artifact handle to it
             voice: Voice selection (alloy, echo, fable, onyx, nova, shimmer)
             output_filename: Optional custom filename
             
@@ -35,77 +88,97 @@ class AudioGenerator(BaseTool):
             Path to the generated audio file or error message
         """
         try:
-            # Get API key from environment
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                return "Error: OPENAI_API_KEY not found in environment variables."
-            
-            # Initialize OpenAI client
-            client = openai.OpenAI(api_key=api_key)
+            podcast_script = get_artifact_store().resolve(podcast_script)
             
             # Validate voice selection
-            valid_voices = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
-            if voice not in valid_voices:
+            if voice not in VALID_VOICES:
                 voice = "alloy"  # Default fallback
             
-            # Clean the script for TTS (remove metadata headers)
-            lines = podcast_script.split('\n')
-            clean_script = []
-            skip_metadata = False
+            # Per-run backend, then per-voice TTS_BACKEND_VOICES, then TTS_BACKEND
+            backend = select_backend(voice, self.tts_backend)
+            if backend.name == "openai" and not os.getenv('OPENAI_API_KEY'):
+                return "Error: OPENAI_API_KEY not found in environment variables."
             
-            for line in lines:
-                line = line.strip()
-                if line.startswith("PODCAST SCRIPT GENERATED") or line.startswith("---"):
-                    skip_metadata = True
-                    continue
-                if skip_metadata and line and not line.startswith("Script generated"):
-                    skip_metadata = False
-                if not skip_metadata and line:
-                    clean_script.append(line)
+            # Clean the script for TTS (remove metadata headers), then drop
+            # non-spoken markup so it is neither billed nor synthesized
+            with profiling.stage("script.clean"):
+                final_script = clean_script_for_tts(podcast_script)
+                spoken_script, normalization = normalize_for_tts(final_script, language=self.language)
+            current_span().set_attributes(**{
+                "tts.chars_original": normalization.original_chars,
+                "tts.chars_saved": normalization.saved_chars
+            })
+            
+            if not spoken_script:
+                return "Error: No valid script content found for audio generation."
             
-            final_script = '\n'.join(clean_script).strip()
+            # Write into the run workspace when one is attached, so
+            # concurrent runs never share an output directory
+            if self.workspace:
+                output_dir = self.workspace.audio_dir
+            else:
+                output_dir = os.path.join(os.getcwd(), "output", "audio")
+            os.makedirs(output_dir, exist_ok=True)
             
-            if not final_script:
-                return "Error: No valid script content found for audio generation."
+            # Episodes are stored in the canonical AUDIO_FORMAT
+            settings = tts_settings()
+            extension = AUDIO_FORMATS[settings["format"]]
             
             # Generate filename if not provided
             if not output_filename:
                 # Create hash-based filename with timestamp
                 script_hash = hashlib.md5(final_script.encode()).hexdigest()[:8]
                 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = f"podcast_{timestamp}_{script_hash}.mp3"
-            
-            # Ensure filename has .mp3 extension
-            if not output_filename.endswith('.mp3'):
-                output_filename += '.mp3'
+                output_filename = f"podcast_{timestamp}_{script_hash}{extension}"
             
-            # Create output directories if they don't exist
-            output_dir = os.path.join(os.getcwd(), "output", "audio")
-            metadata_dir = os.path.join(os.getcwd(), "output", "metadata")
-            scripts_dir = os.path.join(os.getcwd(), "output", "scripts")
-            
-            os.makedirs(output_dir, exist_ok=True)
-            os.makedirs(metadata_dir, exist_ok=True)
-            os.makedirs(scripts_dir, exist_ok=True)
+            # Ensure filename has the format's extension and stays inside output_dir
+            output_filename = os.path.basename(output_filename)
+            stem, current_extension = os.path.splitext(output_filename)
+            if current_extension.lower() in AUDIO_FORMATS.values():
+                output_filename = stem
+            output_filename += extension
             
             output_path = os.path.join(output_dir, output_filename)
             
-            # Generate audio using OpenAI TTS
-            response = client.audio.speech.create(
-                model="tts-1",  # Using standard quality for cost efficiency
-                voice=voice,
-                input=final_script,
-                response_format="mp3"
-            )
+            # Reuse the audio of a near-duplicate script instead of calling TTS,
+            # but only when it was rendered with this voice, engine and format
+            variant = {
+                "voice": voice,
+                "backend": backend.name,
+                "audio_format": settings["format"],
+                "tts_model": settings["model"] if backend.name == "openai" else "",
+            }
+            index = get_duplicate_index()
+            match = index.find_by_script(final_script) if index else None
+            reused = index.find_audio(match.post_id, **variant) if match else None
+            if reused and os.path.exists(reused):
+                _link_or_copy(reused, output_path)
+                record_access(reused)
+                write_waveform(output_path)
+                file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
+                return f"""
+Audio generation completed successfully!
+
+Details:
+- Output file: {output_path}
+- Reused existing episode for {match.url} (similarity {match.similarity:.0%})
+- File size: {file_size_mb:.2f} MB
+- Estimated cost: $0.0000
+
+The audio file is ready for podcast distribution.
+""".strip()
             
-            # Save the audio file
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_bytes():
-                    f.write(chunk)
+            # Check the budget with the real character count, then generate
+            # audio (every backend writes the same canonical format)
+            char_count = len(spoken_script)
+            estimated_cost = budget.tts_cost(char_count, backend.name, settings["model"])
+            budget.check_stage("audio", estimated_cost)
+            backend.synthesize(spoken_script, voice, output_path)
+            # Summarise once now so the library never decodes the audio
+            write_waveform(output_path)
             
-            # Calculate approximate cost (OpenAI TTS: $0.015 per 1K characters)
-            char_count = len(final_script)
-            estimated_cost = (char_count / 1000) * 0.015
+            if match:
+                index.attach_audio(match.post_id, output_path, **variant)
             
             # Get file size
             file_size = os.path.getsize(output_path)
@@ -117,20 +190,26 @@ Audio generation completed successfully!
 Details:
 - Output file: {output_path}
 - Voice used: {voice}
+- Speech engine: {backend.name}
 - File size: {file_size_mb:.2f} MB
 - Script length: {char_count:,} characters
+- Normalization saved: {normalization.saved_chars:,} characters ({normalization.saved_ratio:.1%})
 - Estimated cost: ${estimated_cost:.4f}
 
 The audio file is ready for podcast distribution.
 """
             return success_message.strip()
                 
+        except (ArtifactError, budget.BudgetExceeded) as e:
+            return f"Error: {str(e)}"
         except openai.AuthenticationError:
             return "Error: Invalid OpenAI API key. Please check your OPENAI_API_KEY environment variable."
         except openai.RateLimitError:
             return "Error: OpenAI API rate limit exceeded. Please try again later."
         except openai.APIError as e:
             return f"Error: OpenAI API error during audio generation: {str(e)}"
+        except TTSBackendError as e:
+            return f"Error: Speech engine error during audio generation: {str(e)}"
         except PermissionError:
             return f"Error: Permission denied when writing to output directory. Please check file permissions."
         except Exception as e:
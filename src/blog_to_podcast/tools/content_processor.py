@@ -1,45 +1,20 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Type, List, Dict, Optional
 from pydantic import BaseModel, Field
 import openai
 import os
 import json
+import hashlib
 
+from blog_to_podcast import budget
+from blog_to_podcast.artifacts import ArtifactError, get_artifact_store
+from blog_to_podcast.dedup import get_duplicate_index
+from blog_to_podcast.workspace import atomic_write_text
+from blog_to_podcast.tracing import traced
+from blog_to_podcast import llm_backend
 
-class ContentProcessorInput(BaseModel):
-    """Input schema for ContentProcessor."""
-    blog_content: str = Field(..., description="The scraped blog content to process into podcast script.")
 
-
-class ContentProcessor(BaseTool):
-    name: str = "Content Processor"
-    description: str = (
-        "Processes blog content into a well-structured podcast script using OpenAI GPT-4. "
-        "Creates engaging, conversational content suitable for text-to-speech conversion."
-    )
-    args_schema: Type[BaseModel] = ContentProcessorInput
-
-    def _run(self, blog_content: str) -> str:
-        """
-        Process blog content into podcast script using OpenAI GPT-4.
-        
-        Args:
-            blog_content: The scraped blog content
-            
-        Returns:
-            Formatted podcast script ready for audio generation
-        """
-        try:
-            # Get API key from environment
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                return "Error: OPENAI_API_KEY not found in environment variables."
-            
-            # Initialize OpenAI client
-            client = openai.OpenAI(api_key=api_key)
-            
-            # Create the prompt for podcast script generation
-            system_prompt = """
+SYSTEM_PROMPT = """
 You are an expert podcast script writer. Your task is to transform blog content into an engaging, conversational podcast script that sounds natural when read aloud.
 
 Guidelines:
@@ -54,8 +29,11 @@ Guidelines:
 
 The script should be approximately 3-7 minutes when read aloud (roughly 450-1050 words).
 """
-            
-            user_prompt = f"""
+
+
+def build_messages(blog_content: str) -> List[Dict[str, str]]:
+    """Build the chat messages used to turn blog content into a podcast script."""
+    user_prompt = f"""
 Transform the following blog content into an engaging podcast script:
 
 {blog_content}
@@ -69,36 +47,116 @@ Create a podcast script that:
 
 Format the output as a clean script without any markdown formatting.
 """
-            
-            # Make API call to OpenAI
-            response = client.chat.completions.create(
-                model="gpt-4o",  # Using the model specified in .env
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.7
-            )
-            
-            # Extract the generated script
-            if response.choices and len(response.choices) > 0:
-                podcast_script = response.choices[0].message.content
-                
-                # Add metadata header
-                formatted_script = f"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def format_script(podcast_script: str, model: Optional[str] = None) -> str:
+    """Wrap a generated script with the metadata header and footer."""
+    model = model or llm_backend.llm_settings()["model"]
+    formatted_script = f"""
 PODCAST SCRIPT GENERATED FROM BLOG CONTENT
 
 {podcast_script}
 
 ---
-Script generated using OpenAI GPT-4o
+Script generated using {model}
 Ready for text-to-speech conversion
 """
-                return formatted_script.strip()
+    return formatted_script.strip()
+
+
+def _index_script(index, blog_content: str, formatted_script: str) -> None:
+    """Store the script and register it in the duplicate index for later reuse."""
+    url = ""
+    for line in blog_content.splitlines():
+        if line.startswith("URL:"):
+            url = line[len("URL:"):].strip()
+            break
+
+    scripts_dir = os.path.join(os.getcwd(), "output", "scripts")
+    os.makedirs(scripts_dir, exist_ok=True)
+    script_hash = hashlib.md5(formatted_script.encode()).hexdigest()[:12]
+    script_path = os.path.join(scripts_dir, f"script_{script_hash}.txt")
+    atomic_write_text(script_path, formatted_script)
+
+    index.add(blog_content, url, formatted_script, script_path)
+
+
+class ContentProcessorInput(BaseModel):
+    """Input schema for ContentProcessor."""
+    blog_content: str = Field(
+        ...,
+        description="Artifact handle of the scraped content (artifact:blog_content:...), passed exactly as received."
+    )
+
+
+class ContentProcessor(BaseTool):
+    name: str = "Content Processor"
+    description: str = (
+        "Processes blog content into a well-structured podcast script using an OpenAI-compatible chat model. "
+        "Creates engaging, conversational content suitable for text-to-speech conversion."
+    )
+    args_schema: Type[BaseModel] = ContentProcessorInput
+    # Crew tools return an artifact handle so agents never copy the script
+    return_handle: bool = False
+
+    def _output(self, script: str) -> str:
+        """Return the script, or a short handle to it when passing artifacts by reference."""
+        if not self.return_handle:
+            return script
+        handle = get_artifact_store().put(script, "script")
+        return (f"{handle}\nPodcast script stored ({len(script.split()):,} words). "
+                "Pass this handle, not the text, to the Audio Generator.")
+
+    @traced("tool.content_processor")
+    def _run(self, blog_content: str) -> str:
+        """
+        Process blog content into podcast script with the configured chat model.
+
+        Args:
+            blog_content: The scraped blog content, or an artifact handle to it
+
+        Returns:
+            Formatted podcast script ready for audio generation (a handle to
+            it when return_handle is set)
+        """
+        try:
+            blog_content = get_artifact_store().resolve(blog_content)
+
+            # Hosted OpenAI needs a key; a self-hosted SCRIPT_LLM_BASE_URL does not
+            if llm_backend.requires_api_key():
+                return "Error: OPENAI_API_KEY not found in environment variables."
+
+            # Reuse the script of a near-duplicate post instead of calling the LLM
+            index = get_duplicate_index()
+            match = index.find(blog_content) if index else None
+            if match and match.script_path and os.path.exists(match.script_path):
+                with open(match.script_path, 'r', encoding='utf-8') as f:
+                    return self._output(f.read())
+
+            # Check the budget for this article, then call the configured
+            # endpoint (OpenAI or a self-hosted server)
+            budget.check_stage("script", budget.estimate_script(len(blog_content),
+                                                                llm_backend.llm_settings()["model"]))
+            podcast_script = llm_backend.complete(build_messages(blog_content))
+
+            # Extract the generated script
+            if podcast_script:
+                # Add metadata header
+                formatted_script = format_script(podcast_script)
+
+                if index:
+                    _index_script(index, blog_content, formatted_script)
+
+                return self._output(formatted_script)
             else:
-                return "Error: No response generated from OpenAI API."
-                
+                return "Error: No response generated by the chat model."
+
+        except (ArtifactError, budget.BudgetExceeded) as e:
+            return f"Error: {str(e)}"
         except openai.AuthenticationError:
             return "Error: Invalid OpenAI API key. Please check your OPENAI_API_KEY environment variable."
         except openai.RateLimitError:
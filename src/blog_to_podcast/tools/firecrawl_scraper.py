@@ -2,9 +2,17 @@ from crewai.tools import BaseTool
 from typing import Type, Dict, Any
 from pydantic import BaseModel, Field
 import requests
+import httpx
 import os
 from urllib.parse import urlparse
 
+from blog_to_podcast import budget
+from blog_to_podcast.artifacts import get_artifact_store
+from blog_to_podcast.dedup import get_duplicate_index
+from blog_to_podcast.extraction import assess_quality, extract_article, fetch_html
+from blog_to_podcast.tracing import get_tracer, traced
+from blog_to_podcast.hedging import hedged_call
+
 
 class FirecrawlScraperInput(BaseModel):
     """Input schema for FirecrawlScraper."""
@@ -14,14 +22,69 @@ class FirecrawlScraperInput(BaseModel):
 class FirecrawlScraper(BaseTool):
     name: str = "Firecrawl Blog Scraper"
     description: str = (
-        "Scrapes blog content from any URL using Firecrawl API. "
+        "Scrapes blog content from any URL, extracting static pages locally and using the Firecrawl API for the rest. "
         "Returns clean, structured text content suitable for processing."
     )
     args_schema: Type[BaseModel] = FirecrawlScraperInput
+    # Crew tools return an artifact handle so agents never copy the article
+    return_handle: bool = False
+
+    @staticmethod
+    def _scrape_locally(url: str):
+        """Fetch and extract the page locally; returns (article, None) or (None, reason)."""
+        with get_tracer().span("scrape.local", **{"http.url": url}) as span:
+            try:
+                html = fetch_html(url)
+            except (httpx.HTTPError, ValueError) as e:
+                span.set_attribute("scrape.accepted", False)
+                return None, f"fetch failed: {e}"
+            article = extract_article(html, url)
+            accepted, reason = assess_quality(html, article)
+            span.set_attributes(**{
+                "scrape.accepted": accepted,
+                "scrape.reason": reason,
+                "content.words": article.word_count if article else 0
+            })
+        return (article, None) if accepted else (None, reason)
+
+    @staticmethod
+    def _format_content(title: str, author: str, url: str, content: str) -> str:
+        """Format scraped content, noting when the post was already converted."""
+        # Check whether this post was already converted under another URL
+        duplicate_note = ""
+        index = get_duplicate_index()
+        match = index.find(content) if index else None
+        if match:
+            duplicate_note = (
+                f"\nNote: Near-duplicate of previously converted post {match.url} "
+                f"(similarity {match.similarity:.0%}); the existing script will be reused."
+            )
+        
+        # Format the extracted content
+        formatted_content = f"""
+BLOG POST CONTENT:
+
+Title: {title}
+Author: {author}
+URL: {url}{duplicate_note}
 
+Content:
+{content}
+"""
+        return formatted_content.strip()
+
+    def _output(self, content: str) -> str:
+        """Return the content, or a short handle to it when passing artifacts by reference."""
+        if not self.return_handle:
+            return content
+        handle = get_artifact_store().put(content, "blog_content")
+        return (f"{handle}\nScraped blog content stored ({len(content.split()):,} words). "
+                "Pass this handle, not the text, to the Content Processor.")
+
+    @traced("tool.firecrawl_scraper", record_args=("url",))
     def _run(self, url: str) -> str:
         """
-        Scrape blog content using Firecrawl API.
+        Scrape blog content locally, falling back to the Firecrawl API.
         
         Args:
             url: The URL of the blog post to scrape
@@ -30,23 +93,43 @@ class FirecrawlScraper(BaseTool):
             Cleaned text content of the blog post
         """
         try:
-            # Get API key from environment
-            api_key = os.getenv('FIRECRAWL_API_KEY')
-            if not api_key:
-                return "Error: FIRECRAWL_API_KEY not found in environment variables."
-            
             # Validate URL
             parsed_url = urlparse(url)
             if not parsed_url.scheme or not parsed_url.netloc:
                 return f"Error: Invalid URL format: {url}"
             
+            # Try local extraction first; Firecrawl handles what it cannot
+            engine = os.getenv('SCRAPE_ENGINE', 'auto').lower()
+            fallback_reason = "SCRAPE_ENGINE=firecrawl"
+            if engine in ('auto', 'local'):
+                article, fallback_reason = self._scrape_locally(url)
+                if article:
+                    return self._output(self._format_content(article.title, article.author, url, article.markdown))
+                if engine == 'local':
+                    return f"Error: Local extraction failed for {url}: {fallback_reason}"
+            
+            # Get API key from environment
+            api_key = os.getenv('FIRECRAWL_API_KEY')
+            if not api_key:
+                return "Error: FIRECRAWL_API_KEY not found in environment variables."
+            
             # Use Firecrawl Python SDK
             from firecrawl import FirecrawlApp
             
             app = FirecrawlApp(api_key=api_key)
+            budget.check_stage("scrape", budget.firecrawl_cost())
             
             # Use the correct method name 'scrape' instead of 'scrape_url'
-            result = app.scrape(url, formats=["markdown"])
+            with get_tracer().span("firecrawl.scrape", **{"http.url": url, "scrape.fallback_reason": fallback_reason}) as span:
+                # Scrapes are idempotent, so a slow one is hedged with a duplicate
+                result = hedged_call(
+                    "firecrawl.scrape",
+                    lambda cancelled: app.scrape(url, formats=["markdown"]),
+                    initial_delay=8.0,
+                    on_hedge=budget.record_firecrawl
+                )
+                span.set_attribute("content.chars", len(getattr(result, 'markdown', '') or '') if result else 0)
+            budget.record_firecrawl()
             
             # The result is a Document object, not a dict
             if result:
@@ -58,21 +141,12 @@ class FirecrawlScraper(BaseTool):
                 metadata = getattr(result, 'metadata', {}) or {}
                 author = metadata.get('author', 'Unknown Author') if isinstance(metadata, dict) else 'Unknown Author'
                 
-                # Format the extracted content
-                formatted_content = f"""
-BLOG POST CONTENT:
-
-Title: {title}
-Author: {author}
-URL: {url}
-
-Content:
-{content}
-"""
-                return formatted_content.strip()
+                return self._output(self._format_content(title, author, url, content))
             else:
                 return f"Error: No content found in Firecrawl response for URL: {url}"
                 
+        except budget.BudgetExceeded as e:
+            return f"Error: {str(e)}"
         except requests.exceptions.Timeout:
             return f"Error: Request timeout while scraping {url}"
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,451 @@
+"""
+Lightweight OpenTelemetry-style tracing for conversions.
+
+Spans are recorded for the conversion as a whole, each crew task, each agent
+LLM call, each tool ``_run``, outbound HTTP requests and file writes, with
+attributes such as URL, voice, tokens and bytes. Finished spans are exported
+either as JSON lines (one file per trace under ``output/traces``) or as
+OTLP/JSON to a collector.
+
+Configuration:
+    TRACING_EXPORTER    none (default), json or otlp
+    TRACING_DIR         Directory for the json exporter (default: output/traces)
+    OTEL_EXPORTER_OTLP_ENDPOINT  Collector base URL for the otlp exporter
+                                 (default: http://localhost:4318)
+
+Run ``python -m blog_to_podcast.tracing <trace file>`` to print a trace as a
+tree with durations.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_TRACES_DIR = os.path.join("output", "traces")
+SERVICE_NAME = "blog_to_podcast"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes, belonging to a trace."""
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key.replace("__", "."), value)
+
+    def record_error(self, error: Any):
+        self.status = "error"
+        self.attributes["error.message"] = str(error)[:500]
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer._export(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(((self.end_ns or time.time_ns()) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan:
+    """Stand-in used when tracing is disabled; all operations are free."""
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonFileExporter:
+    """Append finished spans as JSON lines to ``<directory>/<trace_id>.jsonl``."""
+
+    def __init__(self, directory: str = DEFAULT_TRACES_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(os.path.join(self.directory, f"{span.trace_id}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def shutdown(self):
+        pass
+
+
+class OTLPHttpExporter:
+    """Batch finished spans and POST them as OTLP/JSON to ``<endpoint>/v1/traces``."""
+
+    def __init__(self, endpoint: str, batch_size: int = 100, flush_interval: float = 1.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        self._queue.put(span)
+
+    def _worker(self):
+        batch: List[Span] = []
+        while True:
+            try:
+                span = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                span = ...
+            if span is None:
+                self._send(batch)
+                return
+            if span is not ...:
+                batch.append(span)
+            if batch and (span is ... or len(batch) >= self.batch_size):
+                self._send(batch)
+                batch = []
+
+    def _send(self, spans: List[Span]):
+        if not spans:
+            return
+        import requests
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+        try:
+            requests.post(self.url, json=payload, timeout=5)
+        except requests.exceptions.RequestException:
+            # Tracing must never break a conversion
+            pass
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _otlp_span(span: Span) -> Dict:
+    return {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent.span_id if span.parent else "",
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+        "status": {"code": 2 if span.status == "error" else 1},
+    }
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to an exporter.
+
+    With no exporter every span is the shared no-op span, so instrumented
+    code costs next to nothing when tracing is off.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes) -> Any:
+        """Start a span without making it current; the caller must end() it."""
+        if not self.enabled:
+            return NOOP_SPAN
+        span = Span(self, name, parent=parent or _current_span.get())
+        span.set_attributes(**attributes)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Any]:
+        """Run a block inside a new child span of the current span."""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _export(self, span: Span):
+        if self.exporter:
+            self.exporter.export(span)
+
+    def shutdown(self):
+        if self.exporter:
+            self.exporter.shutdown()
+
+
+def current_span() -> Any:
+    """The active span in this context, or the no-op span."""
+    return _current_span.get() or NOOP_SPAN
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer configured by TRACING_EXPORTER."""
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            kind = os.getenv("TRACING_EXPORTER", "none").lower()
+            exporter = None
+            if kind == "json":
+                exporter = JsonFileExporter(os.getenv("TRACING_DIR", DEFAULT_TRACES_DIR))
+            elif kind == "otlp":
+                exporter = OTLPHttpExporter(os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"))
+            _tracer = Tracer(exporter)
+            if exporter:
+                atexit.register(_tracer.shutdown)
+                _instrument_http()
+                _register_crew_listener()
+        return _tracer
+
+
+def traced(name: str, record_args: tuple = ()) -> Callable:
+    """
+    Decorator tracing a function call as a span.
+
+    Args:
+        name: Span name
+        record_args: Names of arguments to record as span attributes
+
+    String results starting with "Error:" (the tools' error convention) mark
+    the span as failed.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs)
+            attributes = {arg: bound.arguments[arg] for arg in record_args if arg in bound.arguments}
+            with tracer.span(name, **attributes) as span:
+                result = func(*args, **kwargs)
+                if isinstance(result, str):
+                    span.set_attribute("result.chars", len(result))
+                    if result.startswith("Error:"):
+                        span.record_error(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def _instrument_http():
+    """Wrap requests (and httpx when installed) so each outbound request is a span."""
+    try:
+        import requests
+    except ImportError:
+        requests = None
+
+    if requests is not None and not getattr(requests.Session.send, "_traced", False):
+        original_send = requests.Session.send
+
+        def send(self, request, **kwargs):
+            with get_tracer().span(f"HTTP {request.method}", **{
+                "http.method": request.method, "http.url": request.url
+            }) as span:
+                response = original_send(self, request, **kwargs)
+                span.set_attributes(**{
+                    "http.status_code": response.status_code,
+                    "http.response_bytes": len(response.content) if not kwargs.get("stream") else None
+                })
+                return response
+
+        send._traced = True
+        requests.Session.send = send
+
+    try:
+        import httpx
+    except ImportError:
+        return
+
+    if not getattr(httpx.Client.send, "_traced", False):
+        original_httpx_send = httpx.Client.send
+
+        def httpx_send(self, request, **kwargs):
+            with get_tracer().span(f"HTTP {request.method}", **{
+                "http.method": request.method, "http.url": str(request.url)
+            }) as span:
+                response = original_httpx_send(self, request, **kwargs)
+                span.set_attribute("http.status_code", response.status_code)
+                return response
+
+        httpx_send._traced = True
+        httpx.Client.send = httpx_send
+
+
+def _register_crew_listener():
+    """Turn CrewAI task and LLM events into spans (no-op if CrewAI is missing)."""
+    try:
+        from crewai.events import (
+            BaseEventListener, LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent,
+            TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent,
+        )
+    except ImportError:
+        return
+
+    def push(name: str, **attributes):
+        # CrewAI emits events synchronously on the thread running the crew,
+        # so the context variable tracks the open task/LLM span per run.
+        span = get_tracer().start_span(name, **attributes)
+        _current_span.set(span)
+
+    def pop(prefix: str, error: Optional[str] = None, **attributes):
+        span = _current_span.get()
+        if not isinstance(span, Span) or not span.name.startswith(prefix):
+            return
+        span.set_attributes(**attributes)
+        if error:
+            span.record_error(error)
+        _current_span.set(span.parent)
+        span.end()
+
+    class CrewTracingListener(BaseEventListener):
+        def setup_listeners(self, crewai_event_bus):
+            @crewai_event_bus.on(TaskStartedEvent)
+            def on_task_started(source, event):
+                task = event.task
+                push(f"task {getattr(task, 'name', None) or 'task'}", **{
+                    "task.agent": getattr(getattr(task, "agent", None), "role", None)
+                })
+
+            @crewai_event_bus.on(TaskCompletedEvent)
+            def on_task_completed(source, event):
+                pop("task ", **{"output.chars": len(getattr(event.output, "raw", "") or "")})
+
+            @crewai_event_bus.on(TaskFailedEvent)
+            def on_task_failed(source, event):
+                pop("task ", error=getattr(event, "error", "task failed"))
+
+            @crewai_event_bus.on(LLMCallStartedEvent)
+            def on_llm_started(source, event):
+                push("llm.call", **{
+                    "llm.model": event.model,
+                    "agent.role": event.agent_role,
+                    "llm.messages": len(event.messages) if isinstance(event.messages, list) else 1
+                })
+
+            @crewai_event_bus.on(LLMCallCompletedEvent)
+            def on_llm_completed(source, event):
+                pop("llm.", **{"llm.response_chars": len(str(event.response or ""))})
+
+            @crewai_event_bus.on(LLMCallFailedEvent)
+            def on_llm_failed(source, event):
+                pop("llm.", error=event.error)
+
+    # Keep a reference so the listener is not garbage collected
+    global _crew_listener
+    _crew_listener = CrewTracingListener()
+
+
+_crew_listener = None
+
+
+def print_trace(path: str, out=sys.stdout):
+    """Print a JSON-lines trace file as an indented tree with durations."""
+    with open(path, "r", encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+
+    children: Dict[Optional[str], List[Dict]] = {}
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        parent = span["parent_span_id"] if span["parent_span_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+
+    def walk(parent: Optional[str], depth: int):
+        for span in sorted(children.get(parent, []), key=lambda s: s["start_time_unix_nano"]):
+            marker = " !" if span["status"] == "error" else ""
+            out.write(f"{span['duration_ms']:>10.1f} ms  {'  ' * depth}{span['name']}{marker}\n")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m blog_to_podcast.tracing <trace .jsonl file>")
+        sys.exit(1)
+    print_trace(sys.argv[1])
@@ -0,0 +1,228 @@
+"""
+On-demand audio transcoding with a size-bounded cache.
+
+Episodes are stored once in a canonical format (``AUDIO_FORMAT``). Other
+formats are produced lazily with a local ffmpeg, cached under
+``output/cache/transcoded`` and evicted least-recently-used first once the
+cache exceeds ``TRANSCODE_CACHE_MAX_MB``.
+
+Run ``python -m blog_to_podcast.transcode <audio file>`` to measure bytes per
+minute and transcode throughput of every format for a given episode.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from blog_to_podcast.workspace import atomic_write_bytes
+
+DEFAULT_CACHE_DIR = os.path.join("output", "cache", "transcoded")
+DEFAULT_CACHE_MAX_MB = 2048
+
+# Encoder settings tuned for spoken word (mono, speech bitrates)
+FORMAT_SETTINGS = {
+    "opus": {"extension": ".opus", "mime": "audio/ogg", "args": ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "ogg"]},
+    "aac": {"extension": ".aac", "mime": "audio/aac", "args": ["-c:a", "aac", "-b:a", "64k", "-f", "adts"]},
+    "mp3": {"extension": ".mp3", "mime": "audio/mpeg", "args": ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"]},
+    "wav": {"extension": ".wav", "mime": "audio/wav", "args": ["-c:a", "pcm_s16le", "-f", "wav"]},
+}
+
+
+class TranscodeError(Exception):
+    """Raised when ffmpeg is missing or fails to transcode a file."""
+
+
+def format_for_path(path: str) -> Optional[str]:
+    """Return the format name for a file extension, or None if unsupported."""
+    extension = os.path.splitext(path)[1].lower()
+    for name, settings in FORMAT_SETTINGS.items():
+        if settings["extension"] == extension:
+            return name
+    return None
+
+
+def audio_mime_type(path: str) -> str:
+    """MIME type for an audio file, based on its extension."""
+    fmt = format_for_path(path)
+    return FORMAT_SETTINGS[fmt]["mime"] if fmt else "audio/mpeg"
+
+
+def ffmpeg_binary() -> str:
+    """The ffmpeg executable to run (FFMPEG_BINARY, default: ffmpeg on PATH)."""
+    return os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+
+def transcode_bytes(source_path: str, fmt: str) -> bytes:
+    """
+    Transcode an audio file with ffmpeg and return the encoded bytes.
+
+    Args:
+        source_path: Path of the source audio file
+        fmt: Target format (opus, aac, mp3, wav)
+
+    Returns:
+        Encoded audio
+    """
+    if fmt not in FORMAT_SETTINGS:
+        raise TranscodeError(f"Unsupported audio format: {fmt}")
+    command = [ffmpeg_binary(), "-nostdin", "-v", "error", "-i", source_path, "-ac", "1",
+               *FORMAT_SETTINGS[fmt]["args"], "pipe:1"]
+    try:
+        completed = subprocess.run(command, capture_output=True, check=False)
+    except FileNotFoundError:
+        raise TranscodeError("ffmpeg not found; install it or set FFMPEG_BINARY")
+    if completed.returncode != 0:
+        raise TranscodeError(completed.stderr.decode("utf-8", "replace").strip() or "ffmpeg failed")
+    return completed.stdout
+
+
+def probe_duration(path: str) -> float:
+    """Return the duration of an audio file in seconds using ffprobe."""
+    ffprobe = os.getenv("FFPROBE_BINARY", "ffprobe")
+    try:
+        completed = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "json", path],
+            capture_output=True, check=True
+        )
+    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        raise TranscodeError(f"Could not probe duration of {path}: {e}")
+    return float(json.loads(completed.stdout)["format"]["duration"])
+
+
+class TranscodeCache:
+    """
+    Lazily transcoded copies of canonical audio files, evicted LRU by size.
+
+    Args:
+        cache_dir: Directory holding transcoded files
+        max_bytes: Total cache size before least-recently-used files are evicted
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, source_path: str, fmt: str) -> str:
+        stat = os.stat(source_path)
+        key = f"{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}|{fmt}|{FORMAT_SETTINGS[fmt]['args']}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}_{digest}{FORMAT_SETTINGS[fmt]['extension']}")
+
+    def _key_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(path, threading.Lock())
+
+    def get(self, source_path: str, fmt: str) -> str:
+        """
+        Return a path to source_path encoded as fmt, transcoding on a cache miss.
+
+        The canonical file itself is returned when it is already in fmt.
+        """
+        if format_for_path(source_path) == fmt:
+            return source_path
+        if fmt not in FORMAT_SETTINGS:
+            raise TranscodeError(f"Unsupported audio format: {fmt}")
+
+        cache_path = self._cache_path(source_path, fmt)
+        with self._key_lock(cache_path):
+            if os.path.exists(cache_path):
+                # Refresh the access time used for LRU eviction
+                os.utime(cache_path)
+                return cache_path
+            atomic_write_bytes(cache_path, transcode_bytes(source_path, fmt))
+
+        self.evict()
+        return cache_path
+
+    def evict(self) -> int:
+        """
+        Delete least-recently-used cache files until the cache fits max_bytes.
+
+        Returns:
+            Number of bytes freed
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as scan:
+                for entry in scan:
+                    if entry.is_file() and not entry.name.startswith(".tmp_"):
+                        stat = entry.stat()
+                        entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+                        total += stat.st_size
+
+            freed = 0
+            for _, size, path in sorted(entries):
+                if total - freed <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    freed += size
+                except FileNotFoundError:
+                    pass
+            return freed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcode_cache() -> TranscodeCache:
+    """Shared cache configured by TRANSCODE_CACHE_DIR and TRANSCODE_CACHE_MAX_MB."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscodeCache(
+                cache_dir=os.getenv("TRANSCODE_CACHE_DIR", DEFAULT_CACHE_DIR),
+                max_bytes=int(float(os.getenv("TRANSCODE_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+            )
+        return _cache
+
+
+def measure_formats(source_path: str, formats: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Measure storage size and transcode throughput of each format for one episode.
+
+    Args:
+        source_path: Canonical audio file to transcode
+        formats: Formats to measure (default: all supported)
+
+    Returns:
+        One dictionary per format with bytes_per_minute, transcode_seconds and
+        realtime_factor (seconds of audio encoded per second of wall time)
+    """
+    duration = probe_duration(source_path)
+    results = []
+    for fmt in formats or list(FORMAT_SETTINGS):
+        started = time.perf_counter()
+        encoded = transcode_bytes(source_path, fmt)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "format": fmt,
+            "bytes": len(encoded),
+            "bytes_per_minute": len(encoded) / (duration / 60) if duration else 0,
+            "transcode_seconds": elapsed,
+            "realtime_factor": duration / elapsed if elapsed else 0,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m blog_to_podcast.transcode <audio file> [format ...]")
+        sys.exit(1)
+
+    rows = measure_formats(sys.argv[1], sys.argv[2:] or None)
+    print(f"{'format':<8}{'KB/min':>10}{'encode s':>10}{'x realtime':>12}")
+    for row in sorted(rows, key=lambda r: r["bytes_per_minute"]):
+        print(f"{row['format']:<8}{row['bytes_per_minute'] / 1024:>10.1f}"
+              f"{row['transcode_seconds']:>10.2f}{row['realtime_factor']:>12.1f}")
@@ -0,0 +1,350 @@
+"""
+Text-to-speech backends.
+
+Episodes can be synthesized by the OpenAI TTS API or by a local engine
+running on CPU (Piper or espeak-ng), which costs nothing per character and
+works offline. Every backend takes the same voice names (alloy, echo, ...)
+and writes the same canonical output: one file in ``AUDIO_FORMAT``, written
+atomically. Local engines split the script into chunks, synthesize them in
+parallel across cores, join the WAV segments and encode them with ffmpeg.
+
+Selection (first match wins):
+    1. A per-run backend (``--tts-backend`` / the app's speech engine option)
+    2. TTS_BACKEND_VOICES, e.g. ``onyx=piper,nova=espeak``
+    3. TTS_BACKEND (openai, piper or espeak; default: openai)
+
+Run ``python -m blog_to_podcast.tts_backends [--text FILE] [backend ...]`` to
+compare the real-time factor of each backend on this machine.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Type
+
+import openai
+
+from blog_to_podcast import budget
+from blog_to_podcast.hedging import hedged_call
+from blog_to_podcast.tracing import get_tracer
+from blog_to_podcast.transcode import probe_duration, transcode_bytes
+from blog_to_podcast.workspace import atomic_write_bytes
+
+VALID_VOICES = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
+
+# Formats the TTS API can return directly, mapped to their file extension
+AUDIO_FORMATS = {"mp3": ".mp3", "opus": ".opus", "aac": ".aac", "wav": ".wav"}
+
+
+class TTSBackendError(Exception):
+    """Raised when a TTS backend is unknown, unavailable or fails."""
+
+
+def tts_settings() -> dict:
+    """
+    Read the TTS model and canonical stored audio format from the environment.
+
+    TTS_MODEL selects the OpenAI model (default: tts-1) and AUDIO_FORMAT the
+    format episodes are stored in (mp3, opus, aac or wav; default: mp3). A
+    run downgraded by budget admission uses its plan's TTS model instead.
+    """
+    plan = budget.current_plan()
+    audio_format = os.getenv("AUDIO_FORMAT", "mp3").lower()
+    if audio_format not in AUDIO_FORMATS:
+        audio_format = "mp3"
+    return {
+        "model": plan.tts_model if plan else os.getenv("TTS_MODEL", "tts-1"),
+        "format": audio_format
+    }
+
+
+def _format_for_extension(output_path: str) -> str:
+    extension = os.path.splitext(output_path)[1].lower()
+    return next((fmt for fmt, ext in AUDIO_FORMATS.items() if ext == extension), tts_settings()["format"])
+
+
+def synthesize_to_file(client: openai.OpenAI, text: str, voice: str, output_path: str) -> None:
+    """Synthesize text with OpenAI TTS and atomically write it to output_path.
+
+    The audio format is taken from output_path's extension.
+    """
+    settings = tts_settings()
+    audio_format = _format_for_extension(output_path)
+
+    with get_tracer().span("openai.audio.speech", **{
+        "tts.model": settings["model"], "tts.voice": voice,
+        "tts.format": audio_format, "tts.characters": len(text)
+    }) as span:
+        def request(cancelled: threading.Event) -> bytes:
+            # Stream the body so a losing hedged attempt stops downloading
+            chunks = []
+            with client.audio.speech.with_streaming_response.create(
+                model=settings["model"],
+                voice=voice,
+                input=text,
+                response_format=audio_format
+            ) as response:
+                for chunk in response.iter_bytes():
+                    if cancelled.is_set():
+                        break
+                    chunks.append(chunk)
+            return b"".join(chunks)
+
+        # A duplicate request is billed for the whole text as well
+        audio = hedged_call("openai.audio.speech", request, initial_delay=15.0, size=len(text),
+                            on_hedge=lambda: budget.record_tts("openai", settings["model"], len(text)))
+        span.set_attribute("http.response_bytes", len(audio))
+
+    atomic_write_bytes(output_path, audio)
+
+
+class TTSBackend:
+    """Base class: synthesize text in one voice to an audio file."""
+
+    name = ""
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        raise NotImplementedError
+
+
+class OpenAIBackend(TTSBackend):
+    """OpenAI TTS API (hedged, streamed)."""
+
+    name = "openai"
+
+    def __init__(self, client: Optional[openai.OpenAI] = None):
+        self._client = client
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        if self._client is None:
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                raise TTSBackendError("OPENAI_API_KEY not found in environment variables.")
+            self._client = openai.OpenAI(api_key=api_key)
+        synthesize_to_file(self._client, text, voice, output_path)
+        budget.record_tts(self.name, tts_settings()["model"], len(text))
+
+
+def split_for_synthesis(text: str, max_chars: int = 600) -> List[str]:
+    """Split text into paragraph/sentence-aligned chunks of at most ~max_chars."""
+    chunks, current = [], ""
+    for paragraph in (p.strip() for p in text.split("\n") if p.strip()):
+        pieces = [paragraph] if len(paragraph) <= max_chars else re.split(r'(?<=[.!?])\s+', paragraph)
+        for piece in pieces:
+            if current and len(current) + len(piece) + 1 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class LocalBackend(TTSBackend):
+    """
+    A CPU speech engine run as a subprocess per chunk.
+
+    Args:
+        workers: Chunks synthesized in parallel (default: TTS_LOCAL_WORKERS or CPU count)
+        chunk_chars: Target chunk size in characters
+    """
+
+    binary_env = ""
+    default_binary = ""
+    voice_map: Dict[str, str] = {}
+
+    def __init__(self, workers: Optional[int] = None, chunk_chars: int = 600):
+        self.workers = workers or int(os.getenv("TTS_LOCAL_WORKERS", os.cpu_count() or 1))
+        self.chunk_chars = chunk_chars
+
+    @property
+    def binary(self) -> str:
+        return os.getenv(self.binary_env, self.default_binary)
+
+    def native_voice(self, voice: str) -> str:
+        return self.voice_map.get(voice, self.voice_map["alloy"])
+
+    def command(self, native_voice: str, wav_path: str) -> List[str]:
+        """Command that reads text on stdin and writes a WAV file to wav_path."""
+        raise NotImplementedError
+
+    def _synthesize_chunk(self, text: str, native_voice: str, wav_path: str) -> None:
+        try:
+            completed = subprocess.run(self.command(native_voice, wav_path), input=text.encode("utf-8"),
+                                       capture_output=True, check=False)
+        except FileNotFoundError:
+            raise TTSBackendError(f"{self.binary} not found; install it or set {self.binary_env}")
+        if completed.returncode != 0:
+            raise TTSBackendError(completed.stderr.decode("utf-8", "replace").strip() or f"{self.name} failed")
+
+    def synthesize(self, text: str, voice: str, output_path: str) -> None:
+        native_voice = self.native_voice(voice)
+        chunks = split_for_synthesis(text, self.chunk_chars)
+        audio_format = _format_for_extension(output_path)
+
+        with get_tracer().span(f"tts.{self.name}", **{
+            "tts.voice": native_voice, "tts.characters": len(text), "tts.chunks": len(chunks)
+        }), tempfile.TemporaryDirectory(prefix="tts_") as tmp_dir:
+            wav_paths = [os.path.join(tmp_dir, f"chunk_{i:04d}.wav") for i in range(len(chunks))]
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(lambda args: self._synthesize_chunk(args[0], native_voice, args[1]),
+                                  zip(chunks, wav_paths)))
+
+            joined_path = os.path.join(tmp_dir, "joined.wav")
+            _join_wavs(wav_paths, joined_path)
+
+            if audio_format == "wav":
+                with open(joined_path, "rb") as f:
+                    audio = f.read()
+            else:
+                audio = transcode_bytes(joined_path, audio_format)
+
+        atomic_write_bytes(output_path, audio)
+        budget.record_tts(self.name, None, len(text))
+
+
+def _join_wavs(wav_paths: List[str], output_path: str) -> None:
+    """Concatenate WAV files that share sample rate, width and channels."""
+    with wave.open(output_path, "wb") as out:
+        for i, path in enumerate(wav_paths):
+            with wave.open(path, "rb") as segment:
+                if i == 0:
+                    out.setparams(segment.getparams())
+                out.writeframes(segment.readframes(segment.getnframes()))
+
+
+class PiperBackend(LocalBackend):
+    """Piper neural TTS (https://github.com/rhasspy/piper) with downloaded .onnx voices."""
+
+    name = "piper"
+    binary_env = "PIPER_BINARY"
+    default_binary = "piper"
+    voice_map = {
+        "alloy": "en_US-lessac-medium",
+        "echo": "en_US-ryan-medium",
+        "fable": "en_GB-alan-medium",
+        "onyx": "en_US-joe-medium",
+        "nova": "en_US-amy-medium",
+        "shimmer": "en_US-kristin-medium",
+    }
+
+    def command(self, native_voice: str, wav_path: str) -> List[str]:
+        voices_dir = os.path.expanduser(os.getenv("PIPER_VOICES_DIR", "~/.local/share/piper"))
+        model = os.path.join(voices_dir, f"{native_voice}.onnx")
+        if not os.path.exists(model):
+            raise TTSBackendError(f"Piper voice model not found: {model}")
+        return [self.binary, "--model", model, "--output_file", wav_path]
+
+
+class EspeakBackend(LocalBackend):
+    """espeak-ng formant synthesis: robotic, but tiny and very fast."""
+
+    name = "espeak"
+    binary_env = "ESPEAK_BINARY"
+    default_binary = "espeak-ng"
+    voice_map = {
+        "alloy": "en-us",
+        "echo": "en-us+m3",
+        "fable": "en-gb",
+        "onyx": "en-us+m7",
+        "nova": "en-us+f3",
+        "shimmer": "en-us+f4",
+    }
+
+    def command(self, native_voice: str, wav_path: str) -> List[str]:
+        return [self.binary, "-v", native_voice, "-s", "165", "--stdin", "-w", wav_path]
+
+
+BACKENDS: Dict[str, Type[TTSBackend]] = {
+    "openai": OpenAIBackend,
+    "piper": PiperBackend,
+    "espeak": EspeakBackend,
+}
+
+
+def get_backend(name: str) -> TTSBackend:
+    """Instantiate a backend by name."""
+    if name not in BACKENDS:
+        raise TTSBackendError(f"Unknown TTS backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+def select_backend(voice: str, override: Optional[str] = None) -> TTSBackend:
+    """Pick the backend for a voice: per-run override, then per-voice, then default."""
+    if override:
+        return get_backend(override)
+    per_voice = dict(
+        (part.strip() for part in item.split("=", 1))
+        for item in os.getenv("TTS_BACKEND_VOICES", "").split(",") if "=" in item
+    )
+    name = per_voice.get(voice) or os.getenv("TTS_BACKEND", "openai")
+    return get_backend(name.strip())
+
+
+def audio_seconds(path: str) -> float:
+    """Duration of an audio file (WAV natively, other formats via ffprobe)."""
+    if path.endswith(".wav"):
+        with wave.open(path, "rb") as f:
+            return f.getnframes() / f.getframerate()
+    return probe_duration(path)
+
+
+def benchmark(text: str, backends: Optional[List[str]] = None, voice: str = "alloy") -> List[Dict]:
+    """
+    Synthesize the same text with each backend and measure its speed.
+
+    Returns:
+        One dictionary per backend with seconds, audio_seconds and rtf
+        (real-time factor: synthesis time / audio duration; below 1 is
+        faster than real time), or an error
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="tts_bench_") as tmp_dir:
+        for name in backends or list(BACKENDS):
+            output_path = os.path.join(tmp_dir, f"{name}.wav")
+            started = time.perf_counter()
+            try:
+                get_backend(name).synthesize(text, voice, output_path)
+            except Exception as e:
+                results.append({"backend": name, "error": str(e)})
+                continue
+            elapsed = time.perf_counter() - started
+            duration = audio_seconds(output_path)
+            results.append({
+                "backend": name,
+                "seconds": elapsed,
+                "audio_seconds": duration,
+                "rtf": elapsed / duration if duration else 0.0,
+            })
+    return results
+
+
+SAMPLE_TEXT = (
+    "Welcome back to the show. Today we are looking at why small, boring "
+    "infrastructure decisions end up shaping how fast a team can move. "
+    "We will start with a story about a deploy that took four hours, and end "
+    "with three habits you can adopt this week.\n"
+) * 8
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    text = SAMPLE_TEXT
+    if args[:1] == ["--text"]:
+        with open(args[1], encoding="utf-8") as f:
+            text = f.read()
+        args = args[2:]
+
+    print(f"{'backend':<10}{'synth s':>10}{'audio s':>10}{'RTF':>8}")
+    for row in benchmark(text, args or None):
+        if "error" in row:
+            print(f"{row['backend']:<10}  error: {row['error']}")
+        else:
+            print(f"{row['backend']:<10}{row['seconds']:>10.2f}{row['audio_seconds']:>10.1f}{row['rtf']:>8.3f}")
+    print(f"CPU cores: {os.cpu_count()}, characters: {len(text):,}")
@@ -0,0 +1,310 @@
+"""
+Precomputed waveform peaks for library previews.
+
+Drawing a waveform or offering jump points from the audio itself means
+decoding megabytes per episode every time the library is shown. Instead,
+each episode is summarised once, right after synthesis, into a few hundred
+points: the peak and RMS loudness of each slice of the episode, plus jump
+points where speech resumes after the longest pauses (usually section
+breaks). The summary is a few kilobytes of JSON stored next to the
+episode's metadata:
+
+    output/runs/<run_id>/metadata/<audio stem>.waveform.json
+    output/metadata/<audio stem>.waveform.json      (legacy output/audio files)
+
+    {"version": 1, "audio": "podcast.mp3", "bytes": 4815162, "mtime_ns": ...,
+     "duration": 412.3, "points": 400, "peaks": [0-255, ...],
+     "rms": [0-255, ...], "jumps": [12.4, 61.0, ...]}
+
+Decoding streams: ffmpeg decodes the episode to 8 kHz mono 16-bit PCM on a
+pipe (WAV files are read directly with the ``wave`` module), and each
+one-second block is reduced into the points it covers with numpy. Memory
+stays bounded by one block plus the summary, whatever the episode length.
+A summary whose audio size or modification time no longer matches is
+treated as missing.
+
+Usage:
+    python -m blog_to_podcast.waveform show <audio file>
+    python -m blog_to_podcast.waveform backfill [--force]
+
+Configuration (environment variables):
+    WAVEFORM_POINTS   Points per episode (default: 400)
+    WAVEFORM_JUMPS    Maximum jump points per episode (default: 12)
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from blog_to_podcast.logging_config import get_logger, log_event
+from blog_to_podcast.transcode import TranscodeError, ffmpeg_binary, probe_duration
+from blog_to_podcast.workspace import AUDIO_EXTENSIONS, atomic_write_text
+
+logger = get_logger("waveform")
+
+WAVEFORM_VERSION = 1
+WAVEFORM_SUFFIX = ".waveform.json"
+DEFAULT_POINTS = 400
+DEFAULT_JUMPS = 12
+
+# ffmpeg decodes to this rate; plenty for loudness, and 16 KB per second
+DECODE_RATE = 8000
+# Loudness is judged over 50 ms windows; a pause is this quiet for this long
+WINDOW_SECONDS = 0.05
+SILENCE_RMS = 0.01
+MIN_PAUSE_SECONDS = 0.6
+
+
+class WaveformError(Exception):
+    """The audio could not be decoded into a waveform summary."""
+
+
+def waveform_path(audio_path: str) -> str:
+    """Where the summary of an episode's audio file is stored."""
+    audio_dir = os.path.dirname(os.path.abspath(audio_path))
+    stem = os.path.splitext(os.path.basename(audio_path))[0]
+    return os.path.join(os.path.dirname(audio_dir), "metadata", stem + WAVEFORM_SUFFIX)
+
+
+def _blocks_from_wav(path: str) -> Optional[tuple]:
+    """(rate, total samples, block iterator) for 16-bit WAV files, else None."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            return None
+        rate, channels, frames = f.getframerate(), f.getnchannels(), f.getnframes()
+
+    def blocks() -> Iterator[np.ndarray]:
+        with wave.open(path, "rb") as f:
+            while True:
+                data = f.readframes(rate)
+                if not data:
+                    return
+                samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+                if channels > 1:
+                    samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+                yield samples / 32768.0
+
+    return rate, frames, blocks()
+
+
+def _blocks_from_ffmpeg(path: str) -> tuple:
+    """(rate, expected total samples, block iterator) decoding any format with ffmpeg."""
+    total = max(1, math.ceil(probe_duration(path) * DECODE_RATE))
+
+    def blocks() -> Iterator[np.ndarray]:
+        try:
+            process = subprocess.Popen(
+                [ffmpeg_binary(), "-nostdin", "-v", "error", "-i", path, "-ac", "1", "-ar", str(DECODE_RATE),
+                 "-f", "s16le", "pipe:1"],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except FileNotFoundError as e:
+            raise TranscodeError(f"ffmpeg not found: {e}")
+        try:
+            while True:
+                data = process.stdout.read(DECODE_RATE * 2)
+                if not data:
+                    break
+                yield np.frombuffer(data[:len(data) - len(data) % 2], dtype="<i2").astype(np.float32) / 32768.0
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise TranscodeError(f"ffmpeg failed to decode {path}: {stderr.decode(errors='replace').strip()}")
+
+    return DECODE_RATE, total, blocks()
+
+
+def compute_waveform(audio_path: str, points: Optional[int] = None, max_jumps: Optional[int] = None) -> Dict:
+    """
+    Summarise an audio file into peak and RMS points plus jump points.
+
+    Args:
+        audio_path: Episode audio file in any format ffmpeg reads
+        points: Number of points (default: WAVEFORM_POINTS or 400)
+        max_jumps: Maximum jump points (default: WAVEFORM_JUMPS or 12)
+
+    Raises:
+        WaveformError: If the file is not readable audio
+        TranscodeError: If ffmpeg or ffprobe is missing or fails
+    """
+    points = points or int(os.getenv("WAVEFORM_POINTS", str(DEFAULT_POINTS)))
+    max_jumps = max_jumps if max_jumps is not None else int(os.getenv("WAVEFORM_JUMPS", str(DEFAULT_JUMPS)))
+    stat = os.stat(audio_path)
+    try:
+        decoded = _blocks_from_wav(audio_path) if audio_path.lower().endswith(".wav") else None
+    except (wave.Error, EOFError) as e:
+        raise WaveformError(f"Could not read {audio_path}: {e}")
+    rate, total, blocks = decoded or _blocks_from_ffmpeg(audio_path)
+    total = max(total, 1)
+
+    peaks = np.zeros(points, dtype=np.float32)
+    squares = np.zeros(points, dtype=np.float64)
+    counts = np.zeros(points, dtype=np.int64)
+    window = max(1, int(rate * WINDOW_SECONDS))
+    min_pause_windows = math.ceil(MIN_PAUSE_SECONDS / WINDOW_SECONDS)
+    # The longest pauses seen so far, as (length, resume time), bounded by max_jumps
+    pauses = []
+    silent_windows = 0
+    heard_speech = False
+    pending = np.zeros(0, dtype=np.float32)
+    offset = 0
+
+    for block in blocks:
+        # Bucket of every sample; samples past the expected end go to the last point
+        index = np.minimum((offset + np.arange(len(block), dtype=np.int64)) * points // total, points - 1)
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        buckets = index[starts]
+        np.maximum.at(peaks, buckets, np.maximum.reduceat(np.abs(block), starts))
+        np.add.at(squares, buckets, np.add.reduceat(block.astype(np.float64) ** 2, starts))
+        np.add.at(counts, buckets, np.diff(np.r_[starts, len(block)]))
+
+        # Pauses are tracked on whole windows; a partial window waits for the next block
+        samples = np.concatenate((pending, block)) if len(pending) else block
+        usable = len(samples) - len(samples) % window
+        window_start = offset - len(pending)
+        loudness = np.sqrt(np.mean(samples[:usable].reshape(-1, window) ** 2, axis=1)) if usable else []
+        for number, level in enumerate(loudness):
+            if level < SILENCE_RMS:
+                silent_windows += 1
+                continue
+            if heard_speech and silent_windows >= min_pause_windows and max_jumps:
+                resume = (window_start + number * window) / rate
+                heapq.heappush(pauses, (silent_windows, resume))
+                if len(pauses) > max_jumps:
+                    heapq.heappop(pauses)
+            heard_speech = True
+            silent_windows = 0
+        pending = samples[usable:].copy()
+        offset += len(block)
+
+    if offset == 0:
+        raise WaveformError(f"No audio decoded from {audio_path}")
+    rms = np.sqrt(squares / np.maximum(counts, 1))
+    return {
+        "version": WAVEFORM_VERSION,
+        "audio": os.path.basename(audio_path),
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "duration": round(offset / rate, 3),
+        "points": points,
+        "peaks": np.rint(np.clip(peaks, 0, 1) * 255).astype(int).tolist(),
+        "rms": np.rint(np.clip(rms, 0, 1) * 255).astype(int).tolist(),
+        "jumps": sorted(round(resume, 2) for _, resume in pauses),
+    }
+
+
+def _fresh(summary: Dict, audio_path: str) -> bool:
+    try:
+        stat = os.stat(audio_path)
+    except OSError:
+        return False
+    return (summary.get("version") == WAVEFORM_VERSION and summary.get("bytes") == stat.st_size
+            and summary.get("mtime_ns") == stat.st_mtime_ns)
+
+
+def load_waveform(audio_path: str) -> Optional[Dict]:
+    """The stored summary of an audio file, or None if it is missing or stale."""
+    try:
+        with open(waveform_path(audio_path), encoding="utf-8") as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return summary if _fresh(summary, audio_path) else None
+
+
+def ensure_waveform(audio_path: str, force: bool = False) -> str:
+    """
+    Compute and store the summary of an audio file unless a fresh one exists.
+
+    Returns:
+        Path of the stored summary
+
+    Raises:
+        WaveformError, TranscodeError: If the audio cannot be decoded
+    """
+    path = waveform_path(audio_path)
+    if force or load_waveform(audio_path) is None:
+        atomic_write_text(path, json.dumps(compute_waveform(audio_path), separators=(",", ":")))
+    return path
+
+
+def write_waveform(audio_path: str) -> Optional[str]:
+    """
+    Store the summary of a freshly synthesized file.
+
+    Best effort: previews are optional, so a decoding failure is logged and
+    never fails the conversion.
+
+    Returns:
+        Path of the stored summary, or None if it could not be computed
+    """
+    try:
+        return ensure_waveform(audio_path)
+    except (WaveformError, TranscodeError, OSError) as e:
+        log_event(logger, "waveform.failed", logging.WARNING, audio=os.path.basename(audio_path),
+                  error=str(e)[:500])
+        return None
+
+
+def _audio_files(output_dir: str) -> Iterator[Path]:
+    root = Path(output_dir)
+    candidates = list((root / "audio").glob("*")) + list((root / "runs").glob("**/audio/*"))
+    for path in sorted(candidates):
+        if path.suffix in AUDIO_EXTENSIONS and not path.name.startswith(".tmp_"):
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precomputed waveform summaries for library previews")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    show = subparsers.add_parser("show", help="Print the summary of an audio file, computing it if needed")
+    show.add_argument("audio", help="Episode audio file")
+    backfill = subparsers.add_parser("backfill", help="Summarise every episode that has no fresh summary")
+    backfill.add_argument("--output-dir", default="output", help="Output directory (default: output)")
+    backfill.add_argument("--force", action="store_true", help="Recompute existing summaries")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        try:
+            started = time.perf_counter()
+            path = ensure_waveform(args.audio)
+            seconds = time.perf_counter() - started
+        except (WaveformError, TranscodeError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        summary = load_waveform(args.audio)
+        print(f"{path} ({os.path.getsize(path):,} bytes, {seconds:.2f}s)")
+        print(f"  duration: {summary['duration']:.1f}s, points: {summary['points']}, "
+              f"max peak: {max(summary['peaks'])}/255")
+        print(f"  jump points: {', '.join(f'{jump:.1f}s' for jump in summary['jumps']) or 'none'}")
+        return 0
+
+    done = failed = skipped = 0
+    for audio in _audio_files(args.output_dir):
+        if not args.force and load_waveform(str(audio)) is not None:
+            skipped += 1
+            continue
+        try:
+            ensure_waveform(str(audio), force=args.force)
+            done += 1
+        except (WaveformError, TranscodeError, OSError) as e:
+            failed += 1
+            print(f"{audio}: {e}", file=sys.stderr)
+    print(f"Summarised {done} file(s), {skipped} already up to date, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Warm process pool for running many conversions concurrently.
+
+Starting a fresh Python process per conversion re-imports CrewAI, OpenAI and
+Firecrawl and rebuilds the crew from the YAML configs every time. This pool
+keeps long-lived worker processes whose heavy modules are preloaded (in the
+forkserver parent where available, so each new worker forks from an already
+warm interpreter) and whose crew setup has been exercised once, so jobs only
+pay for the conversion itself.
+
+Configuration (environment variables, overridable per pool):
+    POOL_WORKERS               Number of worker processes (default: CPU count)
+    POOL_MAX_JOBS_PER_WORKER   Jobs a worker runs before it is replaced (default: 50)
+    POOL_START_METHOD          multiprocessing start method (default: forkserver;
+                               fork requires POOL_MAX_JOBS_PER_WORKER=0)
+
+On Python 3.10, whose ProcessPoolExecutor cannot replace single workers,
+the whole pool is replaced once it has been given max_jobs_per_worker jobs
+per worker.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, Optional
+
+PRELOAD_MODULES = [
+    "crewai",
+    "openai",
+    "firecrawl",
+    "blog_to_podcast.crew",
+    "blog_to_podcast.main",
+]
+
+
+def _warm_worker():
+    """Pool initializer: import heavy modules and build the crew template once."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from blog_to_podcast.crew_factory import get_crew_factory
+    from blog_to_podcast.logging_config import configure_logging
+    from blog_to_podcast.workspace import RunWorkspace
+
+    configure_logging()
+
+    # Build (but do not run) a throwaway crew so YAML parsing, agent/LLM
+    # construction and lazy provider imports are paid for before the first
+    # job; the factory keeps the parsed template for every later job
+    scratch_dir = tempfile.mkdtemp(prefix="blog_to_podcast_warmup_")
+    try:
+        get_crew_factory().create(RunWorkspace.create(base_dir=scratch_dir))
+    except Exception:
+        # Missing API keys etc. surface on the real job with a clear error
+        pass
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _convert_job(blog_url: str, voice: str, tts_backend: Optional[str] = None,
+                 job_id: Optional[str] = None, job_store_path: Optional[str] = None,
+                 admission: Optional[Dict] = None) -> Dict:
+    """
+    Run one conversion inside a worker and return picklable artifact paths.
+
+    With a job_id, status and per-stage progress are recorded in the job
+    store at job_store_path as the conversion runs. With an admission (a
+    budget Decision as a dictionary) the run uses that decision's plan
+    instead of being admitted again. A run that writes no audio fails
+    (convert raises ConversionError), so the job is never marked succeeded
+    on a tool's "Error: ..." answer.
+    """
+    from blog_to_podcast.budget import Decision
+    from blog_to_podcast.main import convert
+    from blog_to_podcast.workspace import RunWorkspace
+
+    store = None
+    progress = None
+    workspace = RunWorkspace.create()
+    if job_id:
+        from blog_to_podcast.jobs import JobStore
+        store = JobStore(job_store_path)
+        store.start(job_id, workspace.run_id)
+        progress = lambda stage, state: store.progress(job_id, stage, state)
+
+    try:
+        artifacts = convert(blog_url, voice, workspace, tts_backend=tts_backend, progress=progress,
+                            admission=Decision.from_dict(admission) if admission else None)
+    except Exception as e:
+        if store:
+            store.fail(job_id, str(e))
+        raise
+
+    result = artifacts.pop('result', None)
+    job_artifacts = {
+        'run_id': artifacts['run_id'],
+        'audio': [str(path) for path in artifacts['audio']],
+        'script': str(artifacts['script']) if artifacts['script'] else None,
+        'info': str(artifacts['info']) if artifacts['info'] else None,
+    }
+    if store:
+        store.succeed(job_id, job_artifacts)
+    return {
+        **job_artifacts,
+        'blog_url': blog_url,
+        'result': getattr(result, 'raw', str(result)),
+        'worker_pid': os.getpid()
+    }
+
+
+class WarmCrewPool:
+    """
+    Pool of long-lived, preloaded worker processes running conversions.
+
+    Args:
+        workers: Number of worker processes (default: POOL_WORKERS or CPU count)
+        max_jobs_per_worker: Jobs per worker before it is recycled
+            (default: POOL_MAX_JOBS_PER_WORKER or 50; 0 disables recycling)
+        start_method: multiprocessing start method (default: POOL_START_METHOD
+            or forkserver where supported, otherwise spawn)
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_jobs_per_worker: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        self.workers = workers or int(os.getenv("POOL_WORKERS", os.cpu_count() or 1))
+        if max_jobs_per_worker is None:
+            max_jobs_per_worker = int(os.getenv("POOL_MAX_JOBS_PER_WORKER", "50"))
+        self.max_jobs_per_worker = max_jobs_per_worker or None
+
+        start_method = start_method or os.getenv("POOL_START_METHOD")
+        if not start_method:
+            available = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in available else "spawn"
+        if start_method == "fork" and self.max_jobs_per_worker:
+            raise ValueError("POOL_START_METHOD=fork cannot recycle workers; set POOL_MAX_JOBS_PER_WORKER=0 "
+                             "or use forkserver or spawn")
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._context.set_forkserver_preload(PRELOAD_MODULES)
+
+        # max_tasks_per_child is new in Python 3.11; older versions recycle the whole pool
+        self._recycle_per_child = sys.version_info >= (3, 11)
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        options = {"max_tasks_per_child": self.max_jobs_per_worker} if self._recycle_per_child else {}
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_warm_worker,
+            **options
+        )
+
+    def _submit(self, fn, *args) -> Future:
+        """Submit under the lock, replacing the pool when it is due on Python 3.10."""
+        if self.max_jobs_per_worker and not self._recycle_per_child:
+            self._submitted += 1
+            if self._submitted > self.max_jobs_per_worker * self.workers:
+                # Queued jobs still finish on the old workers, which then exit
+                old_executor, self._executor = self._executor, self._new_executor()
+                old_executor.shutdown(wait=False)
+                self._submitted = 1
+        return self._executor.submit(fn, *args)
+
+    def warm_up(self):
+        """
+        Start every worker now instead of on first use.
+
+        Each submitted ping launches a worker process (they are spawned on
+        demand while none is idle), and the initializer preloads it.
+        """
+        with self._lock:
+            futures = [self._submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, blog_url: str, voice: str = "alloy", tts_backend: Optional[str] = None,
+               job_id: Optional[str] = None, job_store_path: Optional[str] = None,
+               admission: Optional[Dict] = None) -> Future:
+        """
+        Queue a conversion; the future resolves to its artifact dictionary.
+
+        Pass job_id (and job_store_path) to have the worker record the job's
+        progress in a JobStore, and admission to run with a budget decision
+        already made.
+        """
+        with self._lock:
+            return self._submit(_convert_job, blog_url, voice, tts_backend, job_id, job_store_path,
+                                admission)
+
+    def convert_many(self, blog_urls: Iterable[str], voice: str = "alloy",
+                     tts_backend: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Convert many URLs and yield artifact dictionaries as they complete.
+
+        Failed conversions are yielded as {'blog_url': ..., 'error': ...}.
+        """
+        futures = {self.submit(url, voice, tts_backend): url for url in blog_urls}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {'blog_url': futures[future], 'error': str(e)}
+
+    def recycle(self):
+        """Replace all workers, waiting for queued jobs on the old ones to finish."""
+        with self._lock:
+            old_executor, self._executor = self._executor, self._new_executor()
+            self._submitted = 0
+        old_executor.shutdown(wait=True)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -0,0 +1,140 @@
+"""
+Per-run output workspaces.
+
+Every conversion gets its own run ID and directory under ``output/runs`` so
+that concurrent conversions never overwrite each other's script, audio or
+metadata files. Files are written to a temporary name in the target
+directory and atomically renamed into place, so readers never see a
+partially written artifact.
+"""
+
+import datetime
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from blog_to_podcast.tracing import get_tracer
+from blog_to_podcast import profiling
+
+DEFAULT_RUNS_DIR = os.path.join("output", "runs")
+
+AUDIO_EXTENSIONS = (".mp3", ".opus", ".aac", ".wav")
+
+
+def new_run_id() -> str:
+    """Create a sortable, unique run identifier."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{timestamp}_{uuid.uuid4().hex[:8]}"
+
+
+def atomic_write_bytes(path: str, data: Union[bytes, Iterable[bytes]]) -> str:
+    """
+    Write bytes to path via a temporary file and an atomic rename.
+
+    Args:
+        path: Destination file path
+        data: Bytes, or an iterable of byte chunks
+
+    Returns:
+        The destination path
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with get_tracer().span("file.write", **{"file.path": path}) as span, profiling.stage("file.write"):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.splitext(path)[1])
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if isinstance(data, (bytes, bytearray)):
+                    written += f.write(data)
+                else:
+                    for chunk in data:
+                        written += f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        span.set_attribute("file.bytes", written)
+    return path
+
+
+def atomic_write_text(path: str, text: str) -> str:
+    """Write UTF-8 text to path via a temporary file and an atomic rename."""
+    return atomic_write_bytes(path, text.encode('utf-8'))
+
+
+@dataclass
+class RunWorkspace:
+    """Isolated output directory for a single conversion run."""
+    run_id: str
+    root: str
+
+    @classmethod
+    def create(cls, base_dir: str = DEFAULT_RUNS_DIR, run_id: Optional[str] = None) -> "RunWorkspace":
+        """Create a new workspace with its scripts/, audio/ and metadata/ directories."""
+        run_id = run_id or new_run_id()
+        workspace = cls(run_id=run_id, root=os.path.join(base_dir, run_id))
+        for directory in (workspace.scripts_dir, workspace.audio_dir, workspace.metadata_dir):
+            os.makedirs(directory, exist_ok=True)
+        return workspace
+
+    @property
+    def scripts_dir(self) -> str:
+        return os.path.join(self.root, "scripts")
+
+    @property
+    def audio_dir(self) -> str:
+        return os.path.join(self.root, "audio")
+
+    @property
+    def metadata_dir(self) -> str:
+        return os.path.join(self.root, "metadata")
+
+    @property
+    def content_path(self) -> str:
+        """Scraped blog content, kept for stage workers and the search index."""
+        return os.path.join(self.metadata_dir, "blog_content.md")
+
+    @property
+    def script_path(self) -> str:
+        return os.path.join(self.scripts_dir, "podcast_script.txt")
+
+    @property
+    def info_path(self) -> str:
+        return os.path.join(self.metadata_dir, "podcast_audio_info.txt")
+
+    def artifacts(self) -> Dict:
+        """
+        Return the exact artifact paths produced by this run.
+
+        Returns:
+            Dictionary with run_id, the ordered list of audio files, and the
+            script and info files (None when not written)
+        """
+        audio_dir = Path(self.audio_dir)
+        audio_files = []
+        if audio_dir.exists():
+            audio_files = sorted(
+                (f for f in audio_dir.iterdir() if f.suffix in AUDIO_EXTENSIONS and not f.name.startswith(".tmp_")),
+                key=lambda f: (_part_number(f.stem), f.name)
+            )
+
+        script_file = Path(self.script_path)
+        info_file = Path(self.info_path)
+
+        return {
+            'run_id': self.run_id,
+            'audio': audio_files,
+            'script': script_file if script_file.exists() else None,
+            'info': info_file if info_file.exists() else None
+        }
+
+
+def _part_number(stem: str) -> int:
+    if "_part" in stem and stem.rsplit("_part", 1)[-1].isdigit():
+        return int(stem.rsplit("_part", 1)[-1])
+    return 0
@@ -0,0 +1,27 @@
+"""Shared test setup: no telemetry, no real API keys, output under tmp_path."""
+
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+# Hedging exports at exit, after per-test working directories are gone
+os.environ["HEDGE_METRICS_PATH"] = os.path.join(tempfile.mkdtemp(prefix="hedging-"), "hedging.json")
+
+
+@pytest.fixture
+def fake_api_key(monkeypatch):
+    """A syntactically valid key so clients can be built; nothing is sent."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return "sk-test"
+
+
+@pytest.fixture(autouse=True)
+def budget_ledger(tmp_path, monkeypatch):
+    """A fresh cost ledger per test, so admissions never share state or paths."""
+    from blog_to_podcast import budget
+
+    monkeypatch.setenv("BUDGET_DB_PATH", str(tmp_path / "budget.db"))
+    monkeypatch.setattr(budget, "_ledger", None)
@@ -0,0 +1,112 @@
+import json
+from concurrent.futures import Future
+
+import pytest
+from starlette.testclient import TestClient
+
+from blog_to_podcast import api
+from blog_to_podcast.jobs import JobStore
+
+
+class FakePool:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, blog_url, voice="alloy", tts_backend=None, job_id=None, job_store_path=None, admission=None):
+        self.submitted.append((blog_url, voice, tts_backend))
+        return Future()
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class FakeRetention:
+    def start(self):
+        pass
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api, "get_retention_manager", FakeRetention)
+    pool = FakePool()
+    app = api.create_app(JobStore(str(tmp_path / "jobs.db")), pool)
+    with TestClient(app) as client:
+        yield client, pool
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"url": "ftp://a.example/post"}, "not an http(s) URL"),
+    ({"url": "https://a.example/post", "voice": "robot"}, "unknown voice"),
+    ({"urls": ["https://a.example/1", "https://a.example/2"], "voice": ["nova"]}, "unknown voice"),
+    ({"url": "https://a.example/post", "tts_backend": "festival"}, "unknown tts_backend"),
+    ({"urls": ["https://a.example/1"], "tts_backend": ["piper"]}, "unknown tts_backend"),
+])
+def test_invalid_submissions_are_rejected(client, body, message):
+    client, pool = client
+    response = client.post("/jobs", json=body)
+    assert response.status_code == 400
+    assert message in response.json()["error"]
+    assert pool.submitted == []
+
+
+def test_valid_batch_is_queued(client):
+    client, pool = client
+    response = client.post("/jobs", json={"urls": ["https://a.example/1", "https://a.example/2"],
+                                          "voice": "nova", "tts_backend": "piper"})
+    assert response.status_code == 202
+    body = response.json()
+    assert len(body["jobs"]) == 2 and body["batch_id"]
+    assert sorted(pool.submitted) == [("https://a.example/1", "nova", "piper"),
+                                      ("https://a.example/2", "nova", "piper")]
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_events_stream_until_finished_and_resume(client, tmp_path):
+    client, _ = client
+    job = client.post("/jobs", json={"url": "https://a.example/post"}).json()
+    store = client.app.state.jobs.store
+    audio = tmp_path / "episode.mp3"
+    audio.write_bytes(b"audio")
+    store.start(job["id"], "run-1")
+    store.progress(job["id"], "audio", "finished")
+    store.succeed(job["id"], {"run_id": "run-1", "audio": [str(audio)], "script": None, "info": None})
+
+    events = parse_sse(client.get(job["events"]).text)
+    assert [name for _, name, _ in events] == ["status", "budget", "status", "stage", "status"]
+    assert events[-1][2] == {"status": "succeeded"}
+    resumed = parse_sse(client.get(job["events"], headers={"Last-Event-ID": str(events[2][0])}).text)
+    assert resumed == events[3:]
+
+    view = client.get(f"/jobs/{job['id']}").json()
+    assert view["status"] == "succeeded"
+    download = client.get(view["artifacts"]["episode.mp3"])
+    assert download.status_code == 200 and download.content == b"audio"
+
+
+def test_unknown_and_unfinished_jobs(client):
+    client, _ = client
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.get("/jobs/nope/events").status_code == 404
+    job = client.post("/jobs", json={"url": "https://a.example/post"}).json()
+    assert client.get(f"/jobs/{job['id']}/artifacts/episode.mp3").status_code == 409
+
+
+def test_unfinished_jobs_are_resubmitted_on_startup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api, "get_retention_manager", FakeRetention)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.create("https://a.example/post", "onyx")
+    store.start(job["id"], "run-1")
+    pool = FakePool()
+    with TestClient(api.create_app(store, pool)):
+        pass
+    assert pool.submitted == [("https://a.example/post", "onyx", None)]
+    assert store.get(job["id"])["status"] == "queued"
@@ -0,0 +1,54 @@
+import pytest
+
+from blog_to_podcast import artifacts, llm_backend
+from blog_to_podcast.artifacts import ArtifactError, ArtifactStore, find_handle
+from blog_to_podcast.tools import ContentProcessor
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifacts, "record_access", lambda path: None)
+    return store
+
+
+def test_handles_are_content_addressed(store):
+    handle = store.put("A long article.", "blog_content")
+    assert handle.startswith("artifact:blog_content:") and len(handle.rsplit(":", 1)[1]) == 16
+    assert store.put("A long article.", "blog_content") == handle
+    assert store.put("A different article.", "blog_content") != handle
+    assert store.get(handle) == "A long article."
+    assert store.resolve(f"Stored it: {handle}\nPass it on.") == "A long article."
+    assert store.resolve("Plain text is returned as is.") == "Plain text is returned as is."
+
+
+def test_handles_in_long_text_and_unknown_handles(store):
+    handle = store.put("Script.", "script")
+    long_text = "word " * 200 + handle
+    assert find_handle(long_text) is None
+    assert store.resolve(long_text) == long_text
+    with pytest.raises(ArtifactError, match="artifact not found"):
+        store.get("artifact:script:0000000000000000")
+    with pytest.raises(ArtifactError, match="not an artifact handle"):
+        store.get("artifact:../etc:passwd")
+
+
+def test_tools_pass_scripts_by_handle(store, monkeypatch, fake_api_key):
+    monkeypatch.setenv("DEDUP_ENABLED", "false")
+    prompts = []
+
+    def complete(messages):
+        prompts.append(messages[1]["content"])
+        return "HOST: Welcome to the show."
+
+    monkeypatch.setattr(llm_backend, "complete", complete)
+    monkeypatch.setattr("blog_to_podcast.tools.content_processor.get_artifact_store", lambda: store)
+    content = store.put("Title: Post\n\nContent:\nArtifacts keep agents from copying text.", "blog_content")
+
+    output = ContentProcessor(return_handle=True)._run(f"{content}\n")
+    handle = find_handle(output)
+    assert handle.startswith("artifact:script:")
+    assert "Artifacts keep agents from copying text." in prompts[0]
+    assert "HOST: Welcome to the show." in store.get(handle)
+    assert ContentProcessor()._run("artifact:blog_content:0000000000000000").startswith(
+        "Error: artifact not found")
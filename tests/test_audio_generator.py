@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from blog_to_podcast.dedup import DuplicateIndex
+from blog_to_podcast.tools import audio_generator
+from blog_to_podcast.tools.audio_generator import AudioGenerator
+from blog_to_podcast.workspace import RunWorkspace
+
+SCRIPT = " ".join(f"Sentence number {n} of the episode talks about caches and queues." for n in range(60))
+
+
+class FakeBackend:
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def synthesize(self, text, voice, path):
+        self.calls.append((voice, path))
+        with open(path, "wb") as f:
+            f.write(f"{self.name}:{voice}:{os.path.splitext(path)[1]}".encode())
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = DuplicateIndex(str(tmp_path / "dedup.db"))
+    post_id = index.add(SCRIPT, "https://a.example/post", SCRIPT, str(tmp_path / "script.txt"))
+    monkeypatch.setattr(audio_generator, "get_duplicate_index", lambda: index)
+    backends = {}
+
+    def select(voice, name=None):
+        return backends.setdefault(name or "piper", FakeBackend(name or "piper"))
+
+    monkeypatch.setattr(audio_generator, "select_backend", select)
+
+    def run(voice="nova", audio_format="mp3", backend=None):
+        monkeypatch.setenv("AUDIO_FORMAT", audio_format)
+        workspace = RunWorkspace.create(base_dir=str(tmp_path / "runs"))
+        result = AudioGenerator(workspace=workspace, tts_backend=backend)._run(SCRIPT, voice=voice)
+        assert not result.startswith("Error"), result
+        files = os.listdir(workspace.audio_dir)
+        assert len(files) == 1
+        with open(os.path.join(workspace.audio_dir, files[0]), "rb") as f:
+            return files[0], f.read(), result
+
+    return run, backends, index, post_id
+
+
+def test_same_variant_reuses_audio(setup):
+    run, backends, _, _ = setup
+    run()
+    name, data, result = run()
+    assert len(backends["piper"].calls) == 1
+    assert "Reused existing episode" in result
+    assert data == b"piper:nova:.mp3" and name.endswith(".mp3")
+
+
+@pytest.mark.parametrize("change", [{"voice": "onyx"}, {"audio_format": "opus"}, {"backend": "espeak"}])
+def test_different_voice_format_or_backend_is_synthesized(setup, change):
+    run, backends, index, post_id = setup
+    run()
+    name, data, result = run(**change)
+    assert "Reused existing episode" not in result
+    voice = change.get("voice", "nova")
+    extension = ".opus" if change.get("audio_format") == "opus" else ".mp3"
+    assert name.endswith(extension)
+    assert data == f"{change.get('backend', 'piper')}:{voice}:{extension}".encode()
+    # The first rendering is still there for requests that match it
+    assert index.find_audio(post_id, "nova", "piper", "mp3") is not None
+
+
+def test_translated_scripts_are_not_expanded_into_english(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(audio_generator, "get_duplicate_index", lambda: None)
+    backend = FakeBackend("piper")
+    spoken = []
+    backend.synthesize = lambda text, voice, path: (spoken.append(text), open(path, "wb").close())
+    monkeypatch.setattr(audio_generator, "select_backend", lambda voice, name=None: backend)
+
+    workspace = RunWorkspace.create(base_dir=str(tmp_path / "runs"))
+    AudioGenerator(workspace=workspace, language="es")._run("El 15 de marzo, 3 km y 50% de los usuarios.")
+    assert spoken == ["El 15 de marzo, 3 km y 50% de los usuarios."]
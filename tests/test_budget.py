@@ -0,0 +1,100 @@
+import pytest
+
+from blog_to_podcast import budget
+from blog_to_podcast.budget import BudgetExceeded, Plan
+
+DAY = "2026-10-19"
+BASE = Plan("gpt-4o", "tts-1-hd", "openai")
+CHEAP = Plan("gpt-4o-mini", "tts-1", "openai")
+
+
+def usage(ledger, **kwargs):
+    return {row["scope"]: (round(row["spent"], 6), round(row["reserved"], 6))
+            for row in ledger.usage(day=DAY, **kwargs)}
+
+
+def test_prices():
+    assert budget.chat_cost("gpt-4o-2024-08-06", 1_000_000, 100_000) == pytest.approx(3.5)
+    assert budget.chat_cost("openai/gpt-4o-mini", 1_000_000, 0) == pytest.approx(0.15)
+    assert budget.chat_cost("gpt-4o", 1_000_000, 0, local=True) == 0.0
+    assert budget.tts_cost(2000, "openai", "tts-1-hd") == pytest.approx(0.06)
+    assert budget.tts_cost(2000, "piper") == 0.0
+
+
+def test_plan_ladder_gets_cheaper_step_by_step(monkeypatch):
+    monkeypatch.setenv("BUDGET_DOWNGRADE_TTS_BACKEND", "piper")
+    assert budget.plan_ladder(BASE) == [
+        BASE, Plan("gpt-4o-mini", "tts-1-hd", "openai"), CHEAP, Plan("gpt-4o-mini", "tts-1", "piper")
+    ]
+
+
+def test_admission_accepts_downgrades_queues_and_rejects(monkeypatch):
+    monkeypatch.setenv("BUDGET_DAILY", "2.5")
+    ledger = budget.get_ledger()
+    decisions = ledger.admit(["a", "b", "c", "d"], [(BASE, 1.0), (CHEAP, 0.4)], day=DAY)
+    assert [d.action for d in decisions] == ["accept", "accept", "downgrade", "queue"]
+    assert decisions[2].plan == CHEAP
+    assert "reserved by runs in flight" in decisions[3].reason
+    assert usage(ledger) == {f"day:{DAY}": (0.0, 2.4)}
+
+    # Spend beyond a reservation still counts in full
+    assert ledger.record(decisions[0], "run-a", "script", "chat", 2.3) == 1.0
+    assert usage(ledger) == {f"day:{DAY}": (2.3, 1.4)}
+    for decision in decisions[1:3]:
+        ledger.settle(decision.ticket)
+    ledger.settle("a")
+    assert usage(ledger) == {f"day:{DAY}": (2.3, 0.0)}
+
+    # Only spend is in the way now, so waiting would not help
+    [decision] = ledger.admit(["e"], [(BASE, 1.0), (CHEAP, 0.4)], day=DAY)
+    assert decision.action == "reject"
+    assert decision.reason == f"day:{DAY} has $0.2000 left of $2.50; the cheapest plan needs $0.4000"
+
+
+def test_user_and_batch_budgets_are_separate(monkeypatch):
+    monkeypatch.setenv("BUDGET_USER_DAILY", "1")
+    monkeypatch.setenv("BUDGET_BATCH", "1.5")
+    ledger = budget.get_ledger()
+    plans = [(BASE, 1.0)]
+    assert ledger.admit(["a1"], plans, user="ada", batch_id="b1", day=DAY)[0].action == "accept"
+    assert ledger.admit(["a2"], plans, user="ada", day=DAY)[0].action == "queue"
+    assert ledger.admit(["g1"], plans, user="grace", batch_id="b1", day=DAY)[0].action == "queue"
+    assert ledger.admit(["g2"], plans, user="grace", day=DAY)[0].action == "accept"
+    assert usage(ledger, user="ada", batch_id="b1") == {
+        f"day:{DAY}": (0.0, 2.0), f"user:ada:{DAY}": (0.0, 1.0), "batch:b1": (0.0, 1.0)
+    }
+
+
+def test_metered_run_records_stages_and_grows_its_reservation(monkeypatch):
+    monkeypatch.setenv("BUDGET_DAILY", "1")
+    ledger = budget.get_ledger()
+    [decision] = ledger.admit(["run1"], [(BASE, 0.5)], day=DAY)
+
+    budget.record_chat("gpt-4o", 1_000_000, 0)  # not metered: ignored
+    with budget.metered(decision, "run1"):
+        assert budget.current_plan() == BASE
+        budget.check_stage("script", 0.4)
+        with budget.stage("translate"):
+            budget.record_chat("gpt-4o", 100_000, 10_000)
+        budget.record_tts("openai", "tts-1", 10_000)
+        assert ledger.reserved("run1") == pytest.approx(0.0)
+        with pytest.raises(BudgetExceeded, match="audio stage needs \\$0.8000 more"):
+            budget.check_stage("audio", 0.8)
+        budget.check_stage("audio", 0.4)
+        assert ledger.reserved("run1") == pytest.approx(0.4)
+    assert budget.current_plan() is None
+
+    assert [(row["stage"], row["kind"], round(row["cost"], 6)) for row in ledger.run_spend("run1")] == [
+        ("translate", "chat", 0.35), ("audio", "tts", 0.15)
+    ]
+    assert usage(ledger) == {f"day:{DAY}": (0.5, 0.0)}
+
+
+def test_admitted_raises_when_rejected(monkeypatch):
+    monkeypatch.setenv("BUDGET_DAILY", "0.000001")
+    with pytest.raises(BudgetExceeded, match="Budget exceeded: day:"):
+        with budget.admitted("run1", "alloy", "openai"):
+            pass
+    monkeypatch.delenv("BUDGET_DAILY")
+    with budget.admitted("run2", "alloy", "openai") as decision:
+        assert decision.action == "accept"
@@ -0,0 +1,71 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from blog_to_podcast import main
+from blog_to_podcast.jobs import JobStore
+from blog_to_podcast.worker_pool import _convert_job
+
+
+class FakeCrew:
+    def __init__(self, workspace, answer, write_audio):
+        self.workspace = workspace
+        self.answer = answer
+        self.write_audio = write_audio
+
+    def kickoff(self, inputs):
+        if self.write_audio:
+            os.makedirs(self.workspace.audio_dir, exist_ok=True)
+            with open(os.path.join(self.workspace.audio_dir, "podcast.mp3"), "wb") as f:
+                f.write(b"audio")
+        return SimpleNamespace(raw=self.answer, token_usage=None)
+
+
+@pytest.fixture
+def crew(tmp_path, monkeypatch):
+    """Replace the crew with one that answers ``answer`` and optionally writes audio."""
+    monkeypatch.chdir(tmp_path)
+    settings = {"answer": "Audio generation completed successfully!", "write_audio": True}
+
+    class Factory:
+        def create(self, workspace, tts_backend=None, task_callback=None):
+            return FakeCrew(workspace, settings["answer"], settings["write_audio"])
+
+    monkeypatch.setattr(main, "get_crew_factory", lambda: Factory())
+    return settings
+
+
+def test_convert_returns_the_runs_audio(crew):
+    artifacts = main.convert("https://blog.example.com/post")
+    assert [path.name for path in artifacts["audio"]] == ["podcast.mp3"]
+
+
+def test_convert_fails_when_the_crew_produced_no_audio(crew):
+    crew.update(answer="Error: OpenAI API rate limit exceeded.", write_audio=False)
+    with pytest.raises(main.ConversionError, match="rate limit exceeded"):
+        main.convert("https://blog.example.com/post")
+
+
+def test_pool_job_without_audio_is_failed_not_succeeded(crew, tmp_path):
+    crew.update(answer="Error: No valid script content found for audio generation.", write_audio=False)
+    store_path = str(tmp_path / "jobs.db")
+    job = JobStore(store_path).create("https://blog.example.com/post", "alloy")
+
+    with pytest.raises(main.ConversionError):
+        _convert_job("https://blog.example.com/post", "alloy", job_id=job["id"], job_store_path=store_path)
+
+    stored = JobStore(store_path).get(job["id"])
+    assert stored["status"] == "failed"
+    assert "No valid script content" in stored["error"]
+
+
+def test_pool_job_with_audio_succeeds(crew, tmp_path):
+    store_path = str(tmp_path / "jobs.db")
+    job = JobStore(store_path).create("https://blog.example.com/post", "alloy")
+
+    result = _convert_job("https://blog.example.com/post", "alloy", job_id=job["id"], job_store_path=store_path)
+
+    stored = JobStore(store_path).get(job["id"])
+    assert stored["status"] == "succeeded"
+    assert result["audio"] and result["audio"][0].endswith("podcast.mp3")
@@ -0,0 +1,97 @@
+from concurrent.futures import Future
+
+import pytest
+
+from blog_to_podcast import crawler, worker_pool
+from blog_to_podcast.crawler import CrawlFilter, CrawlState, crawl_and_convert, normalize_url
+
+ROOT = "https://blog.example.com"
+
+
+@pytest.fixture
+def state(tmp_path):
+    return CrawlState(str(tmp_path / "crawl.db"))
+
+
+def test_normalize_url_drops_tracking_and_fragments():
+    assert (normalize_url("HTTPS://Blog.Example.com/post/?utm_source=x&id=3#top")
+            == "https://blog.example.com/post?id=3")
+
+
+def test_filter_excludes_listing_pages():
+    posts = CrawlFilter(include=[r"/posts/"])
+    assert posts.is_post(f"{ROOT}/posts/caching", ROOT)
+    assert not posts.is_post(f"{ROOT}/tag/caching", ROOT)
+    assert not posts.is_post(f"{ROOT}/about", ROOT)
+
+
+def test_record_resume_and_refresh(state):
+    url = f"{ROOT}/posts/a"
+    assert state.record(ROOT, url, 1, "2026-01-01")
+    state.mark(ROOT, url, "converted", run_id="run1")
+    assert not state.record(ROOT, url, 1, "2026-01-01")
+    # A changed lastmod converts it again
+    assert state.record(ROOT, url, 1, "2026-02-01")
+    assert state.unfinished(ROOT) == [(url, 1)]
+
+
+def test_record_leaves_in_flight_urls_alone(state):
+    url = f"{ROOT}/posts/a"
+    state.record(ROOT, url, 1, None)
+    state.mark(ROOT, url, "queued")
+    assert not state.record(ROOT, url, 1, "2026-03-01")
+    assert state.counts(ROOT) == {"queued": 1}
+
+
+class FakePool:
+    """Resolves every submission immediately with the artifacts from ``outcome``."""
+
+    outcome = None
+
+    def __init__(self, workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, url, voice, tts_backend=None):
+        future = Future()
+        result = FakePool.outcome(url)
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        return future
+
+
+@pytest.fixture
+def crawl(tmp_path, monkeypatch):
+    urls = [f"{ROOT}/posts/a", f"{ROOT}/posts/b"]
+    monkeypatch.setattr(worker_pool, "WarmCrewPool", FakePool)
+    monkeypatch.setattr(crawler.Crawler, "discover", lambda self: iter((url, 1, None) for url in urls))
+    state_path = str(tmp_path / "crawl.db")
+
+    def run(outcome):
+        FakePool.outcome = staticmethod(outcome)
+        return crawl_and_convert(ROOT, state_path=state_path)
+
+    return run, state_path
+
+
+def test_runs_without_audio_are_failed_and_retried(crawl):
+    run, state_path = crawl
+    counts = run(lambda url: {"run_id": "r", "audio": [] if url.endswith("/a") else ["x.mp3"]})
+    assert counts == {"failed": 1, "converted": 1}
+    assert CrawlState(state_path).unfinished(normalize_url(ROOT)) == [(f"{ROOT}/posts/a", 1)]
+
+    # Resuming retries only the failed post
+    counts = run(lambda url: {"run_id": "r2", "audio": ["y.mp3"]})
+    assert counts == {"converted": 2}
+
+
+def test_conversion_errors_mark_failed(crawl):
+    run, _ = crawl
+    assert run(lambda url: RuntimeError("boom")) == {"failed": 2}
@@ -0,0 +1,33 @@
+from blog_to_podcast.crew_factory import CrewFactory
+from blog_to_podcast.tools import AudioGenerator
+from blog_to_podcast.workspace import RunWorkspace
+
+
+def _audio_tools(crew):
+    return [tool for task in crew.tasks for tool in task.tools if isinstance(tool, AudioGenerator)]
+
+
+def test_task_tools_use_the_runs_workspace_and_backend(tmp_path, fake_api_key):
+    factory = CrewFactory()
+    first = RunWorkspace.create(base_dir=str(tmp_path))
+    second = RunWorkspace.create(base_dir=str(tmp_path))
+
+    crew = factory.create(first, tts_backend="espeak")
+    tools = _audio_tools(crew)
+    assert tools, "the audio task should carry the audio tool"
+    for tool in tools:
+        assert tool.workspace.run_id == first.run_id
+        assert tool.tts_backend == "espeak"
+
+    # A second run gets its own tool; the first crew is unaffected
+    other = _audio_tools(factory.create(second))
+    assert [tool.workspace.run_id for tool in other] == [second.run_id]
+    assert other[0].tts_backend is None
+    assert tools[0].workspace.run_id == first.run_id
+
+
+def test_task_and_agent_share_the_same_run_tool(tmp_path, fake_api_key):
+    crew = CrewFactory().create(RunWorkspace.create(base_dir=str(tmp_path)))
+    for task in crew.tasks:
+        for tool in task.tools:
+            assert any(tool is agent_tool for agent_tool in task.agent.tools)
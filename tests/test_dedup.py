@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from blog_to_podcast.dedup import DuplicateIndex, MIN_FINGERPRINT_WORDS, hamming_distance, simhash
+
+WORDS = ("latency cache queue worker thread budget podcast script voice audio server request "
+         "database index shard replica memory disk network packet batch stream chunk token").split()
+
+
+def article(seed: int, words: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(words))
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DuplicateIndex(str(tmp_path / "dedup.db"), threshold=0.9)
+
+
+def test_near_duplicate_content_matches_and_unrelated_does_not(index):
+    original = article(1)
+    post_id = index.add(original, "https://a.example/post", original, "/tmp/script.txt")
+
+    edited = original.replace(original.split()[10], "changed", 1)
+    assert hamming_distance(simhash(original), simhash(edited)) <= index.max_distance
+    match = index.find(edited)
+    assert match is not None and match.post_id == post_id and match.url == "https://a.example/post"
+    assert index.find(article(2)) is None
+
+
+def test_short_text_is_never_matched(index):
+    short = " ".join(WORDS[:MIN_FINGERPRINT_WORDS - 1])
+    index.add(short, "https://a.example/short", short, "/tmp/short.txt")
+    assert index.find(short) is None
+    assert index.find_by_script(short) is None
+
+
+def test_audio_is_reused_only_for_the_same_variant(index):
+    script = article(3)
+    post_id = index.add(script, "https://a.example/post", script, "/tmp/script.txt")
+    index.attach_audio(post_id, "/out/a.mp3", voice="nova", backend="openai", audio_format="mp3", tts_model="tts-1")
+
+    assert index.find_audio(post_id, "nova", "openai", "mp3", "tts-1") == "/out/a.mp3"
+    assert index.find_audio(post_id, "alloy", "openai", "mp3", "tts-1") is None
+    assert index.find_audio(post_id, "nova", "openai", "opus", "tts-1") is None
+    assert index.find_audio(post_id, "nova", "piper", "mp3") is None
+    assert index.find_audio(post_id, "nova", "openai", "mp3", "tts-1-hd") is None
+
+    # Another variant is stored alongside, not over, the first
+    index.attach_audio(post_id, "/out/a.opus", voice="nova", backend="openai", audio_format="opus", tts_model="tts-1")
+    assert index.find_audio(post_id, "nova", "openai", "mp3", "tts-1") == "/out/a.mp3"
+    assert index.find_audio(post_id, "nova", "openai", "opus", "tts-1") == "/out/a.opus"
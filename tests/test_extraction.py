@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from blog_to_podcast.extraction import assess_quality, extract_article
+
+FIXTURES = Path(__file__).parent / "fixtures" / "extraction"
+
+
+def load(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_static_blog_is_extracted_without_boilerplate():
+    html = load("static_blog.html")
+    article = extract_article(html, "https://blog.example.com/posts/caching")
+
+    assert assess_quality(html, article) == (True, "ok")
+    assert article.title == "Caching Without Regret"
+    assert article.author == "Dana Rivera"
+    assert article.markdown.startswith("# Caching Without Regret")
+    assert "Finally, plan for the cold start." in article.markdown
+    # Navigation, sidebar, share buttons, comments and footer are dropped
+    for boilerplate in ("Archive", "newsletter", "Popular post", "Share", "Great post", "2026 Example"):
+        assert boilerplate not in article.markdown
+
+
+def test_list_items_with_omitted_end_tags_stay_siblings():
+    article = extract_article(load("static_blog.html"), "https://blog.example.com/posts/caching")
+
+    assert "- Read the [TTL deep dive](https://blog.example.com/posts/ttl)" in article.markdown
+    assert "- Our notes on **cache stampedes**" in article.markdown
+
+
+@pytest.mark.parametrize("dropped", ["nav", "aside"])
+def test_unclosed_items_inside_dropped_elements_do_not_swallow_the_page(dropped):
+    text = "A sentence about the article, with enough words to count. " * 30
+    html = (f"<html><body><{dropped}><ul><li>Home<li>About</ul><p>More</{dropped}>"
+            f"<article><h1>Title</h1><p>{text}</article></body></html>")
+    article = extract_article(html)
+
+    assert assess_quality(html, article) == (True, "ok")
+    assert "Home" not in article.markdown and "More" not in article.markdown
+
+
+def test_dropped_element_ends_with_its_enclosing_element():
+    text = "Body text that belongs to the article, and it keeps going. " * 30
+    html = f"<div><ul><li class='share'>Share this<li>Kept item</ul></div><div class='post'><p>{text}</div>"
+    article = extract_article(html)
+
+    assert "Share this" not in article.markdown
+    assert article.word_count > 150
+
+
+def test_javascript_shell_is_rejected():
+    html = load("js_shell.html")
+    assert assess_quality(html, extract_article(html)) == (False, "JavaScript-rendered page")
+
+
+def test_link_index_is_rejected():
+    html = load("link_index.html")
+    ok, reason = assess_quality(html, extract_article(html))
+    assert not ok
+    assert reason.startswith("mostly links") or reason.startswith("only ")
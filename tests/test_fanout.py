@@ -0,0 +1,83 @@
+import os
+import threading
+
+import pytest
+
+from blog_to_podcast import fanout, llm_backend
+from blog_to_podcast.fanout import FanoutError, convert_languages, parse_languages
+from blog_to_podcast.tools import AudioGenerator, ContentProcessor, FirecrawlScraper
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    """Fake scrape, script, translation and TTS; returns the calls they saw."""
+    monkeypatch.chdir(tmp_path)
+    calls = {"scrape": 0, "script": 0, "translate": [], "audio": []}
+    lock = threading.Lock()
+
+    def scrape(self, url):
+        calls["scrape"] += 1
+        return f"Title: Post\nURL: {url}\n\nContent:\nFan-out shares one scrape."
+
+    def script(self, content):
+        calls["script"] += 1
+        return "HOST: One scrape, many languages."
+
+    def complete(messages):
+        language = messages[0]["content"].split("into ")[1].split(".")[0]
+        with lock:
+            calls["translate"].append(language)
+        return "" if language == "German" else f"[{language}] {messages[1]['content']}"
+
+    def audio(self, podcast_script, voice="alloy", output_filename=""):
+        with lock:
+            calls["audio"].append((self.language, podcast_script))
+        with open(os.path.join(self.workspace.audio_dir, f"{output_filename}.mp3"), "wb") as f:
+            f.write(b"audio")
+        return f"- Voice used: {voice}"
+
+    monkeypatch.setattr(FirecrawlScraper, "_run", scrape)
+    monkeypatch.setattr(ContentProcessor, "_run", script)
+    monkeypatch.setattr(AudioGenerator, "_run", audio)
+    monkeypatch.setattr(llm_backend, "complete", complete)
+    monkeypatch.setattr(fanout, "index_episode", lambda *args: None)
+    monkeypatch.setattr(fanout, "record_access", lambda root: None)
+    return calls
+
+
+def test_parse_languages_drops_blanks_and_duplicates():
+    assert parse_languages(" EN, es,,en ,de") == ["en", "es", "de"]
+
+
+def test_fanout_scrapes_and_scripts_once(tmp_path, stages):
+    progress = []
+    result = convert_languages("https://a.example/post", ["en", "es", "de"], voice="nova",
+                               base_dir=str(tmp_path / "runs"),
+                               progress=lambda step, state: progress.append((step, state)))
+
+    assert (stages["scrape"], stages["script"]) == (1, 1)
+    # The source language is synthesized straight from the base script
+    assert sorted(stages["translate"]) == ["German", "Spanish"]
+    assert sorted(language for language, _ in stages["audio"]) == ["en", "es"]
+
+    languages = result["languages"]
+    assert languages["en"]["error"] is None and languages["es"]["error"] is None
+    assert languages["de"]["error"] == "empty translation for de"
+    assert [os.path.basename(path) for path in languages["es"]["audio"]] == ["podcast_es.mp3"]
+    with open(languages["es"]["script"]) as f:
+        assert "[Spanish] HOST: One scrape, many languages." in f.read()
+    assert os.path.dirname(os.path.dirname(languages["es"]["script"])).endswith(
+        os.path.join(result["run_id"], "languages", "es"))
+
+    assert progress[:4] == [("scrape", "started"), ("scrape", "finished"),
+                            ("script", "started"), ("script", "finished")]
+    assert ("de", "failed") in progress and ("es", "finished") in progress
+
+
+def test_scrape_failure_stops_every_language(tmp_path, stages, monkeypatch):
+    monkeypatch.setattr(FirecrawlScraper, "_run", lambda self, url: "Error: blocked by robots.txt")
+    with pytest.raises(FanoutError, match="blocked"):
+        convert_languages("https://a.example/post", ["en", "es"], base_dir=str(tmp_path / "runs"))
+    assert stages["script"] == 0 and stages["audio"] == []
+    with pytest.raises(ValueError):
+        convert_languages("https://a.example/post", [], base_dir=str(tmp_path / "runs"))
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+from blog_to_podcast import hedging
+from blog_to_podcast.hedging import Hedger, merge_metrics, size_class
+
+
+def slow_then_fast(delay: float = 2.0):
+    """First attempt blocks until cancelled (or delay); later attempts return at once."""
+    calls = []
+    lock = threading.Lock()
+
+    def fn(cancelled: threading.Event):
+        with lock:
+            calls.append(time.perf_counter())
+            number = len(calls)
+        if number == 1:
+            cancelled.wait(delay)
+            return "slow"
+        return "fast"
+
+    return fn, calls
+
+
+def test_hedge_wins_and_the_loser_is_recorded_as_censored():
+    hedger = Hedger("test", initial_delay=0.05, min_delay=0.01, burst=1)
+    fn, calls = slow_then_fast()
+    hedged = []
+
+    started = time.perf_counter()
+    assert hedger.call(fn, on_hedge=lambda: hedged.append(True)) == "fast"
+    assert time.perf_counter() - started < 1.0
+    assert hedged == [True]
+
+    metrics = hedger.to_dict()
+    assert metrics["hedges"] == 1 and metrics["hedge_wins"] == 1
+    # Both attempts are in the histogram; the loser as a lower bound, not dropped
+    assert metrics["latency"]["count"] == 2
+    assert metrics["censored"] == 1
+    assert hedger.histogram.percentile(100) >= 0.05
+
+
+def test_censored_samples_keep_the_deadline_from_collapsing():
+    hedger = Hedger("test", initial_delay=0.05, min_samples=4, min_delay=0.01, burst=100, max_rate=1)
+    for _ in range(4):
+        fn, _ = slow_then_fast()
+        hedger.call(fn)
+    # Every original attempt ran at least the initial deadline before losing
+    assert hedger.deadline() >= 0.05
+
+
+def test_fast_calls_are_not_hedged():
+    hedger = Hedger("test", initial_delay=1.0)
+    assert hedger.call(lambda cancelled: 42) == 42
+    assert hedger.to_dict()["hedges"] == 0
+    assert hedger.to_dict()["censored"] == 0
+
+
+def test_calls_do_not_write_metrics_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("HEDGE_METRICS_PATH", str(tmp_path / "hedging.json"))
+    hedging.get_hedger("test.no_export").call(lambda cancelled: None)
+    assert os.listdir(tmp_path) == []
+
+    hedging.export_metrics()
+    assert len(os.listdir(tmp_path)) == 1
+    assert "test.no_export" in hedging.load_metrics(str(tmp_path / "hedging.json"))
+
+
+def test_size_classes():
+    assert size_class(200) == "<=256"
+    assert size_class(1024) == "<=1k"
+    assert size_class(5000) == "<=16k"
+    assert size_class(20000) == ">16k"
+
+
+def test_merge_metrics_sums_processes():
+    first = Hedger("op", initial_delay=1.0)
+    second = Hedger("op", initial_delay=1.0)
+    for seconds in (0.2, 0.3):
+        first.histogram.record(seconds)
+    second.histogram.record(8.0)
+    first.calls, second.calls, second.hedges = 2, 1, 1
+
+    merged = merge_metrics([{"op": first.to_dict()}, {"op": second.to_dict()}])["op"]
+    assert merged["calls"] == 3 and merged["hedges"] == 1
+    assert merged["latency"]["count"] == 3
+    assert merged["latency"]["p50"] == 0.5
+    assert merged["latency"]["p99"] == 10
@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from blog_to_podcast.http_pool import MAX_REDIRECTS, HostPool, RobotsDisallowed
+
+
+def serve(routes):
+    """Start a server answering path -> (status, headers, body); returns (base URL, request log)."""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            status, headers, body = routes.get(self.path, (404, {}, ""))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body.encode())))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", requests
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(routes):
+        server, base, requests = serve(routes)
+        started.append(server)
+        return base, requests
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_cross_host_redirect_uses_the_target_hosts_robots(servers):
+    target, target_requests = servers({
+        "/robots.txt": (200, {}, "User-agent: *\nDisallow: /private\nCrawl-delay: 3\n"),
+        "/post": (200, {"Content-Type": "text/html"}, "<p>moved here</p>"),
+    })
+    source, _ = servers({
+        "/old": (301, {"Location": f"{target}/post"}, ""),
+        "/secret": (302, {"Location": f"{target}/private/page"}, ""),
+    })
+    pool = HostPool(delay=0, max_crawl_delay=5)
+    try:
+        response = pool.get(f"{source}/old")
+        assert response.text == "<p>moved here</p>"
+        assert [r.status_code for r in response.history] == [301]
+        assert target_requests[0] == "/robots.txt"
+        assert pool._host(target).delay == 3
+
+        with pytest.raises(RobotsDisallowed):
+            pool.get(f"{source}/secret")
+        assert "/private/page" not in target_requests
+    finally:
+        pool.close()
+
+
+def test_redirect_loops_are_cut_off(servers):
+    base, requests = servers({"/loop": (302, {"Location": "/loop"}, "")})
+    pool = HostPool(delay=0, respect_robots=False)
+    try:
+        with pytest.raises(httpx.TooManyRedirects):
+            pool.get(f"{base}/loop")
+        assert len(requests) == MAX_REDIRECTS + 1
+    finally:
+        pool.close()
+
+
+def test_fetch_many_follows_redirects(servers):
+    base, _ = servers({
+        "/a": (301, {"Location": "/b"}, ""),
+        "/b": (200, {}, "b"),
+        "/c": (200, {}, "c"),
+    })
+    pool = HostPool(delay=0, respect_robots=False)
+    try:
+        results = dict(pool.fetch_many([f"{base}/a", f"{base}/c"]))
+        assert results[f"{base}/a"].text == "b"
+        assert results[f"{base}/c"].text == "c"
+    finally:
+        pool.close()
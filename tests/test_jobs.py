@@ -0,0 +1,43 @@
+from blog_to_podcast.jobs import JobStore
+
+
+def test_job_lifecycle_and_events(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.create("https://a.example/post", "nova", "piper", user="ada")
+    assert (job["status"], job["voice"], job["tts_backend"], job["user"]) == ("queued", "nova", "piper", "ada")
+
+    store.start(job["id"], "run-1")
+    store.progress(job["id"], "script", "started")
+    store.succeed(job["id"], {"run_id": "run-1", "audio": ["a.mp3"]})
+    # A late failure report (e.g. from the pool callback) does not override success
+    store.fail(job["id"], "worker died")
+
+    job = store.get(job["id"])
+    assert (job["status"], job["stage"], job["run_id"], job["error"]) == ("succeeded", "script", "run-1", None)
+    assert job["artifacts"] == {"run_id": "run-1", "audio": ["a.mp3"]}
+    events = store.events(job["id"])
+    assert [(e["event"], e["data"].get("status") or e["data"].get("stage")) for e in events] == [
+        ("status", "queued"), ("status", "running"), ("stage", "script"), ("status", "succeeded")
+    ]
+    assert [e["seq"] for e in store.events(job["id"], after=events[1]["seq"])] == [e["seq"] for e in events[2:]]
+
+
+def test_batches_filters_and_restart(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    jobs = store.create_many(["https://a.example/1", "https://a.example/2", "https://a.example/3"], "alloy",
+                             batch_id="b1")
+    other = store.create("https://b.example/1", "alloy")
+    store.start(jobs[0]["id"], "run-1")
+    store.fail(jobs[1]["id"], "Budget exceeded: daily")
+
+    assert {job["id"] for job in store.list(batch_id="b1")} == {job["id"] for job in jobs}
+    assert [job["id"] for job in store.list(status="failed")] == [jobs[1]["id"]]
+    assert len(store.list(limit=2)) == 2
+
+    # Reopening the store (a restarted API) finds the unfinished jobs oldest first
+    reopened = JobStore(str(tmp_path / "jobs.db"))
+    unfinished = [job["id"] for job in reopened.unfinished()]
+    assert unfinished == [jobs[0]["id"], jobs[2]["id"], other["id"]]
+    reopened.requeue(jobs[0]["id"])
+    assert reopened.get(jobs[0]["id"])["status"] == "queued"
+    assert reopened.events(jobs[0]["id"])[-1]["data"] == {"status": "queued", "requeued": True}
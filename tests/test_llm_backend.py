@@ -0,0 +1,93 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from blog_to_podcast import budget, llm_backend
+
+MESSAGES = [{"role": "system", "content": "You write podcasts."}, {"role": "user", "content": "A post about queues."}]
+PIECES = ["Welcome ", "to the ", "show."]
+
+
+def chunk(delta=None, usage=None):
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "local-model",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": None}] if delta is not None else [],
+        "usage": usage,
+    }
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """A stub OpenAI-compatible chat completions server; yields its received request bodies."""
+    state = {"usage": True, "bodies": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            state["bodies"].append(body)
+            usage = {"prompt_tokens": 31, "completion_tokens": 7, "total_tokens": 38}
+            if not body.get("stream"):
+                payload = json.dumps({
+                    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "".join(PIECES)}}],
+                    "usage": usage,
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            events = [chunk({"role": "assistant", "content": ""})] + [chunk({"content": p}) for p in PIECES]
+            if state["usage"] and body.get("stream_options", {}).get("include_usage"):
+                events.append(chunk(usage=usage))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for event in events:
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setenv("SCRIPT_LLM_BASE_URL", f"http://127.0.0.1:{httpd.server_port}/v1")
+    monkeypatch.setenv("SCRIPT_LLM_MODEL", "local-model")
+    monkeypatch.setenv("SCRIPT_LLM_EXTRA_BODY", '{"options": {"num_ctx": 8192}}')
+    monkeypatch.delenv("SCRIPT_LLM_API_KEY", raising=False)
+    recorded = []
+    monkeypatch.setattr(budget, "record_chat",
+                        lambda model, prompt, completion, local=False: recorded.append((model, prompt, completion, local)))
+    state["recorded"] = recorded
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_stream_records_the_servers_usage(server):
+    assert "".join(llm_backend.stream(MESSAGES)) == "".join(PIECES)
+    assert server["recorded"] == [("local-model", 31, 7, True)]
+    [body] = server["bodies"]
+    assert body["stream_options"] == {"include_usage": True}
+    assert body["options"] == {"num_ctx": 8192}
+    assert body["messages"] == MESSAGES
+
+
+def test_stream_without_usage_estimates_from_characters(server):
+    server["usage"] = False
+    text = "".join(llm_backend.stream(MESSAGES))
+    prompt_chars = sum(len(m["content"]) for m in MESSAGES)
+    assert server["recorded"] == [("local-model", prompt_chars // budget.CHARS_PER_TOKEN,
+                                   len(text) // budget.CHARS_PER_TOKEN, True)]
+
+
+def test_complete_records_usage(server):
+    assert llm_backend.complete(MESSAGES) == "".join(PIECES)
+    assert server["recorded"] == [("local-model", 31, 7, True)]
+    assert not llm_backend.requires_api_key()
@@ -0,0 +1,101 @@
+import json
+import logging
+
+import pytest
+
+from blog_to_podcast import logging_config
+from blog_to_podcast.logging_config import configure_logging, crew_callbacks, get_logger, log_event, payload
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    """Configure logging into a file and restore the package loggers afterwards."""
+    path = tmp_path / "events.log"
+    monkeypatch.setenv("LOG_FILE", str(path))
+    root = logging.getLogger(logging_config.ROOT_LOGGER)
+    saved = (list(root.handlers), root.level, root.propagate)
+    yield lambda: [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in saved[0]:
+        root.addHandler(handler)
+    root.setLevel(saved[1])
+    root.propagate = saved[2]
+    for component in ("crew", "queue", "test"):
+        get_logger(component).setLevel(logging.NOTSET)
+    monkeypatch.setattr(logging_config, "_configured", False)
+
+
+def test_payload_is_bounded(monkeypatch):
+    article = "word " * 10000
+    summary = payload(article)
+    assert summary["chars"] == 50000
+    assert len(summary["sha256"]) == 16
+    assert summary["preview"] == ("word " * 16) + "…"
+    monkeypatch.setenv("LOG_PAYLOAD_CHARS", "0")
+    assert "preview" not in payload(article)
+    assert payload(None) == {"chars": 0, "sha256": payload("")["sha256"]}
+
+
+def test_events_are_json_lines_with_component_levels(log_file, monkeypatch):
+    monkeypatch.setenv("LOG_LEVELS", "crew=DEBUG,queue=WARNING")
+    configure_logging(force=True)
+    log_event(get_logger("crew"), "agent.tool", logging.DEBUG, "run1", tool="scrape")
+    log_event(get_logger("queue"), "item.claimed", run_id="run1")
+    log_event(get_logger("queue"), "item.failed", logging.WARNING, "run1", error="timeout")
+    log_event(get_logger("test"), "debug.dropped", logging.DEBUG)
+
+    events = log_file()
+    assert [(e["component"], e["event"], e["level"]) for e in events] == [
+        ("crew", "agent.tool", "DEBUG"), ("queue", "item.failed", "WARNING")
+    ]
+    assert events[0]["run_id"] == "run1" and events[0]["tool"] == "scrape"
+    assert events[1]["error"] == "timeout"
+
+
+def test_sampling_keeps_whole_runs_and_all_warnings(log_file, monkeypatch):
+    monkeypatch.setenv("LOG_SAMPLE_RATE", "0.5")
+    configure_logging(force=True)
+    logger = get_logger("test")
+    runs = [f"run{n}" for n in range(40)]
+    for run_id in runs:
+        log_event(logger, "step.one", run_id=run_id)
+        log_event(logger, "step.two", run_id=run_id)
+        log_event(logger, "step.failed", logging.ERROR, run_id)
+
+    events = log_file()
+    kept = {e["run_id"] for e in events if e["level"] == "INFO"}
+    assert 0 < len(kept) < len(runs)
+    assert all(sum(e["run_id"] == run_id and e["level"] == "INFO" for e in events) == 2 for run_id in kept)
+    assert sum(e["level"] == "ERROR" for e in events) == len(runs)
+
+
+def test_crew_callbacks_log_payload_summaries(log_file, monkeypatch):
+    monkeypatch.setenv("LOG_LEVELS", "crew=DEBUG")
+    configure_logging(force=True)
+    callbacks = crew_callbacks("run1")
+
+    class Step:
+        tool = "Firecrawl Scraper"
+        tool_input = "https://a.example/post"
+        result = "article " * 1000
+
+    class Output:
+        name = "script_generation_task"
+        agent = "Podcast Script Writer"
+        raw = "HOST: Welcome."
+
+    callbacks["step_callback"](Step())
+    callbacks["task_callback"](Output())
+    tool, task = log_file()
+    assert (tool["event"], tool["tool"], tool["output"]["chars"]) == ("agent.tool", "Firecrawl Scraper", 8000)
+    assert len(tool["output"]["preview"]) <= 81
+    assert (task["event"], task["task"], task["output"]["preview"]) == (
+        "task.finished", "script_generation_task", "HOST: Welcome.")
+
+
+def test_unknown_component_level_is_rejected(log_file, monkeypatch):
+    monkeypatch.setenv("LOG_LEVELS", "crew=LOUD")
+    with pytest.raises(ValueError, match="LOUD"):
+        configure_logging(force=True)
@@ -0,0 +1,48 @@
+import os
+import time
+
+import pytest
+
+from blog_to_podcast import profiling
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_profile_run_writes_profiles_with_stages(tmp_path):
+    with profiling.profile_run("run1", base_dir=str(tmp_path)) as profiler:
+        with profiling.stage("crew.kickoff"):
+            with profiling.stage("file.write"):
+                data = [bytes(1000) for _ in range(1000)]
+            busy(0.1)
+    del data
+
+    directory = tmp_path / "run1"
+    assert sorted(os.listdir(directory)) == ["run.prof", "stacks.folded", "summary.txt"]
+    assert profiler.summary_path == str(directory / "summary.txt")
+    summary = (directory / "summary.txt").read_text()
+    assert "crew.kickoff/file.write: wall" in summary
+    assert "crew.kickoff: wall" in summary
+    assert "busy" in summary
+    folded = (directory / "stacks.folded").read_text().splitlines()
+    assert any(";crew.kickoff;" in line and "busy (test_profiling.py" in line for line in folded)
+
+
+def test_stage_is_a_noop_without_a_session():
+    with profiling.stage("crew.setup"):
+        pass
+    assert profiling._active is None
+
+
+def test_one_session_at_a_time(tmp_path):
+    with profiling.profile_run("outer", base_dir=str(tmp_path)):
+        with pytest.raises(RuntimeError):
+            with profiling.profile_run("inner", base_dir=str(tmp_path)):
+                pass
+    assert not (tmp_path / "inner").exists()
+    assert profiling._active is None
@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+from blog_to_podcast import retention
+from blog_to_podcast.dedup import DuplicateIndex
+from blog_to_podcast.retention import RetentionManager
+from blog_to_podcast.search_index import SearchIndex
+
+SCRIPT = " ".join(f"Sentence {n} explains how an eviction policy keeps the disk under quota." for n in range(40))
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dedup = DuplicateIndex(str(tmp_path / "dedup.db"))
+    search = SearchIndex(str(tmp_path / "search.db"))
+    monkeypatch.setattr(retention, "get_duplicate_index", lambda: dedup)
+    monkeypatch.setattr(retention, "get_search_index", lambda: search)
+    runs = tmp_path / "runs"
+    runs.mkdir()
+
+    def make_run(run_id, size=1000, age=3600):
+        audio = runs / run_id / "audio"
+        audio.mkdir(parents=True)
+        path = audio / "podcast.mp3"
+        path.write_bytes(b"x" * size)
+        then = time.time() - age
+        for item in (path, audio, runs / run_id):
+            os.utime(item, (then, then))
+        return str(path)
+
+    def manager(**kwargs):
+        kwargs.setdefault("grace_seconds", 60)
+        return RetentionManager(str(tmp_path / "retention.db"), runs_dir=str(runs), legacy_dirs=[], **kwargs)
+
+    return make_run, manager, dedup, search
+
+
+def test_quota_evicts_least_recently_accessed_first(env):
+    make_run, manager, _, _ = env
+    for run_id, age in (("a", 3600), ("b", 3500), ("c", 3400)):
+        make_run(run_id, age=age)
+    gc = manager(quota_bytes=2500)
+    gc.reconcile(batch=None)
+    gc.touch(os.path.join(gc.runs_dir, "a", "audio", "podcast.mp3"))
+
+    stats = gc.collect()
+    assert stats == {"evicted": 1, "freed_bytes": 1000}
+    remaining = sorted(os.listdir(gc.runs_dir))
+    assert remaining == ["a", "c"]
+    assert gc.usage()["bytes"] == 2000
+
+
+def test_pinned_recent_and_idle_runs(env):
+    make_run, manager, _, _ = env
+    make_run("old", age=10 * 86400)
+    make_run("pinned", age=10 * 86400)
+    make_run("fresh", age=1)
+    gc = manager(max_idle_days=1)
+    gc.reconcile(batch=None)
+    gc.register(os.path.join(gc.runs_dir, "fresh"))
+    assert gc.set_pinned("pinned")
+
+    assert gc.collect()["evicted"] == 1
+    assert sorted(os.listdir(gc.runs_dir)) == ["fresh", "pinned"]
+
+
+def test_evicted_audio_is_detached_from_the_dedup_index(env):
+    make_run, manager, dedup, _ = env
+    post_id = dedup.add(SCRIPT, "https://a.example/post", SCRIPT, "script.txt")
+    evicted = make_run("gone")
+    kept = make_run("kept", age=1)
+    dedup.attach_audio(post_id, os.path.relpath(evicted), "nova", "openai", "mp3", "tts-1")
+    dedup.attach_audio(post_id, kept, "onyx", "openai", "mp3", "tts-1")
+    gc = manager(quota_bytes=1500)
+    gc.reconcile(batch=None)
+    gc.register(os.path.dirname(os.path.dirname(kept)))
+
+    assert gc.collect()["evicted"] == 1
+    assert dedup.find_audio(post_id, "nova", "openai", "mp3", "tts-1") is None
+    assert dedup.find_audio(post_id, "onyx", "openai", "mp3", "tts-1") == kept
+
+
+def test_detach_audio_matches_whole_path_components(tmp_path):
+    dedup = DuplicateIndex(str(tmp_path / "dedup.db"))
+    post_id = dedup.add(SCRIPT, "https://a.example/post", SCRIPT, "script.txt")
+    dedup.attach_audio(post_id, str(tmp_path / "runs" / "run_1" / "audio" / "a.mp3"), "nova", "openai", "mp3")
+    dedup.attach_audio(post_id, str(tmp_path / "runs" / "run_10" / "audio" / "a.mp3"), "onyx", "openai", "mp3")
+
+    assert dedup.detach_audio(str(tmp_path / "runs" / "run_1")) == 1
+    assert dedup.find_audio(post_id, "nova", "openai", "mp3") is None
+    assert dedup.find_audio(post_id, "onyx", "openai", "mp3")
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from blog_to_podcast import scheduler, stage_queue
+from blog_to_podcast.scheduler import DEFAULT_WEIGHTS, STRIDE, choose_class, class_weights, summarize_waits
+from blog_to_podcast.stage_queue import StageQueue, StageWorkers
+
+
+def serve(picks, backlogged, weights=DEFAULT_WEIGHTS, passes=None, virtual_time=0.0):
+    passes = dict(passes or {})
+    served = []
+    for _ in range(picks):
+        chosen, passes[chosen], virtual_time = choose_class(backlogged, passes, virtual_time, weights)
+        served.append(chosen)
+    return served, passes, virtual_time
+
+
+def test_classes_share_in_proportion_to_their_weights():
+    served, _, _ = serve(210, ["interactive", "scheduled", "backfill"])
+    assert Counter(served) == {"interactive": 160, "scheduled": 40, "backfill": 10}
+
+
+def test_ties_go_to_the_higher_priority_class():
+    assert choose_class(["backfill", "scheduled", "interactive"], {}, 0.0, DEFAULT_WEIGHTS)[0] == "interactive"
+    equal = {"scheduled": 1, "backfill": 1}
+    served, _, _ = serve(4, ["backfill", "scheduled"], equal)
+    assert served == ["scheduled", "backfill", "scheduled", "backfill"]
+
+
+def test_idle_class_reenters_at_virtual_time_instead_of_its_stale_pass():
+    # Backfill alone for a long time: its pass and the virtual time run far ahead
+    _, passes, virtual_time = serve(1000, ["backfill"])
+    assert virtual_time == 999 * STRIDE
+    # A scheduled run that was idle meanwhile must not get 1000 turns of credit
+    served, _, _ = serve(10, ["scheduled", "backfill"], passes=passes, virtual_time=virtual_time)
+    assert served.index("backfill") == 5
+    assert Counter(served) == {"scheduled": 9, "backfill": 1}
+
+
+def test_interactive_arriving_behind_backfill_is_served_next():
+    _, passes, virtual_time = serve(500, ["backfill"])
+    chosen, new_pass, new_time = choose_class(["backfill", "interactive"], passes, virtual_time, DEFAULT_WEIGHTS)
+    assert chosen == "interactive"
+    assert new_time == virtual_time
+    assert new_pass == virtual_time + STRIDE / DEFAULT_WEIGHTS["interactive"]
+
+
+def test_weights_from_environment(monkeypatch):
+    monkeypatch.setenv("SCHEDULER_WEIGHTS", "interactive=8, backfill=2")
+    assert class_weights() == {"interactive": 8.0, "scheduled": 4, "backfill": 2.0}
+    monkeypatch.setenv("SCHEDULER_WEIGHTS", "bulk=2")
+    with pytest.raises(ValueError):
+        class_weights()
+    monkeypatch.setenv("SCHEDULER_WEIGHTS", "backfill=0")
+    with pytest.raises(ValueError):
+        class_weights()
+
+
+def test_summarize_waits():
+    waits = [("audio", "backfill", float(n)) for n in range(1, 101)] + [("audio", "interactive", -0.5)]
+    summary = summarize_waits(waits)
+    assert summary["audio"]["backfill"] == {"count": 100, "mean": 50.5, "p50": 50.0, "p95": 95.0, "max": 100.0}
+    assert summary["audio"]["interactive"]["max"] == 0.0
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SCHEDULER_METRICS_PATH", str(tmp_path / "scheduler.json"))
+    return StageQueue(str(tmp_path / "queue.db"))
+
+
+def test_interactive_run_jumps_a_backfill_backlog(queue, tmp_path):
+    backfill = [queue.enqueue(f"https://a.example/{n}", base_dir=str(tmp_path / "runs"), priority="backfill")
+                for n in range(20)]
+    first = queue.claim("scrape", "w")
+    assert first.run_id == backfill[0]
+    interactive = queue.enqueue("https://a.example/now", base_dir=str(tmp_path / "runs"), priority="interactive")
+    item = queue.claim("scrape", "w")
+    assert (item.run_id, item.priority) == (interactive, "interactive")
+    assert queue.claim("scrape", "w").run_id == backfill[1]
+
+    metrics = queue.wait_metrics()
+    assert metrics["scrape"]["backfill"]["count"] == 2
+    assert metrics["scrape"]["interactive"]["count"] == 1
+
+
+def test_metrics_are_exported_on_the_interval(queue, tmp_path, monkeypatch):
+    queue.enqueue("https://a.example/post", base_dir=str(tmp_path / "runs"))
+    queue.claim("scrape", "w")
+    monkeypatch.setattr(stage_queue, "METRICS_INTERVAL_SECONDS", 0.05)
+    workers = StageWorkers(queue, {})
+    exporter = threading.Thread(target=workers._export_metrics, daemon=True)
+    exporter.start()
+    path = tmp_path / "scheduler.json"
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    workers.stop()
+    exporter.join(timeout=5)
+
+    document = json.loads(path.read_text())
+    assert document["queue_wait_seconds"]["scrape"]["scheduled"]["count"] == 1
+    assert document["weights"] == scheduler.class_weights()
+
+
+def test_export_drops_samples_outside_the_window(queue, tmp_path):
+    queue.enqueue("https://a.example/post", base_dir=str(tmp_path / "runs"))
+    queue.claim("scrape", "w")
+    time.sleep(0.05)
+    queue.export_wait_metrics(window_seconds=0.01)
+    assert queue.wait_metrics() == {}
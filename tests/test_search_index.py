@@ -0,0 +1,76 @@
+import datetime
+import os
+
+import pytest
+
+from blog_to_podcast.search_index import SearchIndex, fts_query, index_episode, parse_content_header, reindex
+from blog_to_podcast.workspace import RunWorkspace, atomic_write_text
+
+DAY = datetime.datetime(2026, 3, 10, 12).timestamp()
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    index.add("r1", "r1", "https://www.vectors.example/intro", "Vector databases store embeddings.",
+              title="Vector databases", voice="nova", created=DAY)
+    index.add("r2", "r2", "https://queues.example/post", "Queues decouple stages. Vector math is elsewhere.",
+              title="Queues", author="Ada", voice="alloy", created=DAY + 86400)
+    index.add("r3/es", "r3", "https://queues.example/post", "Las colas desacoplan etapas.",
+              title="Colas", voice="nova", language="es", created=DAY + 2 * 86400)
+    return index
+
+
+def test_parse_content_header_skips_unknown_values():
+    content = "Title: Post\nAuthor: Unknown author\nURL: https://a.example\n\nContent:\nTitle: not a header"
+    assert parse_content_header(content) == {"title": "Post", "url": "https://a.example"}
+
+
+def test_fts_query_quotes_every_word():
+    assert fts_query('vector OR "db*"') == '"vector" "or" "db"'
+
+
+def test_search_ranks_titles_first_and_filters(index):
+    assert [row["episode"] for row in index.search("vector")] == ["r1", "r2"]
+    assert "**Vector**" in index.search("vector")[0]["snippet"]
+    assert [row["episode"] for row in index.search("vector", voice="alloy")] == ["r2"]
+    assert [row["episode"] for row in index.search(host="vectors.example")] == ["r1"]
+    assert [row["episode"] for row in index.search(language="es")] == ["r3/es"]
+    # No query lists the newest first; a bare "until" date includes that whole day
+    assert [row["episode"] for row in index.search(since="2026-03-11")] == ["r3/es", "r2"]
+    assert [row["episode"] for row in index.search(until="2026-03-11")] == ["r2", "r1"]
+    assert index.facets() == {"voices": ["alloy", "nova"], "hosts": ["queues.example", "vectors.example"],
+                              "languages": ["es"]}
+
+
+def test_add_replaces_and_remove_run_drops_every_episode(index):
+    index.add("r1", "r1", "https://www.vectors.example/intro", "Rewritten about graphs.", created=DAY)
+    assert index.search("embeddings") == []
+    assert [row["episode"] for row in index.search("graphs")] == ["r1"]
+    index.add("r3/de", "r3", "https://queues.example/post", "Warteschlangen.", language="de")
+    assert index.remove_run("r3") == 2
+    assert not index.has_run("r3")
+    assert index.count() == 2
+
+
+def test_index_episode_and_reindex_read_workspaces(tmp_path):
+    runs = tmp_path / "runs"
+    single = RunWorkspace.create(str(runs), run_id="single")
+    atomic_write_text(single.content_path, "Title: Caching\nAuthor: Grace\nURL: https://c.example\n\nContent:\n...")
+    atomic_write_text(single.script_path, "HOST: Caching saves work.")
+    atomic_write_text(single.info_path, "- Voice used: onyx\n")
+    fanned = RunWorkspace.create(str(runs), run_id="fanned")
+    atomic_write_text(fanned.content_path, "Title: Caché\nURL: https://c.example/es\n\nContent:\n...")
+    spanish = RunWorkspace.create(os.path.join(fanned.root, "languages"), run_id="es")
+    atomic_write_text(spanish.script_path, "HOST: La caché ahorra trabajo.")
+    RunWorkspace.create(str(runs), run_id="empty")
+
+    index = SearchIndex(str(tmp_path / "search.db"))
+    assert reindex(str(runs), index) == 2
+    assert reindex(str(runs), index) == 0
+    [row] = index.search("grace")
+    assert (row["episode"], row["title"], row["voice"], row["url"]) == ("single", "Caching", "onyx", "https://c.example")
+    [row] = index.search("cache")
+    assert (row["episode"], row["run_id"], row["language"]) == ("fanned/es", "fanned", "es")
+
+    assert not index_episode(RunWorkspace.create(str(runs), run_id="no-script"), index=index)
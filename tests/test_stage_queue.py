@@ -0,0 +1,110 @@
+import os
+import time
+
+import pytest
+
+from blog_to_podcast import stage_queue
+from blog_to_podcast.stage_queue import StageQueue, StageWorkers
+from blog_to_podcast.tools import AudioGenerator, ContentProcessor, FirecrawlScraper
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return StageQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+
+
+def enqueue(queue, tmp_path, url="https://a.example/post", **kwargs):
+    return queue.enqueue(url, base_dir=str(tmp_path / "runs"), **kwargs)
+
+
+class FakeRetention:
+    def start(self):
+        pass
+
+
+def test_workers_run_every_stage_and_pass_artifacts_by_path(queue, tmp_path, monkeypatch):
+    calls = []
+
+    def scrape(self, url):
+        calls.append(("scrape", url))
+        return f"Title: Post\nURL: {url}\n\nContent:\nQueues decouple stages."
+
+    def script(self, content):
+        calls.append(("script", content.splitlines()[0]))
+        return "HOST: Today we talk about queues."
+
+    def audio(self, podcast_script, voice="alloy", output_filename=""):
+        calls.append(("audio", podcast_script, voice))
+        with open(os.path.join(self.workspace.audio_dir, "podcast.mp3"), "wb") as f:
+            f.write(b"audio")
+        return "- Voice used: nova"
+
+    monkeypatch.setattr(FirecrawlScraper, "_run", scrape)
+    monkeypatch.setattr(ContentProcessor, "_run", script)
+    monkeypatch.setattr(AudioGenerator, "_run", audio)
+    monkeypatch.setattr(stage_queue, "POLL_SECONDS", 0.01)
+    monkeypatch.setattr(stage_queue, "get_retention_manager", FakeRetention)
+    finished = []
+    monkeypatch.setattr(stage_queue, "record_access", finished.append)
+    monkeypatch.setattr(stage_queue, "index_episode", lambda workspace, url, voice: finished.append(url))
+
+    run_id = enqueue(queue, tmp_path, voice="nova")
+    workers = StageWorkers(queue, {"scrape": 1, "script": 1, "audio": 1})
+    workers.start()
+    try:
+        run = queue.wait(run_id, timeout=10)
+    finally:
+        workers.stop()
+
+    assert run["status"] == "succeeded"
+    assert calls == [("scrape", "https://a.example/post"), ("script", "Title: Post"),
+                     ("audio", "HOST: Today we talk about queues.", "nova")]
+    assert finished == [run["root"], "https://a.example/post"]
+    with open(os.path.join(run["root"], "metadata", "podcast_audio_info.txt")) as f:
+        assert f.read() == "- Voice used: nova"
+    assert queue.counts()["audio"] == {"done": 1}
+
+
+def test_only_the_lease_holder_completes_an_item(queue, tmp_path):
+    run_id = enqueue(queue, tmp_path)
+    first = queue.claim("scrape", "worker-1")
+    # Worker 1 hangs past its lease; worker 2 takes the item over
+    queue._connection().execute("UPDATE work SET lease_expires = 0 WHERE id = ?", (first.id,))
+    second = queue.claim("scrape", "worker-2")
+    assert (second.id, second.attempts) == (first.id, 2)
+
+    assert not queue.complete(first, {**first.payload, "content_path": "stale"})
+    assert queue.complete(second, {**second.payload, "content_path": "fresh"})
+    assert not queue.complete(second, second.payload)
+    script = queue.claim("script", "worker-3")
+    assert (script.run_id, script.payload["content_path"]) == (run_id, "fresh")
+    assert queue.claim("script", "worker-3") is None
+
+
+def test_failures_retry_with_backoff_then_fail_the_run(queue, tmp_path):
+    run_id = enqueue(queue, tmp_path)
+    item = queue.claim("scrape", "w")
+    assert not queue.fail(item, "timeout")
+    # Backing off: not claimable yet
+    assert queue.claim("scrape", "w") is None
+    queue._connection().execute("UPDATE work SET available_at = 0")
+    item = queue.claim("scrape", "w")
+    assert item.attempts == 2
+    assert queue.fail(item, "timeout again")
+    assert (queue.run(run_id)["status"], queue.run(run_id)["error"]) == ("failed", "timeout again")
+
+
+def test_budget_failures_do_not_retry_and_deferrals_keep_attempts(queue, tmp_path):
+    rejected = enqueue(queue, tmp_path, url="https://a.example/1")
+    deferred = enqueue(queue, tmp_path, url="https://a.example/2")
+    item = queue.claim("scrape", "w")
+    assert item.run_id == rejected
+    assert queue.fail(item, "Budget exceeded: daily", retry=False)
+    assert queue.run(rejected)["status"] == "failed"
+
+    item = queue.claim("scrape", "w")
+    queue.defer(item, 0, "waiting for budget")
+    time.sleep(0.01)
+    again = queue.claim("scrape", "w")
+    assert (again.run_id, again.attempts) == (deferred, 1)
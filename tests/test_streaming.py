@@ -0,0 +1,107 @@
+import os
+import wave
+
+import pytest
+
+from blog_to_podcast import streaming
+from blog_to_podcast.streaming import TTS_MAX_CHARS, SentenceChunker, split_for_tts, stream_podcast
+from blog_to_podcast.text_normalizer import normalize_for_tts
+from blog_to_podcast.waveform import waveform_path
+
+# Each sentence roughly doubles in length once "km" and "%" are spelled out
+DENSE = " ".join(f"Route {n} is 12 km long and 40% uphill." for n in range(200))
+
+
+class WavBackend:
+    name = "piper"
+
+    def __init__(self):
+        self.texts = []
+
+    def synthesize(self, text, voice, path):
+        self.texts.append(text)
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(b"\x00\x01" * 800)
+
+
+def test_chunker_respects_limit_and_sentence_ends():
+    chunker = SentenceChunker(min_chars=50, first_chunk_chars=20, max_chars=200)
+    chunks = chunker.feed(DENSE) + chunker.flush()
+    assert "".join(chunks).replace(" ", "") == DENSE.replace(" ", "")
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_normalized_chunk_is_split_back_under_the_limit():
+    chunker = SentenceChunker()
+    chunk = chunker.feed(DENSE * 2)[1]
+    text, _ = normalize_for_tts(chunk)
+    assert len(text) > TTS_MAX_CHARS
+    pieces = split_for_tts(text)
+    assert len(pieces) > 1
+    assert all(len(piece) <= TTS_MAX_CHARS for piece in pieces)
+    assert " ".join(pieces) == text
+
+
+def test_short_text_is_not_split():
+    assert split_for_tts("Hello there.") == ["Hello there."]
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AUDIO_FORMAT", "wav")
+    backend = WavBackend()
+    monkeypatch.setattr(streaming, "select_backend", lambda voice, name=None: backend)
+    monkeypatch.setattr(streaming.llm_backend, "requires_api_key", lambda: False)
+    return backend
+
+
+def test_stream_podcast_joins_parts_and_keeps_every_request_under_the_limit(tmp_path, monkeypatch, backend):
+    tokens = [DENSE[i:i + 7] for i in range(0, len(DENSE), 7)] * 3
+    monkeypatch.setattr(streaming, "stream_script_tokens", lambda content: iter(tokens))
+    segments = []
+    result = stream_podcast("content", voice="nova", output_dir=str(tmp_path / "run"),
+                            on_segment=lambda part, path: segments.append(part))
+
+    assert len(backend.texts) > 1
+    assert all(len(text) <= TTS_MAX_CHARS for text in backend.texts)
+    assert sorted(segments) == list(range(1, len(backend.texts) + 1))
+    [episode] = result["audio"]
+    assert os.listdir(os.path.dirname(episode)) == [os.path.basename(episode)]
+    assert os.path.exists(waveform_path(episode))
+    with wave.open(episode, "rb") as f:
+        assert f.getnframes() == 800 * len(backend.texts)
+    with open(result["script"], encoding="utf-8") as f:
+        assert "Route 0 is 12 km long" in f.read()
+
+
+def test_streamed_run_is_indexed_and_recorded(tmp_path, monkeypatch):
+    from blog_to_podcast import main, search_index
+    from blog_to_podcast.tools import FirecrawlScraper
+
+    monkeypatch.chdir(tmp_path)
+    index = search_index.SearchIndex(str(tmp_path / "search.db"))
+    monkeypatch.setattr(search_index, "get_search_index", lambda: index)
+    accessed = []
+    monkeypatch.setattr(main, "record_access", accessed.append)
+    monkeypatch.setattr(FirecrawlScraper, "_run", lambda self, url: "Title: Caching at scale\nAuthor: Ada\n\nContent:\nBody text.")
+
+    def fake_stream(content, voice, output_dir, **kwargs):
+        script = os.path.join(output_dir, "scripts", "podcast_script.txt")
+        os.makedirs(os.path.dirname(script), exist_ok=True)
+        with open(script, "w", encoding="utf-8") as f:
+            f.write("Welcome to an episode about eviction policies.")
+        return {"script": script, "audio": [], "timings": {}, "chars_saved": 0}
+
+    monkeypatch.setattr(streaming, "stream_podcast", fake_stream)
+    main.run_stream("https://blog.example/caching", voice="nova")
+
+    [root] = accessed
+    [hit] = index.search("eviction")
+    assert hit["url"] == "https://blog.example/caching"
+    assert hit["run_id"] == os.path.basename(root)
+    assert hit["title"] == "Caching at scale"
@@ -0,0 +1,46 @@
+import pytest
+
+from blog_to_podcast.text_normalizer import (
+    LANGUAGE_REGRESSION_CASES, REGRESSION_CASES, normalize_for_tts, number_to_words
+)
+
+
+@pytest.fixture(autouse=True)
+def normalization_on(monkeypatch):
+    monkeypatch.delenv("TTS_NORMALIZE", raising=False)
+
+
+@pytest.mark.parametrize("text, expected", REGRESSION_CASES)
+def test_regression_cases(text, expected):
+    assert normalize_for_tts(text, expand_numbers=False)[0] == expected
+
+
+@pytest.mark.parametrize("language, text, expected", LANGUAGE_REGRESSION_CASES)
+def test_expansions_are_english_only(language, text, expected):
+    assert normalize_for_tts(text, expand_numbers=False, language=language)[0] == expected
+
+
+def test_numbers_are_not_spelled_out_in_english_for_other_languages():
+    assert normalize_for_tts("Tengo 3 gatos.", expand_numbers=True, language="es")[0] == "Tengo 3 gatos."
+
+
+def test_markup_is_removed_in_every_language():
+    text = "HOST: **Hola** a todos 🎉 [pausa]\n(laughs)\nVisita https://www.example.com/post?id=1."
+    assert normalize_for_tts(text, language="es")[0] == "Hola a todos\nVisita example.com."
+
+
+def test_units_dates_and_numbers_in_english():
+    text, report = normalize_for_tts("On 2026-03-15, 3 km took 45 mins (50% faster).", expand_numbers=True)
+    assert text == ("On March fifteenth, twenty twenty-six, three kilometers took forty-five minutes "
+                    "(fifty percent faster).")
+    assert report.original_chars == len("On 2026-03-15, 3 km took 45 mins (50% faster).")
+
+
+def test_number_to_words():
+    assert number_to_words(0) == "zero"
+    assert number_to_words(1_234_567) == "one million two hundred thirty-four thousand five hundred sixty-seven"
+
+
+def test_normalization_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("TTS_NORMALIZE", "false")
+    assert normalize_for_tts("**Bold** 3 km")[0] == "**Bold** 3 km"
@@ -0,0 +1,100 @@
+import contextvars
+import io
+import json
+import threading
+
+import pytest
+
+from blog_to_podcast import tracing
+from blog_to_podcast.tracing import NOOP_SPAN, JsonFileExporter, Tracer, print_trace, traced
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span.to_dict())
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(tracing, "_tracer", Tracer(exporter))
+    return exporter
+
+
+def test_disabled_tracer_hands_out_the_noop_span():
+    tracer = Tracer()
+    with tracer.span("conversion", **{"run.id": "r"}) as span:
+        assert span is NOOP_SPAN
+        assert tracer.start_span("child") is NOOP_SPAN
+
+
+def test_spans_nest_and_carry_attributes(exporter):
+    tracer = tracing.get_tracer()
+    with tracer.span("conversion", **{"run.id": "r1", "tts.voice": None}) as root:
+        with tracer.span("tool", llm__model="gpt-4o") as child:
+            child.set_attribute("file.bytes", 10)
+
+    child_dict, root_dict = exporter.spans
+    assert child_dict["parent_span_id"] == root.span_id
+    assert child_dict["trace_id"] == root_dict["trace_id"] == root.trace_id
+    assert child_dict["attributes"] == {"llm.model": "gpt-4o", "file.bytes": 10}
+    assert root_dict["attributes"] == {"run.id": "r1"}
+    assert root_dict["parent_span_id"] is None
+
+
+def test_exceptions_mark_the_span_failed(exporter):
+    with pytest.raises(ValueError):
+        with tracing.get_tracer().span("scrape"):
+            raise ValueError("timeout")
+    [span] = exporter.spans
+    assert span["status"] == "error"
+    assert span["attributes"]["error.message"] == "timeout"
+
+
+def test_copied_context_parents_spans_in_worker_threads(exporter):
+    tracer = tracing.get_tracer()
+
+    def synthesize():
+        with tracer.span("tts"):
+            pass
+
+    with tracer.span("stream") as root:
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(synthesize,))
+        thread.start()
+        thread.join()
+    assert exporter.spans[0]["name"] == "tts"
+    assert exporter.spans[0]["parent_span_id"] == root.span_id
+
+
+def test_traced_marks_error_strings(exporter):
+    @traced("tool.scrape", record_args=("url",))
+    def scrape(url, retries=1):
+        return "Error: blocked" if "blocked" in url else "content"
+
+    assert scrape("https://a.example/ok") == "content"
+    assert scrape(url="https://a.example/blocked") == "Error: blocked"
+    ok, failed = exporter.spans
+    assert ok["status"] == "ok" and ok["attributes"] == {"url": "https://a.example/ok", "result.chars": 7}
+    assert failed["status"] == "error"
+
+
+def test_json_exporter_writes_a_printable_trace(tmp_path):
+    tracer = Tracer(JsonFileExporter(str(tmp_path)))
+    with tracer.span("conversion") as root:
+        with tracer.span("crew.task"):
+            pass
+    path = tmp_path / f"{root.trace_id}.jsonl"
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["crew.task", "conversion"]
+
+    out = io.StringIO()
+    print_trace(str(path), out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].endswith("ms  conversion")
+    assert lines[1].endswith("ms    crew.task")
@@ -0,0 +1,89 @@
+import os
+import stat
+import time
+
+import pytest
+
+from blog_to_podcast.transcode import (
+    TranscodeCache, TranscodeError, audio_mime_type, format_for_path, transcode_bytes
+)
+
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    """A stand-in ffmpeg that logs each call and writes a fixed-size payload to stdout."""
+    log = tmp_path / "ffmpeg.log"
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" >> "{log}"\n'
+        'case "$*" in *broken*) echo "Invalid data found" >&2; exit 1;; esac\n'
+        "head -c 1000 /dev/zero\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("FFMPEG_BINARY", str(script))
+    return lambda: log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(b"mp3 data")
+    return str(path)
+
+
+def test_formats_and_mime_types():
+    assert format_for_path("a/b.OPUS") == "opus"
+    assert format_for_path("a/b.ogg") is None
+    assert audio_mime_type("x.aac") == "audio/aac"
+    assert audio_mime_type("x.unknown") == "audio/mpeg"
+
+
+def test_cache_transcodes_once_per_source_and_format(tmp_path, ffmpeg, source):
+    cache = TranscodeCache(str(tmp_path / "cache"))
+    first = cache.get(source, "opus")
+    assert cache.get(source, "opus") == first
+    assert first.endswith(".opus") and os.path.getsize(first) == 1000
+    assert len(ffmpeg()) == 1
+    assert "libopus" in ffmpeg()[0]
+
+    # The canonical format is served as is
+    assert cache.get(source, "mp3") == source
+    assert len(ffmpeg()) == 1
+
+    # A re-rendered source gets a new cache entry
+    with open(source, "wb") as f:
+        f.write(b"new mp3 data")
+    assert cache.get(source, "opus") != first
+    assert len(ffmpeg()) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path, ffmpeg):
+    cache = TranscodeCache(str(tmp_path / "cache"), max_bytes=3500)
+    paths = []
+    for n in range(3):
+        source = tmp_path / f"ep{n}.mp3"
+        source.write_bytes(b"x")
+        paths.append(cache.get(str(source), "aac"))
+        then = time.time() - 100 + n
+        os.utime(paths[-1], (then, then))
+    # A hit refreshes ep0, so ep1 is now the least recently used
+    cache.get(str(tmp_path / "ep0.mp3"), "aac")
+
+    source = tmp_path / "ep3.mp3"
+    source.write_bytes(b"x")
+    paths.append(cache.get(str(source), "aac"))
+    assert [os.path.exists(path) for path in paths] == [True, False, True, True]
+    assert len(ffmpeg()) == 4
+
+
+def test_ffmpeg_errors(tmp_path, ffmpeg, monkeypatch):
+    broken = tmp_path / "broken.mp3"
+    broken.write_bytes(b"")
+    with pytest.raises(TranscodeError, match="Invalid data found"):
+        transcode_bytes(str(broken), "opus")
+    with pytest.raises(TranscodeError, match="Unsupported"):
+        transcode_bytes(str(broken), "flac")
+    monkeypatch.setenv("FFMPEG_BINARY", str(tmp_path / "missing-ffmpeg"))
+    with pytest.raises(TranscodeError, match="ffmpeg not found"):
+        transcode_bytes(str(broken), "opus")
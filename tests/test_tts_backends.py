@@ -0,0 +1,81 @@
+import stat
+import sys
+import wave
+
+import pytest
+
+from blog_to_podcast.tts_backends import (
+    EspeakBackend, OpenAIBackend, PiperBackend, TTSBackendError, audio_seconds, select_backend,
+    split_for_synthesis
+)
+
+# Writes one 16-bit frame per input character at 1 kHz and logs the voice it was given
+FAKE_ESPEAK = """#!{python}
+import sys, wave
+args = sys.argv[1:]
+text = sys.stdin.read()
+if "fail" in text:
+    sys.stderr.write("espeak-ng: voice not found")
+    sys.exit(1)
+with open({log!r}, "a") as log:
+    log.write(args[args.index("-v") + 1] + "\\n")
+with wave.open(args[args.index("-w") + 1], "wb") as f:
+    f.setnchannels(1)
+    f.setsampwidth(2)
+    f.setframerate(1000)
+    f.writeframes(b"\\x00\\x00" * len(text))
+"""
+
+
+@pytest.fixture
+def espeak(tmp_path, monkeypatch):
+    log = tmp_path / "voices.log"
+    script = tmp_path / "espeak-ng"
+    script.write_text(FAKE_ESPEAK.format(python=sys.executable, log=str(log)))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("ESPEAK_BINARY", str(script))
+    return log
+
+
+def test_split_for_synthesis_keeps_chunks_small_and_text_whole():
+    text = "\n".join(" ".join(f"Sentence {p}.{n} is here." for n in range(40)) for p in range(3))
+    chunks = split_for_synthesis(text, max_chars=200)
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_local_backend_joins_chunks_in_order(tmp_path, espeak):
+    text = " ".join(f"Sentence number {n} of the episode." for n in range(60))
+    output = tmp_path / "audio" / "episode.wav"
+    output.parent.mkdir()
+    EspeakBackend(workers=4, chunk_chars=300).synthesize(text, "nova", str(output))
+
+    chunks = split_for_synthesis(text, 300)
+    assert len(chunks) > 1
+    with wave.open(str(output), "rb") as f:
+        assert f.getnframes() == sum(len(chunk) for chunk in chunks)
+    assert audio_seconds(str(output)) == pytest.approx(sum(map(len, chunks)) / 1000)
+    assert set(espeak.read_text().split()) == {"en-us+f3"}
+    assert [p.name for p in output.parent.iterdir()] == ["episode.wav"]
+
+
+def test_local_backend_errors(tmp_path, espeak, monkeypatch):
+    with pytest.raises(TTSBackendError, match="voice not found"):
+        EspeakBackend().synthesize("This will fail.", "alloy", str(tmp_path / "a.wav"))
+    monkeypatch.setenv("ESPEAK_BINARY", str(tmp_path / "missing"))
+    with pytest.raises(TTSBackendError, match="not found"):
+        EspeakBackend().synthesize("Hello.", "alloy", str(tmp_path / "a.wav"))
+    monkeypatch.setenv("PIPER_VOICES_DIR", str(tmp_path))
+    with pytest.raises(TTSBackendError, match="Piper voice model not found"):
+        PiperBackend().synthesize("Hello.", "alloy", str(tmp_path / "a.wav"))
+
+
+def test_backend_selection_order(monkeypatch):
+    monkeypatch.setenv("TTS_BACKEND", "piper")
+    monkeypatch.setenv("TTS_BACKEND_VOICES", "onyx=espeak, nova=openai")
+    assert isinstance(select_backend("alloy"), PiperBackend)
+    assert isinstance(select_backend("onyx"), EspeakBackend)
+    assert isinstance(select_backend("nova"), OpenAIBackend)
+    assert isinstance(select_backend("onyx", "openai"), OpenAIBackend)
+    with pytest.raises(TTSBackendError, match="Unknown TTS backend"):
+        select_backend("alloy", "festival")
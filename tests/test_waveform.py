@@ -0,0 +1,72 @@
+import json
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from blog_to_podcast.waveform import (
+    WaveformError, compute_waveform, ensure_waveform, load_waveform, waveform_path, write_waveform
+)
+
+RATE = 8000
+
+
+def write_wav(path, segments, channels=1):
+    """Write (seconds, loud) segments as 16-bit audio; loud parts swing between +-0.5."""
+    samples = []
+    for seconds, loud in segments:
+        count = int(seconds * RATE)
+        samples.append(np.where(np.arange(count) % 2, 16384, -16384) if loud else np.zeros(count))
+    data = np.repeat(np.concatenate(samples).astype("<i2"), channels)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(data.tobytes())
+    return str(path)
+
+
+SPEECH = [(1, True), (1, False), (1, True), (0.7, False), (0.3, True), (0.2, False), (0.5, True)]
+
+
+@pytest.mark.parametrize("channels", [1, 2])
+def test_wav_summary_without_ffmpeg(tmp_path, monkeypatch, channels):
+    monkeypatch.setenv("FFMPEG_BINARY", str(tmp_path / "missing-ffmpeg"))
+    audio = write_wav(tmp_path / "audio" / "episode.wav", SPEECH, channels)
+    summary = compute_waveform(audio, points=47)
+
+    assert (summary["duration"], summary["points"], summary["audio"]) == (4.7, 47, "episode.wav")
+    # One point per 0.1 s: speech is at half scale, pauses are silent
+    assert summary["peaks"][:10] == [128] * 10 and summary["peaks"][10:20] == [0] * 10
+    assert summary["rms"][:10] == [128] * 10
+    # Speech resumes after the two long pauses; the 0.2 s gap is too short
+    assert summary["jumps"] == [2.0, 3.7]
+    assert compute_waveform(audio, points=47, max_jumps=1)["jumps"] == [2.0]
+
+
+def test_summaries_are_stored_once_and_refreshed_when_stale(tmp_path):
+    audio = write_wav(tmp_path / "run" / "audio" / "podcast.wav", SPEECH)
+    path = ensure_waveform(audio)
+    assert path == waveform_path(audio) == str(tmp_path / "run" / "metadata" / "podcast.waveform.json")
+    stored = os.stat(path).st_mtime_ns
+    assert ensure_waveform(audio) == path and os.stat(path).st_mtime_ns == stored
+    assert load_waveform(audio)["duration"] == 4.7
+
+    write_wav(audio, [(2, True)])
+    assert load_waveform(audio) is None
+    ensure_waveform(audio)
+    with open(path) as f:
+        summary = json.load(f)
+    assert (summary["duration"], summary["jumps"]) == (2.0, [])
+
+
+def test_unreadable_audio(tmp_path):
+    audio = tmp_path / "audio" / "broken.wav"
+    audio.parent.mkdir()
+    audio.write_bytes(b"not a wav file")
+    with pytest.raises(WaveformError, match="Could not read"):
+        compute_waveform(str(audio))
+    assert write_waveform(str(audio)) is None
+    assert not os.path.exists(waveform_path(str(audio)))
@@ -0,0 +1,17 @@
+import pytest
+
+from blog_to_podcast.worker_pool import WarmCrewPool, _ping
+
+
+def test_workers_are_warm_and_recycled_after_their_job_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with WarmCrewPool(workers=1, max_jobs_per_worker=2) as pool:
+        pool.warm_up()
+        pids = [pool._submit(_ping).result(timeout=120) for _ in range(3)]
+    # warm_up's ping was the first worker's first job, so it exits after the next one
+    assert pids[0] != pids[1] == pids[2]
+
+
+def test_fork_cannot_recycle_workers():
+    with pytest.raises(ValueError, match="POOL_MAX_JOBS_PER_WORKER=0"):
+        WarmCrewPool(workers=1, max_jobs_per_worker=5, start_method="fork")
@@ -0,0 +1,62 @@
+import os
+import threading
+
+import pytest
+
+from blog_to_podcast.workspace import RunWorkspace, atomic_write_bytes, atomic_write_text, new_run_id
+
+
+def test_concurrent_runs_get_separate_workspaces(tmp_path):
+    workspaces = []
+    lock = threading.Lock()
+
+    def create():
+        workspace = RunWorkspace.create(base_dir=str(tmp_path))
+        atomic_write_text(workspace.script_path, workspace.run_id)
+        with lock:
+            workspaces.append(workspace)
+
+    threads = [threading.Thread(target=create) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({workspace.root for workspace in workspaces}) == 16
+    for workspace in workspaces:
+        with open(workspace.script_path, encoding="utf-8") as f:
+            assert f.read() == workspace.run_id
+
+
+def test_run_ids_sort_by_creation_time():
+    first, second = new_run_id(), new_run_id()
+    assert first[:15] <= second[:15]
+    assert first != second
+
+
+def test_artifacts_lists_this_runs_files_in_part_order(tmp_path):
+    workspace = RunWorkspace.create(base_dir=str(tmp_path))
+    other = RunWorkspace.create(base_dir=str(tmp_path))
+    for name in ("ep_part10.mp3", "ep_part2.mp3", "ep_part1.mp3", "notes.txt", ".tmp_abc.mp3"):
+        atomic_write_bytes(os.path.join(workspace.audio_dir, name), b"audio")
+    atomic_write_bytes(os.path.join(other.audio_dir, "other.mp3"), b"audio")
+
+    artifacts = workspace.artifacts()
+    assert [f.name for f in artifacts["audio"]] == ["ep_part1.mp3", "ep_part2.mp3", "ep_part10.mp3"]
+    assert artifacts["script"] is None and artifacts["info"] is None
+    atomic_write_text(workspace.info_path, "info")
+    assert workspace.artifacts()["info"].read_text() == "info"
+
+
+def test_atomic_write_leaves_no_partial_file_on_failure(tmp_path):
+    path = tmp_path / "audio" / "episode.mp3"
+    atomic_write_bytes(str(path), [b"old"])
+
+    def chunks():
+        yield b"new data"
+        raise RuntimeError("connection dropped")
+
+    with pytest.raises(RuntimeError):
+        atomic_write_bytes(str(path), chunks())
+    assert path.read_bytes() == b"old"
+    assert os.listdir(path.parent) == ["episode.mp3"]